@@ -42,6 +42,16 @@ dev_requirements = [
     'mypy',
 ]
 
+# Optional, needed for the default http client of the AsyncRemoteAgent
+async_requirements = [
+    'httpx',
+]
+
+# Optional, makes the content defined chunks of a data bundle many times faster
+chunking_requirements = [
+    'numpy',
+]
+
 docs_requirements = [
     'Sphinx',
     'sphinx-rtd-theme',
@@ -63,7 +73,9 @@ setup(
     ],
     description="Developer Toolkit for Decentralised Data Ecosystems",
     extras_require={
-        'test': test_requirements,
+        'async': async_requirements,
+        'chunking': chunking_requirements,
+        'test': test_requirements + async_requirements + chunking_requirements,
         'docs': docs_requirements,
         'dev': dev_requirements + test_requirements + docs_requirements,
     },
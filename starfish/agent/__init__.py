@@ -6,5 +6,6 @@
 """
 
 # from starfish.agent.agent_base import AgentBase                         # noqa: F401
+from starfish.agent.async_remote_agent import AsyncRemoteAgent          # noqa: F401
 from starfish.agent.memory_agent import MemoryAgent                     # noqa: F401
 from starfish.agent.remote_agent import RemoteAgent                     # noqa: F401
@@ -152,6 +152,19 @@ class AgentBase(ABC):
         """
         pass
 
+    def get_asset_data_size(self, asset_did_id: str) -> int:
+        """
+
+        Return the size of the data held by the agent for an asset. Agents that cannot find the size
+        without downloading the data, return None.
+
+        :param str asset_did_id: asset did or asset id of the data asset
+
+        :return: size of the data in bytes, or None if the agent does not have the data or the size is unknown
+
+        """
+        return None
+
     @abstractmethod
     def get_asset_purchase_ids(self, asset: Any) -> Any:
         """
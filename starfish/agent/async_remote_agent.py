@@ -0,0 +1,510 @@
+"""
+
+Asyncio version of the Surfer Agent class, to access many agents from one event loop
+
+"""
+
+import asyncio
+import logging
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    List,
+    Union
+)
+from urllib.parse import urljoin
+
+from eth_utils import remove_0x_prefix
+from mongoquery import Query
+
+from starfish.agent.remote_agent import (
+    DEFAULT_READ_WORKERS,
+    RemoteAgent
+)
+from starfish.asset import (
+    DataAsset,
+    OperationAsset
+)
+from starfish.exceptions import (
+    StarfishRemoteAgentInvalidAccess,
+    StarfishRemoteAgentUnauthorized
+)
+from starfish.job import Job
+from starfish.listing import Listing
+from starfish.middleware.agent.async_remote_agent_adapter import AsyncRemoteAgentAdapter
+from starfish.middleware.agent.authorization_token_cache import get_default_token_cache
+from starfish.middleware.agent.remote_agent_adapter import DEFAULT_CHUNK_SIZE
+from starfish.network.account_base import AccountBase
+from starfish.network.ddo import DDO
+from starfish.network.did import decode_to_asset_id
+from starfish.network.network_base import NetworkBase
+from starfish.types import (
+    Authentication,
+    ListingData,
+    TAsset,
+    TRemoteAgent
+)
+from starfish.utils.data_stream import (
+    aiter_hash_verified,
+    open_atomic_file
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRemoteAgent(RemoteAgent):
+    """
+
+    Asyncio Remote Agent class, this has the same methods as the :class:`.RemoteAgent`, but all of the
+    agent methods are coroutines. Only the ddo, endpoint and cache helpers, such as `get_endpoint`
+    and `is_service`, are normal methods.
+
+    :param ddo: ddo of the remote agent.
+    :param dict authentication: authentication is a dict of values to allow for authentication access to
+        a remote agent, see :class:`.RemoteAgent`.
+    :param http_client: Optional async HTTP client, this defaults to a `httpx.AsyncClient` with a connection pool.
+        See :class:`.AsyncRemoteAgentAdapter` for the calls that the client must support.
+
+    For example::
+
+        async with AsyncRemoteAgent(ddo, authentication) as agent:
+            listings = await agent.get_listings()
+
+    """
+    adapter_class = AsyncRemoteAgentAdapter
+
+    @staticmethod
+    async def load(
+        agent_did_or_url: str,
+        network: NetworkBase = None,
+        username: str = None,
+        password: str = None,
+        authentication: Authentication = None,
+        http_client: Any = None
+    ) -> TRemoteAgent:
+        """
+
+        Load a remote agent using a did/url, see :func:`.RemoteAgent.load`.
+
+        :return: An AsyncRemoteAgent Object or None if the agent cannot be accessed or cannot be found at the url.
+
+        """
+        if not authentication:
+            if username or password:
+                authentication = {
+                    'username': username,
+                    'password': password
+                }
+        ddo_text = None
+        if network:
+            # the network calls are blocking, so run them outside of the event loop
+            loop = asyncio.get_running_loop()
+            ddo_text = await loop.run_in_executor(
+                None,
+                lambda: network.resolve_agent(agent_did_or_url, authentication=authentication)
+            )
+        else:
+            ddo_text = await AsyncRemoteAgent.resolve_url(agent_did_or_url, authentication=authentication, http_client=http_client)
+
+        if ddo_text:
+            return AsyncRemoteAgent(ddo_text, authentication=authentication, http_client=http_client)
+        return None
+
+    @staticmethod
+    async def register(
+        network: NetworkBase,
+        register_account: AccountBase,
+        ddo: DDO,
+        authentication: Authentication = None,
+        http_client: Any = None
+    ) -> TRemoteAgent:
+        """
+        Register the agent on the network, see :func:`.RemoteAgent.register`.
+
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, network.register_did, register_account, ddo.did, ddo.as_text)
+        return AsyncRemoteAgent(ddo.as_text, authentication=authentication, http_client=http_client)
+
+    async def register_asset(self, asset: TAsset, create_provenance: bool = False) -> TAsset:
+        if self._ddo is None:
+            raise ValueError('The agent must have a valid ddo')
+
+        url = self.get_endpoint('meta')
+        register_data = await self._call_adapter(self._adapter.register_asset, asset.metadata_text, url)
+        if register_data:
+            asset_id = register_data['asset_id']
+            if asset.asset_id != asset_id:
+                raise ValueError(
+                    f' calculated asset_id {asset.asset_id} is not the same as the agent generated asset_id {asset_id}'
+                )
+            did = f'{self._ddo.did}/{asset_id}'
+            asset.set_did(did)
+            self._metadata_cache.add(asset_id, asset.metadata_text, is_valid=True)
+        return asset
+
+    async def create_listing(self, listing_data: ListingData, asset_did: str) -> Listing:
+        if not isinstance(listing_data, dict):
+            raise ValueError('You must provide a dict as the listing data')
+
+        url = self.get_endpoint('market')
+        asset_id = decode_to_asset_id(asset_did)
+        data = await self._call_adapter(self._adapter.create_listing, listing_data, asset_id, url)
+        return Listing(self, data['id'], asset_did, data)
+
+    async def update_listing(self, listing: Listing) -> bool:
+        url = self.get_endpoint('market')
+        return await self._call_adapter(self._adapter.update_listing, listing.listing_id, listing.data, url)
+
+    async def upload_asset(self, asset: TAsset) -> bool:
+        if not isinstance(asset, DataAsset):
+            raise TypeError('Only DataAsset is supported')
+
+        if not asset.has_data:
+            raise ValueError('No data to upload')
+
+        url = self.get_endpoint('storage')
+        asset_id = remove_0x_prefix(asset.asset_id)
+
+        # stream the data from the asset data source, without reading a file into memory
+        with asset.data_source.open_view() as data:
+            return await self._call_adapter(self._adapter.upload_asset_data, asset_id, data, url)
+
+    async def get_asset_data_size(self, asset_did_id: str) -> int:
+        asset_id = decode_to_asset_id(asset_did_id)
+        if not asset_id:
+            raise ValueError(f'{asset_did_id} is not an asset id or asset did')
+        url = self.get_endpoint('storage')
+        return await self._call_adapter(self._adapter.get_asset_data_size, asset_id, url)
+
+    async def download_asset(self, asset_did_id: str) -> TAsset:
+        url = self.get_endpoint('storage')
+
+        asset_id = decode_to_asset_id(asset_did_id)
+        if not asset_id:
+            raise ValueError(f'{asset_did_id} is not an asset id or asset did')
+
+        data, store_asset = await asyncio.gather(
+            self._call_adapter(self._adapter.download_asset, asset_id, url),
+            self.get_asset(asset_id)
+        )
+        asset = DataAsset(
+            store_asset.metadata_text,
+            data=data
+        )
+        asset.set_did(store_asset.did)
+        return asset
+
+    async def download_asset_stream(self, asset_did_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Download the asset data as an async stream of chunks, see :func:`.RemoteAgent.download_asset_stream`.
+
+        For example::
+
+            async for chunk in await agent.download_asset_stream(asset.did):
+                output_stream.write(chunk)
+
+        """
+        store_asset = await self.get_asset(asset_did_id)
+        return await self._download_asset_stream(store_asset, chunk_size)
+
+    async def download_asset_to_file(
+        self,
+        asset_did_id: str,
+        filename_or_stream: Any,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> TAsset:
+        """
+        Download the asset data directly to a file or stream, see :func:`.RemoteAgent.download_asset_to_file`.
+
+        """
+        store_asset = await self.get_asset(asset_did_id)
+        chunks = await self._download_asset_stream(store_asset, chunk_size)
+        if hasattr(filename_or_stream, 'write'):
+            async for chunk in chunks:
+                filename_or_stream.write(chunk)
+        else:
+            with open_atomic_file(filename_or_stream) as fp:
+                async for chunk in chunks:
+                    fp.write(chunk)
+        return store_asset
+
+    async def get_listing(self, listing_id: str) -> Listing:
+        listing = None
+        url = self.get_endpoint('market')
+
+        data = await self._call_adapter(self._adapter.get_listing, listing_id, url)
+        if data:
+            asset = await self._read_asset(data['assetid'])
+            if asset:
+                listing = Listing(self, data['id'], asset, data)
+        return listing
+
+    async def get_asset(self, asset_did_id: str) -> TAsset:
+        asset_id = decode_to_asset_id(asset_did_id)
+        return await self._read_asset(asset_id)
+
+    async def get_listings(self, max_workers: int = DEFAULT_READ_WORKERS) -> List[Listing]:
+        listings = {}
+        listings_data = await self._read_listings_data()
+        async for listing in self._iter_listings_data(listings_data, max_workers):
+            listings[listing.listing_id] = listing
+        return [listings[data['id']] for data in listings_data if data['id'] in listings]
+
+    async def iter_listings(self, max_workers: int = DEFAULT_READ_WORKERS) -> AsyncIterator[Listing]:
+        """
+        Async generator of all of the listings, each listing is returned as soon as it's
+        asset metadata has been read from the agent.
+
+        For example::
+
+            async for listing in agent.iter_listings():
+                print(listing.listing_id)
+
+        """
+        listings_data = await self._read_listings_data()
+        async for listing in self._iter_listings_data(listings_data, max_workers):
+            yield listing
+
+    async def get_job(self, job_id: str) -> Job:
+        job = None
+        url = self.get_endpoint('invoke', 'jobs')
+        data = await self._call_adapter(self._adapter.get_job, job_id, url)
+        if data:
+            job = Job(job_id, data.get('status', None), data.get('outputs', None))
+        return job
+
+    async def job_wait_for_completion(self, job_id: str, timeout_seconds: int = 60, sleep_seconds: int = 1) -> Union[Job, bool]:
+        timeout_time = time.time() + timeout_seconds
+        while timeout_time > time.time():
+            job = await self.get_job(job_id)
+            if job.is_finished:
+                return job
+            if sleep_seconds > 0:
+                await asyncio.sleep(sleep_seconds)
+        return False
+
+    async def purchase_asset(self, listing: Any, AccountBase: Any, purchase_id: str = None, status: str = None,
+                             info: Any = None, agreement: Any = None) -> bool:
+        purchase = {'listingid': listing.listing_id}
+        if purchase_id:
+            purchase['id'] = purchase_id
+        if status:
+            purchase['status'] = status
+        if info:
+            purchase['info'] = info
+        if agreement:
+            purchase['agreement'] = agreement
+        url = self.get_endpoint('market')
+        return await self._call_adapter(self._adapter.purchase_asset, purchase, url)
+
+    async def invoke(self, asset: TAsset, inputs: Any = None, is_async: bool = False) -> Any:
+        if not isinstance(asset, OperationAsset):
+            raise ValueError('Asset is not a OperationAsset')
+
+        mode_type = 'async' if is_async else 'sync'
+        if not asset.is_mode(mode_type):
+            raise TypeError(f'This operation asset does not support {mode_type}')
+        if not inputs:
+            inputs = {}
+
+        url = self.get_endpoint('invoke', mode_type)
+        return await self._call_adapter(self._adapter.invoke, remove_0x_prefix(asset.asset_id), inputs, url)
+
+    async def get_collection_items(self, name=None):
+        url = self.get_endpoint('collection')
+        if not url:
+            return None
+        return await self._call_adapter(self._adapter.get_collection_items, url, name)
+
+    async def add_collection_items(self, name, asset_list):
+        if not isinstance(asset_list, (tuple, list)):
+            raise ValueError('You must pass a list of asset ids to add to the collection')
+        url = self.get_endpoint('collection')
+        if not url:
+            return None
+        return await self._call_adapter(self._adapter.add_collection_items, url, name, asset_list)
+
+    async def remove_collection_items(self, name, asset_list):
+        if not isinstance(asset_list, (tuple, list)):
+            raise ValueError('You must pass a list of asset ids to remove from the collection')
+        url = self.get_endpoint('collection')
+        if not url:
+            return None
+        return await self._call_adapter(self._adapter.remove_collection_items, url, name, asset_list)
+
+    async def get_authorization_token(self) -> str:
+        if self._authentication and 'token' in self._authentication:
+            if self._authentication['token']:
+                return self._authentication['token']
+
+        url = self._get_token_url()
+        token = None
+        if url:
+            username = self._authentication['username']
+            password = self._authentication.get('password', '')
+            token = await self._token_cache.async_get_token(
+                url,
+                username,
+                password,
+                lambda: self._adapter.get_authorization_token(username, password, url)
+            )
+            if token is None:
+                raise StarfishRemoteAgentInvalidAccess(f'Unable to obtain a token from {url}')
+        return token
+
+    async def validate_asset(self, asset: TAsset) -> bool:
+        return RemoteAgent.validate_asset(self, asset)
+
+    async def search_listings(self, text: str, sort: Any = None, offset: int = 100, page: int = 0) -> List[ListingData]:
+        return RemoteAgent.search_listings(self, text, sort, offset, page)
+
+    async def is_access_granted_for_asset(self, asset: Any, account: Any, purchase_id: str = None) -> bool:
+        return RemoteAgent.is_access_granted_for_asset(self, asset, account, purchase_id)
+
+    async def get_asset_purchase_ids(self, asset: Any) -> Any:
+        return RemoteAgent.get_asset_purchase_ids(self, asset)
+
+    async def purchase_wait_for_completion(self, asset: Any, account: Any, purchase_id: str, timeoutSeconds: int) -> bool:
+        return RemoteAgent.purchase_wait_for_completion(self, asset, account, purchase_id, timeoutSeconds)
+
+    async def consume_asset(self, listing: Any, account: Any, purchase_id: str) -> bool:
+        return RemoteAgent.consume_asset(self, listing, account, purchase_id)
+
+    async def get_metadata_list(self) -> Any:
+        url = self.get_endpoint('meta')
+        return await self._call_adapter(self._adapter.get_metadata_list, url)
+
+    async def search_asset(self, filter_values: Any) -> List[str]:
+        if not isinstance(filter_values, dict):
+            raise TypeError('Filter values must be a type dict')
+
+        asset_list = await self.get_metadata_list()
+        filter_query = Query(filter_values)
+        result = []
+        if asset_list:
+            for asset_id, metadata in asset_list.items():
+                if filter_query.match(metadata):
+                    result.append(asset_id)
+        return result
+
+    async def _call_adapter(self, method: Any, *args: Any) -> Any:
+        authorization_token = await self.get_authorization_token()
+        try:
+            return await method(*args, authorization_token)
+        except StarfishRemoteAgentUnauthorized:
+            if not self._invalidate_authorization_token(authorization_token):
+                raise
+            logger.debug('authorization token rejected by the agent, requesting a new token')
+            return await method(*args, await self.get_authorization_token())
+
+    async def _download_asset_stream(self, store_asset: TAsset, chunk_size: int) -> AsyncIterator[bytes]:
+        if not isinstance(store_asset, DataAsset):
+            raise TypeError('Only DataAsset is supported')
+        url = self.get_endpoint('storage')
+        asset_id = remove_0x_prefix(store_asset.asset_id)
+        chunks = await self._call_adapter(self._adapter.download_asset_stream, asset_id, url, chunk_size)
+        return aiter_hash_verified(chunks, store_asset.metadata.get('contentHash'), store_asset.did)
+
+    async def _read_listings_data(self) -> List[ListingData]:
+        url = self.get_endpoint('market')
+        listings_data = await self._call_adapter(self._adapter.get_listings, url)
+        return listings_data or []
+
+    async def _iter_listings_data(
+        self,
+        listings_data: List[ListingData],
+        max_workers: int = DEFAULT_READ_WORKERS
+    ) -> AsyncIterator[Listing]:
+        if not listings_data:
+            return
+        asset_listings = {}
+        for data in listings_data:
+            asset_listings.setdefault(data['assetid'], []).append(data)
+
+        read_asset_ids = []
+        for asset_id in asset_listings.keys():
+            asset = self._get_cached_asset(asset_id)
+            if asset:
+                for data in asset_listings[asset_id]:
+                    yield Listing(self, data['id'], asset, data)
+            else:
+                read_asset_ids.append(asset_id)
+
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def read_asset(asset_id):
+            async with semaphore:
+                return asset_id, await self._read_asset(asset_id)
+
+        tasks = [asyncio.ensure_future(read_asset(asset_id)) for asset_id in read_asset_ids]
+        try:
+            for next_task in asyncio.as_completed(tasks):
+                asset_id, asset = await next_task
+                if asset:
+                    for data in asset_listings[asset_id]:
+                        yield Listing(self, data['id'], asset, data)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _read_asset(self, asset_id: str) -> TAsset:
+        asset = self._get_cached_asset(asset_id)
+        if asset is None:
+            url = self.get_endpoint('meta')
+            read_metadata = await self._call_adapter(self._adapter.read_metadata, asset_id, url)
+            if read_metadata:
+                asset = self._create_asset_from_read(asset_id, read_metadata)
+        return asset
+
+    async def aclose(self) -> None:
+        """
+        Close the default async HTTP client used by this agent.
+
+        """
+        await self._adapter.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    @staticmethod
+    async def resolve_url(url: str, authentication: Authentication = None, http_client: Any = None) -> DDO:
+        """
+
+        Resolves the remote agent ddo using the url of the agent, see :func:`.RemoteAgent.resolve_url`.
+
+        """
+        ddo = None
+        if url:
+            adapter = AsyncRemoteAgentAdapter(http_client)
+            token_cache = get_default_token_cache()
+            token_url = None
+            token = None
+            try:
+                if authentication:
+                    if 'username' in authentication and authentication['username']:
+                        token_url = urljoin(f'{url}/', 'api/v1/auth/token')
+                        username = authentication['username']
+                        password = authentication.get('password', '')
+
+                        def request_token():
+                            return adapter.get_authorization_token(username, password, token_url)
+
+                        token = await token_cache.async_get_token(token_url, username, password, request_token)
+                    elif 'token' in authentication and authentication['token']:
+                        token = authentication['token']
+                try:
+                    ddo = await adapter.get_ddo(url, token)
+                except StarfishRemoteAgentUnauthorized:
+                    if token_url is None:
+                        return None
+                    token_cache.invalidate(token_url, username, password, token)
+                    token = await token_cache.async_get_token(token_url, username, password, request_token)
+                    ddo = await adapter.get_ddo(url, token)
+            finally:
+                await adapter.aclose()
+        return ddo
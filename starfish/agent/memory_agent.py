@@ -4,13 +4,23 @@ Memory Agent class to provide basic functionality for Ocean Agents
 
 """
 
-import json
-import re
 import secrets
-from typing import Any
+import threading
+from typing import (
+    Any,
+    List
+)
 
 from starfish.agent.agent_base import AgentBase
+from starfish.asset import (
+    DataAsset,
+    create_asset_from_metadata_text
+)
 from starfish.listing import Listing
+from starfish.middleware.store import (
+    DictStore,
+    StoreBase
+)
 from starfish.network.ddo import DDO
 from starfish.network.did import (
     decode_to_asset_id,
@@ -23,6 +33,7 @@ from starfish.types import (
     TListing
 )
 from starfish.utils.crypto_hash import hash_sha3_256
+from starfish.utils.search_index import SearchIndex
 
 
 class MemoryAgent(AgentBase):
@@ -32,22 +43,41 @@ class MemoryAgent(AgentBase):
 
     :param ddo: ddo to access the agent
     :type ddo: :class:`.DDO`
+    :param store: Optional store to hold the assets, listings and purchases, defaults to a :class:`.DictStore`.
+        If the store is a file store such as :class:`.SQLiteStore`, then all of the data is kept after a restart.
+    :type store: :class:`.StoreBase`
+
+    For example::
+
+        agent = MemoryAgent(store=SQLiteStore('memory_agent.db'))
 
     """
 
-    def __init__(self, ddo: DDO = None) -> None:
+    def __init__(self, ddo: DDO = None, store: StoreBase = None) -> None:
+
+        if store is None:
+            store = DictStore()
+        self._store = store
 
         if ddo is None:
-            did = did_generate_random()
+            # use the same did after a restart, so that the saved asset dids are still valid
+            did = store.get('agent', 'did') or did_generate_random()
             ddo = DDO(did)
+        store.set('agent', 'did', ddo.did)
 
         AgentBase.__init__(self, ddo=ddo)
 
-        self._memory = {
-            'listing': {},
-            'asset': {},
-            'purchase': {}
-        }
+        self._listing_index = SearchIndex()
+        for listing_id, record in store.items('listing'):
+            self._listing_index.add(listing_id, record['data'])
+
+        # purchase ids indexed by account address, asset id and both
+        self._purchase_index_lock = threading.Lock()
+        self._account_purchases = {}
+        self._asset_purchases = {}
+        self._account_asset_purchases = {}
+        for purchase_id, record in store.items('purchase'):
+            self._add_purchase_index(purchase_id, record)
 
     def register_asset(self, asset: TAsset) -> TAsset:
         """
@@ -64,10 +94,48 @@ class MemoryAgent(AgentBase):
         asset_id = hash_sha3_256(asset.metadata_text)
         did = f'{self._ddo.did}/{asset_id}'
 
-        self._memory['asset'][did] = asset
+        if isinstance(asset, DataAsset) and asset.has_data:
+            self._store.set('asset_data', asset_id, asset.data)
+        self._store.set('asset', asset_id, {'metadata_text': asset.metadata_text})
         asset.set_did(did)
         return asset
 
+    def get_asset(self, asset_did_id: str) -> TAsset:
+        """
+
+        Return an asset that has been registered with this agent.
+
+        :param str asset_did_id: asset did or asset id of the asset
+
+        :return: the registered asset, with any data, or None if the asset is not found
+        :type: :class:`.AssetBase` class
+
+        """
+        asset_id = decode_to_asset_id(asset_did_id)
+        record = self._store.get('asset', asset_id)
+        if record is None:
+            return None
+        asset = create_asset_from_metadata_text(record['metadata_text'])
+        if isinstance(asset, DataAsset):
+            asset = DataAsset(record['metadata_text'], data=self._store.get('asset_data', asset_id))
+        asset.set_did(f'{self._ddo.did}/{asset_id}')
+        return asset
+
+    def get_asset_data_size(self, asset_did_id: str) -> int:
+        """
+
+        Return the size of the data held by this agent for an asset.
+
+        :param str asset_did_id: asset did or asset id of the data asset
+
+        :return: size of the data in bytes, or None if the agent does not have the data
+
+        """
+        data = self._store.get('asset_data', decode_to_asset_id(asset_did_id))
+        if data is None:
+            return None
+        return len(data)
+
     def create_listing(self, listing_data: ListingData, asset_did: str) -> TListing:
         """
 
@@ -85,7 +153,7 @@ class MemoryAgent(AgentBase):
             listing_data['listing_id'] = listing_id,
             listing_data['asset_did'] = asset_did
             listing = Listing(self, listing_id, asset_did, listing_data)
-            self._memory['listing'][listing_id] = listing
+            self._save_listing(listing)
         return listing
 
     def update_listing(self, listing: TListing) -> None:
@@ -97,7 +165,7 @@ class MemoryAgent(AgentBase):
         :type listing: :class:`.Listing` class
 
         """
-        self._memory['listing'][listing.listing_id] = listing
+        self._save_listing(listing)
 
     def validate_asset(self, asset: TAsset) -> bool:
         """
@@ -121,36 +189,40 @@ class MemoryAgent(AgentBase):
 
         """
         listing = None
-        if listing_id in self._memory['listing']:
-            listing = self._memory['listing'][listing_id]
+        record = self._store.get('listing', listing_id)
+        if record:
+            listing = Listing(self, listing_id, record['asset_did'], record['data'])
         return listing
 
-    def search_listings(self, text: str, sort: str = None, offset: int = 100, page: int = 0) -> Any:
+    def search_listings(self, text: str, sort: str = None, offset: int = None, page: int = 0) -> Any:
         """
 
         Search for listings with the givien 'text'
 
-        :param str text: Text to search all listing data for.
-        :param sort: sort the results ( defaults: None, no sort).
+        :param str text: Regular expression to search all listing data for. Plain words are found using an index
+            of the words in each listing, with the same results as matching the text against all of the listings.
+        :param sort: Name of the listing data field to sort the results, start the name with '-'
+            to sort in reverse order ( defaults: None, the order the listings were created ).
         :type sort: str or None
-        :param int offset: Return the result from with the maximum record count ( defaults: 100 ).
+        :param int offset: Return the result from with the maximum record count ( defaults: None, all of the results ).
         :param int page: Returns the page number based on the offset.
 
-        :return: a list of listing objects found using the search.
-        :type: :class:`.Listing` objects
+        :return: a list of listing ids found using the search.
+        :type: list of str
 
         For example::
 
             # return the 300 -> 399 records in the search for the text 'weather' in the metadata.
-            my_result = agent.search_registered_assets('weather', None, 100, 3)
+            my_result = agent.search_listings('weather', None, 100, 3)
 
         """
-        listing_id_list = []
-        for listing_id, listing in self._memory['listing'].items():
-            if re.search(text, json.dumps(listing.data)):
-                listing_id_list.append(listing.listing_id)
-
-        return listing_id_list
+        listing_id_list = self._listing_index.search(text)
+        if sort:
+            listing_id_list = self._listing_index.sort(listing_id_list, sort.lstrip('-'), sort.startswith('-'))
+        if offset is None:
+            return listing_id_list
+        start = max(0, page) * offset
+        return listing_id_list[start:start + offset]
 
     def purchase_asset(self, listing: Any, account: Any) -> Any:
         """
@@ -168,7 +240,13 @@ class MemoryAgent(AgentBase):
         purchase_id = secrets.token_hex(64)
         if purchase_id:
             purchase = Purchase(self, listing, purchase_id, account)
-            self._memory['purchase'][purchase_id] = (purchase, account.address)
+            record = {
+                'listing_id': listing.listing_id,
+                'asset_did': listing.asset_did,
+                'account_address': account.address
+            }
+            self._store.set('purchase', purchase_id, record)
+            self._add_purchase_index(purchase_id, record)
 
         return purchase
 
@@ -190,35 +268,75 @@ class MemoryAgent(AgentBase):
         Check to see if the account and purchase_id have access to the assed data.
 
 
-        :param asset: Asset to check for access.
-        :type asset: :class:`.Asset` object
+        :param asset: Asset or asset DID to check for access.
+        :type asset: :class:`.Asset` object or str
         :param account: Ocean account to purchase the asset.
         :type account: :class:`.Account` object to use for registration.
-        :param str purchase_id: purchase id that was used to purchase the asset.
+        :param str purchase_id: purchase id that was used to purchase the asset, if None then any purchase
+            of the asset by the account gives access.
 
         :return: True if the asset can be accessed and consumed.
         :type: boolean
         """
 
-        if purchase_id in self._memory['purchase']:
-            purchase, account_address = self._memory['purchase'][purchase_id]
-            return purchase and account.is_address_equal(account_address)
+        if purchase_id:
+            record = self._store.get('purchase', purchase_id)
+            return bool(record) and account.is_address_equal(record['account_address'])
+
+        asset_key = MemoryAgent._to_asset_key(asset)
+        if asset_key is None:
+            return False
+        return bool(self._account_asset_purchases.get((MemoryAgent._to_address_key(account.address), asset_key)))
+
+    def is_access_granted_for_assets(self, assets: List[Any], account: Any) -> List[bool]:
+        """
+
+        Check to see if the account has purchased each of the assets.
+
+        :param list assets: list of assets or asset DIDs to check for access.
+        :param account: Ocean account that purchased the assets.
+        :type account: :class:`.Account` object
+
+        :return: list of True or False for each asset, in the same order as the assets
+        :type: list
 
-        return False
+        """
+        address_key = MemoryAgent._to_address_key(account.address)
+        account_asset_purchases = self._account_asset_purchases
+        asset_keys = [MemoryAgent._to_asset_key(asset) for asset in assets]
+        return [asset_key is not None and bool(account_asset_purchases.get((address_key, asset_key))) for asset_key in asset_keys]
 
     def get_asset_purchase_ids(self, asset: Any) -> Any:
         """
 
         Returns as list of purchase id's that have been used for this asset
 
-        :param asset: DataAsset to return purchase details.
-        :type asset: :class:`.DataAsset` object
+        :param asset: DataAsset or asset DID to return purchase details.
+        :type asset: :class:`.DataAsset` object or str
 
         :return: list of purchase ids
         :type: list
 
         """
-        return []
+        asset_key = MemoryAgent._to_asset_key(asset)
+        if asset_key is None:
+            return []
+        return list(self._asset_purchases.get(asset_key, ()))
+
+    def get_account_purchase_ids(self, account: Any) -> List[str]:
+        """
+
+        Returns as list of purchase id's that have been made by an account
+
+        :param account: Account that made the purchases.
+        :type account: :class:`.Account` object or address str
+
+        :return: list of purchase ids
+        :type: list
+
+        """
+        address = account if isinstance(account, str) else account.address
+        return list(self._account_purchases.get(MemoryAgent._to_address_key(address), ()))
 
     def consume_asset(self, listing: Any, account: Any, purchase_id: str) -> bool:
         """
@@ -235,4 +353,43 @@ class MemoryAgent(AgentBase):
         :type: boolean
 
         """
-        return purchase_id in self._memory['purchase']
+        return bool(purchase_id) and self._store.has('purchase', purchase_id)
+
+    @property
+    def store(self) -> StoreBase:
+        """
+        :return: the store that holds the assets, listings and purchases
+        :type: :class:`.StoreBase`
+        """
+        return self._store
+
+    def _add_purchase_index(self, purchase_id, record):
+        address_key = MemoryAgent._to_address_key(record['account_address'])
+        asset_key = MemoryAgent._to_asset_key(record['asset_did'])
+        index_keys = [(self._account_purchases, address_key)]
+        if asset_key is not None:
+            index_keys.append((self._asset_purchases, asset_key))
+            index_keys.append((self._account_asset_purchases, (address_key, asset_key)))
+        with self._purchase_index_lock:
+            # the purchase id lists are replaced and not changed, so they can be read without the lock
+            for index, key in index_keys:
+                index[key] = index.get(key, ()) + (purchase_id, )
+
+    @staticmethod
+    def _to_address_key(address):
+        return address.lower()
+
+    @staticmethod
+    def _to_asset_key(asset):
+        # return None for an invalid asset DID or asset id, so that no purchases are found for it
+        if not isinstance(asset, str):
+            asset = getattr(asset, 'did', None) or getattr(asset, 'asset_id', None)
+        try:
+            asset_id = decode_to_asset_id(asset)
+        except (TypeError, ValueError):
+            return None
+        return asset_id.lower() if asset_id else None
+
+    def _save_listing(self, listing):
+        self._store.set('listing', listing.listing_id, {'asset_did': listing.asset_did, 'data': listing.data})
+        self._listing_index.add(listing.listing_id, listing.data)
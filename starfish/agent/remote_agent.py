@@ -6,11 +6,17 @@ In starfish-java, this is named as `RemoteAgent`
 
 """
 
+import copy
 import logging
 import time
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    as_completed
+)
 from typing import (
     Any,
     Generic,
+    Iterator,
     List,
     Union
 )
@@ -29,11 +35,20 @@ from starfish.asset import (
 )
 from starfish.exceptions import (
     StarfishAssetInvalid,
-    StarfishRemoteAgentInvalidAccess
+    StarfishRemoteAgentInvalidAccess,
+    StarfishRemoteAgentUnauthorized
 )
 from starfish.job import Job
 from starfish.listing import Listing
-from starfish.middleware.agent.remote_agent_adapter import RemoteAgentAdapter
+from starfish.middleware.agent.authorization_token_cache import (
+    AuthorizationTokenCache,
+    get_default_token_cache
+)
+from starfish.middleware.agent.metadata_cache import MetadataCache
+from starfish.middleware.agent.remote_agent_adapter import (
+    DEFAULT_CHUNK_SIZE,
+    RemoteAgentAdapter
+)
 from starfish.network.account_base import AccountBase
 from starfish.network.ddo import DDO
 from starfish.network.did import (
@@ -47,6 +62,10 @@ from starfish.types import (
     TAsset,
     TRemoteAgent
 )
+from starfish.utils.data_stream import (
+    iter_hash_verified,
+    open_atomic_file
+)
 
 SUPPORTED_SERVICES = {
     'meta': 'DEP.Meta.v1',
@@ -58,6 +77,8 @@ SUPPORTED_SERVICES = {
     'collection': 'DEP.Collection.v1',
 }
 
+# number of concurrent metadata reads from the agent when listing assets
+DEFAULT_READ_WORKERS = 8
 
 logger = logging.getLogger(__name__)
 
@@ -78,10 +99,28 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
             password
             token
 
+    :param http_client: HTTP Client libray to use to make requests, this defaults to the shared HTTPSessionPool.
+    :param metadata_cache: Optional cache of asset metadata read from this agent, if not set then each agent
+        has it's own :class:`.MetadataCache`.
+    :param token_cache: Optional cache of authorization tokens, this defaults to the shared
+        :class:`.AuthorizationTokenCache`, which is also used by :meth:`resolve_url`.
+    :param adapter: Optional adapter to make the HTTP calls, so that many agent objects for the same
+        agent can share one adapter. If not set then a new adapter is created using `http_client`.
+        Setting :attr:`http_client` gives this agent a copy of the adapter, so the other agents are not changed.
+
     """
     service_types = SUPPORTED_SERVICES
+    adapter_class = RemoteAgentAdapter
 
-    def __init__(self, ddo: DDO, authentication: Authentication = None, http_client: Any = None) -> None:
+    def __init__(
+        self,
+        ddo: DDO,
+        authentication: Authentication = None,
+        http_client: Any = None,
+        metadata_cache: MetadataCache = None,
+        token_cache: AuthorizationTokenCache = None,
+        adapter: RemoteAgentAdapter = None
+    ) -> None:
         self._authentication = authentication
 
         if isinstance(ddo, str):
@@ -92,7 +131,15 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
             raise ValueError(f'Unknown ddo type {ddo}')
         AgentBase.__init__(self, ddo)
 
-        self._adapter = RemoteAgentAdapter(http_client)
+        if adapter is None:
+            adapter = self.adapter_class(http_client)
+        self._adapter = adapter
+        if metadata_cache is None:
+            metadata_cache = MetadataCache()
+        self._metadata_cache = metadata_cache
+        if token_cache is None:
+            token_cache = get_default_token_cache()
+        self._token_cache = token_cache
 
     @staticmethod
     def load(
@@ -111,7 +158,7 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
 
         :param str agent_did_or_url DID or URL of the agent to load.
         :param Authentiaciton authentication Optional Authenentication object to use to access the new agent.
-        :param http_client: HTTP Client libray to use to make requests, this defaults to requests library.
+        :param http_client: HTTP Client libray to use to make requests, this defaults to the shared HTTPSessionPool.
 
         :return: A RemoteAgent Object or None if the agent cannot be accessed or cannot be found at the url.
 
@@ -149,7 +196,7 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         :param register_account: Account object to use to register the agent ddo
         :param ddo: DDO object to use to register on the network
         :param authentication: Authentication data needed to access this agent
-        :param http_client: HTTP Client libray to use to make requests, this defaults to requests library.
+        :param http_client: HTTP Client libray to use to make requests, this defaults to the shared HTTPSessionPool.
 
         :return: RemoteAgent object that has been registered on the network
         """
@@ -183,8 +230,7 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
             raise ValueError('The agent must have a valid ddo')
 
         url = self.get_endpoint('meta')
-        authorization_token = self.get_authorization_token()
-        register_data = self._adapter.register_asset(asset.metadata_text, url, authorization_token)
+        register_data = self._call_adapter(self._adapter.register_asset, asset.metadata_text, url)
         if register_data:
             asset_id = register_data['asset_id']
             if asset.asset_id != asset_id:
@@ -193,6 +239,7 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
                 )
             did = f'{self._ddo.did}/{asset_id}'
             asset.set_did(did)
+            self._metadata_cache.add(asset_id, asset.metadata_text, is_valid=True)
         return asset
 
     def create_listing(self, listing_data: ListingData, asset_did: str) -> Listing:
@@ -223,10 +270,9 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
             raise ValueError('You must provide a dict as the listing data')
 
         url = self.get_endpoint('market')
-        authorization_token = self.get_authorization_token()
 
         asset_id = decode_to_asset_id(asset_did)
-        data = self._adapter.create_listing(listing_data, asset_id, url, authorization_token)
+        data = self._call_adapter(self._adapter.create_listing, listing_data, asset_id, url)
         listing = Listing(self, data['id'], asset_did, data)
         return listing
 
@@ -240,9 +286,8 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
 
         """
         url = self.get_endpoint('market')
-        authorization_token = self.get_authorization_token()
 
-        return self._adapter.update_listing(listing.listing_id, listing.data, url, authorization_token)
+        return self._call_adapter(self._adapter.update_listing, listing.listing_id, listing.data, url)
 
     def validate_asset(self, asset: TAsset) -> bool:
         """
@@ -259,14 +304,30 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         if not isinstance(asset, DataAsset):
             raise TypeError('Only DataAsset is supported')
 
-        if not asset.data:
+        if not asset.has_data:
             raise ValueError('No data to upload')
 
         url = self.get_endpoint('storage')
-        authorization_token = self.get_authorization_token()
         asset_id = remove_0x_prefix(asset.asset_id)
 
-        return self._adapter.upload_asset_data(asset_id, asset.data, url, authorization_token)
+        # stream the data from the asset data source, without reading a file into memory
+        with asset.data_source.open_view() as data:
+            return self._call_adapter(self._adapter.upload_asset_data, asset_id, data, url)
+
+    def get_asset_data_size(self, asset_did_id: str) -> int:
+        """
+        Return the size of the data held by the agent for an asset, without downloading the data.
+
+        :param str asset_did_id: Asset id or asset did of the data asset
+
+        :return: size of the data in bytes, or None if the agent does not have the data
+
+        """
+        asset_id = decode_to_asset_id(asset_did_id)
+        if not asset_id:
+            raise ValueError(f'{asset_did_id} is not an asset id or asset did')
+        url = self.get_endpoint('storage')
+        return self._call_adapter(self._adapter.get_asset_data_size, asset_id, url)
 
     def download_asset(self, asset_did_id: str) -> TAsset:
         """
@@ -280,13 +341,12 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         """
 
         url = self.get_endpoint('storage')
-        authorization_token = self.get_authorization_token()
 
         asset_id = decode_to_asset_id(asset_did_id)
         if not asset_id:
             raise ValueError(f'{asset_did_id} is not an asset id or asset did')
 
-        data = self._adapter.download_asset(asset_id, url, authorization_token)
+        data = self._call_adapter(self._adapter.download_asset, asset_id, url)
         store_asset = self.get_asset(asset_id)
         asset = DataAsset(
             store_asset.metadata_text,
@@ -295,6 +355,54 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         asset.set_did(store_asset.did)
         return asset
 
+    def download_asset_stream(self, asset_did_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Download the asset data as a stream of chunks, so that the data is never held in memory.
+        The data is checked against the `contentHash` in the asset metadata as it's read, if the data
+        is not valid then :class:`.StarfishAssetInvalid` is raised after the last chunk.
+
+        :param str asset_did_id: Asset id or asset did to download
+        :param int chunk_size: Maximum size of each chunk
+
+        :return: iterator of bytes
+
+        For example::
+
+            for chunk in agent.download_asset_stream(asset.did):
+                output_stream.write(chunk)
+
+        """
+        store_asset = self.get_asset(asset_did_id)
+        return self._download_asset_stream(store_asset, chunk_size)
+
+    def download_asset_to_file(self, asset_did_id: str, filename_or_stream: Any, chunk_size: int = DEFAULT_CHUNK_SIZE) -> TAsset:
+        """
+        Download the asset data directly to a file or stream, without holding the data in memory.
+
+        :param str asset_did_id: Asset id or asset did to download
+        :param filename_or_stream: Filename or writable stream to save the data. A file is only created
+            if all of the data has been downloaded, and the data matches the `contentHash` of the asset.
+        :param int chunk_size: Maximum size of each chunk
+
+        :return: the asset, without the data
+        :type: :class:`.DataAsset` class
+
+        For example::
+
+            asset = agent.download_asset_to_file(asset.did, '/tmp/large_file.dat')
+
+        """
+        store_asset = self.get_asset(asset_did_id)
+        chunks = self._download_asset_stream(store_asset, chunk_size)
+        if hasattr(filename_or_stream, 'write'):
+            for chunk in chunks:
+                filename_or_stream.write(chunk)
+        else:
+            with open_atomic_file(filename_or_stream) as fp:
+                for chunk in chunks:
+                    fp.write(chunk)
+        return store_asset
+
     def get_listing(self, listing_id: str) -> Listing:
         """
         Return an listing on the listings id.
@@ -307,15 +415,11 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         """
         listing = None
         url = self.get_endpoint('market')
-        authorization_token = self.get_authorization_token()
 
-        data = self._adapter.get_listing(listing_id, url, authorization_token)
+        data = self._call_adapter(self._adapter.get_listing, listing_id, url)
         if data:
-            asset_id = data['assetid']
-            url = self.get_endpoint('meta')
-            read_metadata = self._adapter.read_metadata(asset_id, url, authorization_token)
-            if read_metadata:
-                asset = self._create_asset_from_read(asset_id, read_metadata)
+            asset = self._read_asset(data['assetid'])
+            if asset:
                 listing = Listing(self, data['id'], asset, data)
         return listing
 
@@ -330,36 +434,41 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         :type: :class:`.AssetBase` class
 
         """
-        asset = None
         asset_id = decode_to_asset_id(asset_did_id)
-        url = self.get_endpoint('meta')
-        authorization_token = self.get_authorization_token()
-        read_metadata = self._adapter.read_metadata(asset_id, url, authorization_token)
-        if read_metadata:
-            asset = self._create_asset_from_read(asset_id, read_metadata)
-        return asset
+        return self._read_asset(asset_id)
 
-    def get_listings(self) -> List[ListingData]:
+    def get_listings(self, max_workers: int = DEFAULT_READ_WORKERS) -> List[Listing]:
         """
         Returns all listings
 
-        :return: List of listing objects
+        :param int max_workers: Maximum number of concurrent metadata reads from the agent.
+
+        :return: List of listing objects, in the same order as returned by the agent
 
         """
-        listings = []
-        url = self.get_endpoint('market')
-        authorization_token = self.get_authorization_token()
-        listings_data = self._adapter.get_listings(url, authorization_token)
-        if listings_data:
-            for data in listings_data:
-                asset_id = data['assetid']
-                url = self.get_endpoint('meta')
-                read_metadata = self._adapter.read_metadata(asset_id, url, authorization_token)
-                if read_metadata:
-                    asset = self._create_asset_from_read(asset_id, read_metadata)
-                    listing = Listing(self, data['id'], asset, data)
-                    listings.append(listing)
-        return listings
+        listings = {}
+        listings_data = self._read_listings_data()
+        for listing in self._iter_listings_data(listings_data, max_workers):
+            listings[listing.listing_id] = listing
+        return [listings[data['id']] for data in listings_data if data['id'] in listings]
+
+    def iter_listings(self, max_workers: int = DEFAULT_READ_WORKERS) -> Iterator[Listing]:
+        """
+        Returns a generator of all of the listings, each listing is returned as soon as it's
+        asset metadata has been read from the agent.
+
+        :param int max_workers: Maximum number of concurrent metadata reads from the agent.
+
+        :return: generator of listing objects, in the order that the asset metadata was read
+
+        For example::
+
+            for listing in agent.iter_listings():
+                print(listing.listing_id)
+
+        """
+        listings_data = self._read_listings_data()
+        return self._iter_listings_data(listings_data, max_workers)
 
     def get_job(self, job_id: str) -> Job:
         """
@@ -374,8 +483,7 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         """
         job = None
         url = self.get_endpoint('invoke', 'jobs')
-        authorization_token = self.get_authorization_token()
-        data = self._adapter.get_job(job_id, url, authorization_token)
+        data = self._call_adapter(self._adapter.get_job, job_id, url)
         if data:
             status = data.get('status', None)
             outputs = data.get('outputs', None)
@@ -457,8 +565,7 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         if agreement:
             purchase['agreement'] = agreement
         url = self.get_endpoint('market')
-        authorization_token = self.get_authorization_token()
-        return self._adapter.purchase_asset(purchase, url, authorization_token)
+        return self._call_adapter(self._adapter.purchase_asset, purchase, url)
 
     def is_access_granted_for_asset(self, asset: Any, account: Any, purchase_id: str = None) -> bool:
         """
@@ -545,16 +652,14 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
             inputs = {}
 
         url = self.get_endpoint('invoke', mode_type)
-        authorization_token = self.get_authorization_token()
-        response = self._adapter.invoke(remove_0x_prefix(asset.asset_id), inputs, url, authorization_token)
+        response = self._call_adapter(self._adapter.invoke, remove_0x_prefix(asset.asset_id), inputs, url)
         return response
 
     def get_collection_items(self, name=None):
         url = self.get_endpoint('collection')
         if not url:
             return None
-        authorization_token = self.get_authorization_token()
-        response = self._adapter.get_collection_items(url, name, authorization_token)
+        response = self._call_adapter(self._adapter.get_collection_items, url, name)
         return response
 
     def add_collection_items(self, name, asset_list):
@@ -563,8 +668,7 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         url = self.get_endpoint('collection')
         if not url:
             return None
-        authorization_token = self.get_authorization_token()
-        response = self._adapter.add_collection_items(url, name, asset_list, authorization_token)
+        response = self._call_adapter(self._adapter.add_collection_items, url, name, asset_list)
         return response
 
     def remove_collection_items(self, name, asset_list):
@@ -573,26 +677,31 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         url = self.get_endpoint('collection')
         if not url:
             return None
-        authorization_token = self.get_authorization_token()
-        response = self._adapter.remove_collection_items(url, name, asset_list, authorization_token)
+        response = self._call_adapter(self._adapter.remove_collection_items, url, name, asset_list)
         return response
 
     def get_authorization_token(self) -> str:
+        """
+        Return the authorization token to access this agent. If a username and password are used, the
+        token is read from the token cache, and is only requested from the agent when it is not in the cache.
+
+        :return: token string or None if the agent does not need a token
+        """
 
         if self._authentication and 'token' in self._authentication:
             if self._authentication['token']:
                 return self._authentication['token']
 
-        try:
-            url = self.get_endpoint('auth', 'token')
-        except ValueError:
-            url = None
+        url = self._get_token_url()
         token = None
-        if url and self._authentication and 'username' in self._authentication:
-            token = self._adapter.get_authorization_token(
-                self._authentication['username'],
-                self._authentication.get('password', ''),
-                url
+        if url:
+            username = self._authentication['username']
+            password = self._authentication.get('password', '')
+            token = self._token_cache.get_token(
+                url,
+                username,
+                password,
+                lambda: self._adapter.get_authorization_token(username, password, url)
             )
             if token is None:
                 raise StarfishRemoteAgentInvalidAccess(f'Unable to obtain a token from {url}')
@@ -601,8 +710,7 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
 
     def get_metadata_list(self) -> Any:
         url = self.get_endpoint('meta')
-        authorization_token = self.get_authorization_token()
-        return self._adapter.get_metadata_list(url, authorization_token)
+        return self._call_adapter(self._adapter.get_metadata_list, url)
 
     def search_asset(self, filter_values: Any) -> List[str]:
         """
@@ -648,14 +756,119 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         data = did_parse(did)
         return data['path'] and data['id_hex']
 
+    def _call_adapter(self, method: Any, *args: Any) -> Any:
+        # call the adapter method with the authorization token, if the agent rejects the token
+        # then get a new token and try once more
+        authorization_token = self.get_authorization_token()
+        try:
+            return method(*args, authorization_token)
+        except StarfishRemoteAgentUnauthorized:
+            if not self._invalidate_authorization_token(authorization_token):
+                raise
+            logger.debug('authorization token rejected by the agent, requesting a new token')
+            return method(*args, self.get_authorization_token())
+
+    def _invalidate_authorization_token(self, authorization_token: str) -> bool:
+        url = self._get_token_url()
+        if url is None or authorization_token is None:
+            return False
+        self._token_cache.invalidate(
+            url,
+            self._authentication['username'],
+            self._authentication.get('password', ''),
+            authorization_token
+        )
+        return True
+
+    def _get_token_url(self) -> str:
+        # only agents accessed with a username can request new tokens
+        if not self._authentication or not self._authentication.get('username'):
+            return None
+        try:
+            return self.get_endpoint('auth', 'token')
+        except ValueError:
+            return None
+
+    def _download_asset_stream(self, store_asset: TAsset, chunk_size: int) -> Iterator[bytes]:
+        if not isinstance(store_asset, DataAsset):
+            raise TypeError('Only DataAsset is supported')
+        url = self.get_endpoint('storage')
+        asset_id = remove_0x_prefix(store_asset.asset_id)
+        chunks = self._call_adapter(self._adapter.download_asset_stream, asset_id, url, chunk_size)
+        return iter_hash_verified(chunks, store_asset.metadata.get('contentHash'), store_asset.did)
+
+    def _read_listings_data(self) -> List[ListingData]:
+        url = self.get_endpoint('market')
+        listings_data = self._call_adapter(self._adapter.get_listings, url)
+        return listings_data or []
+
+    def _iter_listings_data(
+        self,
+        listings_data: List[ListingData],
+        max_workers: int = DEFAULT_READ_WORKERS
+    ) -> Iterator[Listing]:
+        if not listings_data:
+            return
+        # many listings can be for the same asset, so only read each asset once
+        asset_listings = {}
+        for data in listings_data:
+            asset_listings.setdefault(data['assetid'], []).append(data)
+
+        # assets in the metadata cache do not need to be read from the agent
+        read_asset_ids = []
+        for asset_id in asset_listings.keys():
+            asset = self._get_cached_asset(asset_id)
+            if asset:
+                for data in asset_listings[asset_id]:
+                    yield Listing(self, data['id'], asset, data)
+            else:
+                read_asset_ids.append(asset_id)
+        if not read_asset_ids:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(read_asset_ids))))
+        futures = {}
+        try:
+            for asset_id in read_asset_ids:
+                futures[executor.submit(self._read_asset, asset_id)] = asset_id
+            for future in as_completed(futures):
+                asset = future.result()
+                if asset:
+                    for data in asset_listings[futures[future]]:
+                        yield Listing(self, data['id'], asset, data)
+        finally:
+            # stop any pending reads if the caller does not read all of the listings
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _read_asset(self, asset_id: str) -> TAsset:
+        asset = self._get_cached_asset(asset_id)
+        if asset is None:
+            url = self.get_endpoint('meta')
+            read_metadata = self._call_adapter(self._adapter.read_metadata, asset_id, url)
+            if read_metadata:
+                asset = self._create_asset_from_read(asset_id, read_metadata)
+        return asset
+
+    def _get_cached_asset(self, asset_id: str) -> TAsset:
+        metadata_text = self._metadata_cache.get(asset_id)
+        if metadata_text is None:
+            return None
+        return self._create_asset(asset_id, metadata_text)
+
     def _create_asset_from_read(self, asset_id: str, read_metadata: Any) -> Any:
-        # check the hash of the reading asset
+        # check the hash of the reading asset, this is only done once before adding to the cache
         asset_id = remove_0x_prefix(asset_id)
         if not is_asset_hash_valid(asset_id, read_metadata['hash']):
             raise StarfishAssetInvalid(f' asset {asset_id} is not valid')
 
-        did = f'{self._ddo.did}/{asset_id}'
         metadata_text = read_metadata['metadata_text']
+        self._metadata_cache.add(asset_id, metadata_text, is_valid=True)
+        return self._create_asset(asset_id, metadata_text)
+
+    def _create_asset(self, asset_id: str, metadata_text: str) -> TAsset:
+        did = f'{self._ddo.did}/{remove_0x_prefix(asset_id)}'
         asset = create_asset_from_metadata_text(metadata_text)
         asset.set_did(did)
         return asset
@@ -698,6 +911,14 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
     def adapter(self):
         return self._adapter
 
+    @property
+    def metadata_cache(self):
+        return self._metadata_cache
+
+    @property
+    def token_cache(self):
+        return self._token_cache
+
     @property
     def authentication(self):
         return self._authentication
@@ -708,18 +929,22 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
 
     @http_client.setter
     def http_client(self, value):
-        """Set the http client to something other than the default `requests`"""
-        self._adapter.http_client = value
+        """Set the http client to something other than the default `HTTPSessionPool`"""
+        # the adapter can be shared with other agents, so only change the client of this agent
+        adapter = copy.copy(self._adapter)
+        adapter.http_client = value
+        self._adapter = adapter
 
     @staticmethod
-    def resolve_url(url: str, authentication: Authentication = None, http_client: Any = None) -> DDO:
+    def resolve_url(url: str, authentication: Authentication = None, http_client: Any = None, timeout: float = None) -> DDO:
         """
 
         Resolves the remote agent ddo using the url of the agent
 
         :param str url: url of the remote agent
         :param Authenentication: Optional authentication object to access the agent
-        :param http_client: HTTP Client libray to use to make requests, this defaults to requests library.
+        :param http_client: HTTP Client libray to use to make requests, this defaults to the shared HTTPSessionPool.
+        :param float timeout: Optional number of seconds to wait for each request to the agent, defaults to no timeout
 
         :return dict: DDO or None if not found
         """
@@ -727,19 +952,32 @@ class RemoteAgent(AgentBase, Generic[TRemoteAgent]):
         ddo = None
         if url:
             adapter = RemoteAgentAdapter(http_client)
+            token_cache = get_default_token_cache()
+            token_url = None
             token = None
             # try to get a token from the agent using the username/password, or from the authentication dict
             if authentication:
                 if 'username' in authentication and authentication['username']:
+                    # use the shared token cache, so that the agent loaded from this url can use the same token
                     token_url = urljoin(f'{url}/', 'api/v1/auth/token')
-                    token = adapter.get_authorization_token(
-                        authentication['username'],
-                        authentication.get('password', ''),
-                        token_url
-                    )
+                    username = authentication['username']
+                    password = authentication.get('password', '')
+
+                    def request_token():
+                        return adapter.get_authorization_token(username, password, token_url, timeout=timeout)
+
+                    token = token_cache.get_token(token_url, username, password, request_token)
                 elif 'token' in authentication and authentication['token']:
                     token = authentication['token']
-            ddo = adapter.get_ddo(url, token)
+            try:
+                ddo = adapter.get_ddo(url, token, timeout=timeout)
+            except StarfishRemoteAgentUnauthorized:
+                if token_url is None:
+                    return None
+                # the cached token has been rejected, so request a new token and try again
+                token_cache.invalidate(token_url, username, password, token)
+                token = token_cache.get_token(token_url, username, password, request_token)
+                ddo = adapter.get_ddo(url, token, timeout=timeout)
         return ddo
 
     @staticmethod
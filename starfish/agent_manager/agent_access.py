@@ -5,13 +5,15 @@
 
 
 """
-import hashlib
 import json
 import logging
+import threading
+from collections import OrderedDict
 
 
 from starfish.agent import RemoteAgent
 from starfish.exceptions import StarfishConnectionError
+from starfish.middleware.agent.metadata_cache import MetadataCache
 from starfish.network.ddo import DDO
 from starfish.network.did import (
     did_to_id,
@@ -20,6 +22,9 @@ from starfish.network.did import (
 
 logger = logging.getLogger(__name__)
 
+# maximum number of agent objects held in the agent cache of each agent access record
+DEFAULT_AGENT_CACHE_SIZE = 32
+
 
 class AgentAccess:
 
@@ -33,7 +38,8 @@ class AgentAccess:
         username=None,
         password=None,
         token=None,
-        http_client=None
+        http_client=None,
+        agent_cache_size=DEFAULT_AGENT_CACHE_SIZE
     ):
         """
         Create an agent access record. This record tries to obtain all the nesseray information needed to resolve
@@ -47,8 +53,12 @@ class AgentAccess:
         :param str username: username to access the agent, this can also be in the authentication.
         :param str password: password to access the agent, this can also be in the authentication.
         :param str token: token to access the agent, this can also be in the authentication.
+        :param int agent_cache_size: Maximum number of agent objects to cache, one for each different authentication.
+            The least recently used agent is removed when the cache is full.
 
         """
+        if agent_cache_size < 1:
+            raise ValueError('agent_cache_size must be at least 1')
         ddo = None
         if ddo_text:
             ddo = DDO.import_from_text(ddo_text)
@@ -71,23 +81,32 @@ class AgentAccess:
         self._ddo = ddo
         self._did = did
         self._authentication = authentication
-        self._agent_cache = {}
         self._http_client = http_client
+        self._agent_cache = OrderedDict()
+        self._agent_cache_size = agent_cache_size
+        self._agent_cache_lock = threading.Lock()
+        self._agent_cache_hits = 0
+        self._agent_cache_misses = 0
+        self._agent_cache_evictions = 0
+        # the cached agents all use the same endpoint, so share one adapter and metadata cache
+        self._adapter = None
+        self._metadata_cache = None
 
     @staticmethod
-    def resolve_agent_url(url, authentication=None, http_client=None):
+    def resolve_agent_url(url, authentication=None, http_client=None, timeout=None):
         """
         Resolve an agent based on it's url.
 
         :param str url: URL of the agent
         :param dict authentication: Authentication of the agent.
         :param object http_client: HTTP client to use to access the agent api
+        :param float timeout: Optional number of seconds to wait for each request to the agent
 
         :returns: DDO object of the remote agent
         """
         logger.debug(f'resolving remote agent did from {url}')
         try:
-            ddo_text = RemoteAgent.resolve_url(url, authentication=authentication, http_client=http_client)
+            ddo_text = RemoteAgent.resolve_url(url, authentication=authentication, http_client=http_client, timeout=timeout)
             if ddo_text:
                 return DDO.import_from_text(ddo_text)
         # ignore connetion errors to remote agents
@@ -105,19 +124,21 @@ class AgentAccess:
 
         :returns: DDO object of the remote agent
         """
-        return network.resolve_did(did)
+        ddo_text = network.resolve_did(did)
+        if ddo_text:
+            return DDO.import_from_text(ddo_text)
 
-    def resolve_url(self):
+    def resolve_url(self, timeout=None):
         """
         Resolve the remote agent using it's URL.
 
-        :param object http_client: HTTP Client to use to access the remote agent api.
+        :param float timeout: Optional number of seconds to wait for each request to the agent
 
         :returns: DDO of the remote agent
 
         """
         if self._url:
-            ddo = AgentAccess.resolve_agent_url(self._url, self._authentication, self._http_client)
+            ddo = AgentAccess.resolve_agent_url(self._url, self._authentication, self._http_client, timeout=timeout)
             if ddo:
                 self._ddo = ddo
                 self._did = ddo.did
@@ -167,33 +188,81 @@ class AgentAccess:
             authentication = self._authentication
         if use_cache:
             cache_key = self.calc_cache_key(authentication)
-            if cache_key not in self._agent_cache:
-                # same method but with no cache
-                self._agent_cache[cache_key] = self.load_agent(authentication, use_cache=False)
-            agent = self._agent_cache[cache_key]
+            with self._agent_cache_lock:
+                agent = self._agent_cache.get(cache_key)
+                if agent is not None:
+                    self._agent_cache.move_to_end(cache_key)
+                    self._agent_cache_hits += 1
+                    return agent
+                self._agent_cache_misses += 1
+            # same method but with no cache
+            agent = self.load_agent(authentication, use_cache=False)
+            with self._agent_cache_lock:
+                self._agent_cache[cache_key] = agent
+                self._agent_cache.move_to_end(cache_key)
+                while len(self._agent_cache) > self._agent_cache_size:
+                    self._agent_cache.popitem(last=False)
+                    self._agent_cache_evictions += 1
         else:
             if self._ddo is None:
-                self.resolve_url(self._http_client)
+                self.resolve_url()
             logger.debug(f'loading remote agent {self._name}: {self._did}')
-            agent = RemoteAgent(self._ddo, authentication=authentication, http_client=self._http_client)
+            with self._agent_cache_lock:
+                if self._adapter is None:
+                    self._adapter = RemoteAgent.adapter_class(self._http_client)
+                    self._metadata_cache = MetadataCache()
+                adapter = self._adapter
+                metadata_cache = self._metadata_cache
+            agent = RemoteAgent(
+                self._ddo,
+                authentication=authentication,
+                http_client=self._http_client,
+                metadata_cache=metadata_cache,
+                adapter=adapter
+            )
 
         return agent
 
     def calc_cache_key(self, authentication=None):
-        key_text = [
-            self._name
-        ]
-        if authentication:
-            key_text.append(json.dumps(authentication))
-        md5hash = hashlib.md5('\n'.join(key_text).encode())
-        return md5hash.hexdigest()
+        """
+        Return the agent cache key for an authentication dict.
+
+        :param dict authentication: authentication dict used to load the agent
+
+        :returns: tuple of the authentication items, or None if no authentication
+        """
+        if not authentication:
+            return None
+        try:
+            key = tuple(sorted(authentication.items()))
+            hash(key)
+        except TypeError:
+            # the authentication has values that cannot be hashed
+            key = (json.dumps(authentication, sort_keys=True), )
+        return key
 
     def clear_cache(self):
         """
-        Clears out the agent cache
+        Clears out the agent cache, and the shared adapter used by the cached agents
+
+        """
+        with self._agent_cache_lock:
+            self._agent_cache = OrderedDict()
+            self._adapter = None
+            self._metadata_cache = None
 
+    @property
+    def agent_cache_stats(self):
+        """
+        :returns: dict of the agent cache stats, hits, misses, evictions and size
         """
-        self._agent_cache = {}
+        with self._agent_cache_lock:
+            return {
+                'hits': self._agent_cache_hits,
+                'misses': self._agent_cache_misses,
+                'evictions': self._agent_cache_evictions,
+                'size': len(self._agent_cache),
+            }
 
     @property
     def name(self):
@@ -222,6 +291,13 @@ class AgentAccess:
     @http_client.setter
     def http_client(self, value):
         self._http_client = value
+        self.clear_cache()
+
+    @ddo.setter
+    def ddo(self, value):
+        self._ddo = value
+        if value:
+            self._did = value.did
 
     def __str__(self):
         return f'{self._name} {self._url} {self._did}'
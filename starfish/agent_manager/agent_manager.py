@@ -4,27 +4,89 @@
 
 
 """
+import logging
+import threading
+import time
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    wait
+)
 
 from starfish.agent import RemoteAgent
 from starfish.agent_manager.agent_access import AgentAccess
+from starfish.middleware.http_session_pool import get_default_session_pool
 from starfish.network.ddo import DDO
+from starfish.network.ddo_cache import (
+    DDOCache,
+    get_default_ddo_cache
+)
 
 LOCAL_AGENT_NAME = '_local_agent'
 
+# number of seconds that a name/did/url that was not found, or an agent that could not be resolved, is not tried again
+DEFAULT_NEGATIVE_CACHE_SECONDS = 60
+
+# maximum number of names/dids/urls held in the negative cache
+NEGATIVE_CACHE_SIZE = 1024
+
+# number of agents that are resolved at the same time
+DEFAULT_RESOLVE_WORKERS = 8
+
+# number of seconds to wait for all of the agents to resolve
+DEFAULT_RESOLVE_TIMEOUT = 30
+
+# number of seconds to wait for each request to an agent while it's resolved
+DEFAULT_RESOLVE_REQUEST_TIMEOUT = 10
+
+logger = logging.getLogger(__name__)
+
 
 class AgentManager:
 
-    def __init__(self, network=None):
+    def __init__(
+        self,
+        network=None,
+        http_client=None,
+        negative_cache_seconds=DEFAULT_NEGATIVE_CACHE_SECONDS,
+        resolve_workers=DEFAULT_RESOLVE_WORKERS,
+        ddo_cache=None,
+        resolve_request_timeout=DEFAULT_RESOLVE_REQUEST_TIMEOUT
+    ):
         """
         Create an agent manager object to resolve agents and keep a list of knwon agents.
         If the list of known agents only have a url, then the agent manager will try
         to resolve the url's to DID's, using the api call to obtain the DDO from the
         remote agents.
 
+        :param Network network: Optional network object to resolve agent DID's
+        :param object http_client: Optional HTTP client to use for all of the agents registered with this manager,
+            if not set then the agents use the shared :class:`.HTTPSessionPool`.
+        :param float negative_cache_seconds: Number of seconds before a name/did/url that was not found, or an agent
+            that could not be resolved, is tried again. Use 0 to always try again.
+        :param int resolve_workers: Number of agents that are resolved at the same time.
+        :param ddo_cache: Optional cache of the resolved agent DDO's, if not set then the default
+            :class:`.DDOCache` is used, if one has been set with `set_default_ddo_cache`.
+        :param float resolve_request_timeout: Number of seconds to wait for each request to an agent
+            while it's resolved, None to wait without a timeout.
+
         """
         self._agent_access_items = {}
         self._local_name = LOCAL_AGENT_NAME
         self._network = network
+        self._http_client = http_client
+        self._negative_cache_seconds = negative_cache_seconds
+        # agent names indexed by normalized url and did id
+        self._url_index = {}
+        self._did_index = {}
+        self._index_lock = threading.RLock()
+        self._not_found_items = {}
+        self._resolve_failures = {}
+        self._resolve_workers = resolve_workers
+        self._resolve_executor = None
+        self._ddo_cache = ddo_cache
+        self._resolve_request_timeout = resolve_request_timeout
+        # futures of the agents that are being resolved, indexed by agent name
+        self._resolve_futures = {}
 
     def register_agents(self, agents, http_client=None):
         """
@@ -115,6 +177,9 @@ class AgentManager:
         if ddo:
             ddo_text = ddo.as_text
 
+        if http_client is None:
+            http_client = self._http_client
+
         agent_access = AgentAccess(
             name,
             ddo_text=ddo_text,
@@ -126,7 +191,7 @@ class AgentManager:
             token=token,
             http_client=http_client
         )
-        self._agent_access_items[name] = agent_access
+        self._add_agent_access(agent_access)
 
     def unregister_agent(self, name_did_url):
         """
@@ -136,9 +201,9 @@ class AgentManager:
         :returns: True if found and removed
 
         """
-        for name, agent_access in self._agent_access_items.items():
-            if agent_access.is_match(name_did_url):
-                del self._agent_access_items[name]
+        with self._index_lock:
+            for agent_access in self._find_index_items(name_did_url):
+                self._remove_agent_access(agent_access.name)
                 return True
         return False
 
@@ -157,8 +222,10 @@ class AgentManager:
 
         if local_name:
             self._local_name = local_name
+        if http_client is None:
+            http_client = self._http_client
         agent_access = AgentAccess(self._local_name, ddo_text=ddo_text, authentication=authentication, http_client=http_client)
-        self._agent_access_items[self._local_name] = agent_access
+        self._add_agent_access(agent_access)
 
     def resolve_agent_url(self, url,  authentication=None, http_client=None):
         """
@@ -171,7 +238,17 @@ class AgentManager:
         :returns: RemoteAgent object if found, else return None
 
         """
-        ddo = AgentAccess.resolve_agent_url(url, authentication=authentication, http_client=http_client)
+        if http_client is None:
+            http_client = self._http_client
+        ddo = self._resolve_cached_ddo(
+            url,
+            lambda: AgentAccess.resolve_agent_url(
+                url,
+                authentication=authentication,
+                http_client=http_client,
+                timeout=self._resolve_request_timeout
+            )
+        )
         if ddo:
             return RemoteAgent(ddo, authentication=authentication, http_client=http_client)
 
@@ -194,7 +271,9 @@ class AgentManager:
             network = self._network
         if not network:
             raise ValueError('No network set to resolve a DID')
-        ddo = AgentAccess.resolve_agent_did(did, network)
+        if http_client is None:
+            http_client = self._http_client
+        ddo = self._resolve_cached_ddo(did, lambda: AgentAccess.resolve_agent_did(did, network))
         if ddo:
             return RemoteAgent(ddo, authentication=authentication, http_client=http_client)
 
@@ -234,21 +313,24 @@ class AgentManager:
 
         :param str name_did_url: name/did or url of the agent to find in the access records
         :param bool auto_resolve: If True then if no agent found, try to resolve all of the agents,
-            and call again with this field set too False.
+            and call again with this field set too False. A name/did/url that is still not found
+            is not resolved again until the negative cache time has passed.
 
         :returns: AgentAccess object if found
         """
 
-        for name, agent_access in self._agent_access_items.items():
-            if agent_access.is_match(name_did_url):
-                # only return if we have a valid DDO
-                if agent_access.ddo:
-                    return agent_access
+        for agent_access in self._find_index_items(name_did_url):
+            # only return if we have a valid DDO
+            if agent_access.ddo:
+                return agent_access
 
-        if auto_resolve:
+        if auto_resolve and not self._is_not_found(name_did_url):
             self.resolve_access_agents()
             # call again but with no auto_resolve
-            return self.find_agent_access(name_did_url, False)
+            agent_access = self.find_agent_access(name_did_url, False)
+            if agent_access is None:
+                self._set_not_found(name_did_url)
+            return agent_access
 
     def is_agent(self, name_did_url):
         """
@@ -261,18 +343,74 @@ class AgentManager:
         """
         return self.find_agent_access(name_did_url) is not None
 
-    def resolve_access_agents(self):
+    def resolve_access_agents(self, timeout=DEFAULT_RESOLVE_TIMEOUT):
         """
         Resolve any agents that have only urls. This calls the agent api
-        to get the DDO and DID from the agent
+        to get the DDO and DID from the agent. An agent that could not be resolved is not
+        tried again until the negative cache time has passed.
+
+        The agents are resolved at the same time, and each agent is recorded as soon as it is resolved.
+
+        :param float timeout: Number of seconds to wait for all of the agents to resolve, measured from when
+            this method is called. An agent that is still waiting for a worker after the timeout is not resolved,
+            an agent that is being resolved is not waited for, but is still recorded if it resolves later.
+            Each agent that has not resolved in time is not tried again until the negative cache time has passed.
+
+        The resolve workers are shut down before this method returns, see :meth:`close`.
+
+        """
+        futures = self._submit_resolve_agents()
+        if not futures:
+            return
+        try:
+            _, pending = wait(futures.keys(), timeout=timeout)
+            for future in pending:
+                name = futures[future]
+                logger.debug(f'timeout resolving agent {name}')
+                with self._index_lock:
+                    if future.cancel() and self._resolve_futures.get(name) is future:
+                        # the agent has not started to resolve, so it can be submitted again
+                        del self._resolve_futures[name]
+                    self._set_cache_item(self._resolve_failures, name)
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Shut down the resolve workers without waiting for them. Agents waiting for a worker are not resolved,
+        an agent that is being resolved is still recorded if it resolves later.
+        New workers are started the next time agents are resolved.
+
+        """
+        with self._index_lock:
+            executor = self._resolve_executor
+            self._resolve_executor = None
+            if executor is None:
+                return
+            executor.shutdown(wait=False, cancel_futures=True)
+            # cancelled agents can be submitted again
+            for name, future in list(self._resolve_futures.items()):
+                if future.cancelled():
+                    del self._resolve_futures[name]
+
+    def warm_up(self):
+        """
+        Start to resolve all of the agents in the background, and return without waiting.
+        This can be called when a service starts, so that the agents are resolved before the first request.
+
+        :returns: list of futures, one for each agent that is being resolved, the result of each future is the DDO
+            or None if the agent could not be resolved.
+
+        The resolve workers keep running until :meth:`close` is called, or the agents are resolved
+        by :meth:`resolve_access_agents`.
+
+        For example::
+
+            agent_manager.register_agents(agent_list)
+            agent_manager.warm_up()
 
         """
-        for name, agent_access in self._agent_access_items.items():
-            if agent_access.ddo is None:
-                if self._network and agent_access.did:
-                    agent_access.resolve_did(self._network)
-                elif agent_access.url:
-                    agent_access.resolve_url()
+        return list(self._submit_resolve_agents().keys())
 
     def set_http_client(self, value):
         """
@@ -281,17 +419,173 @@ class AgentManager:
 
         """
 
-        for name, agent_item in self._agent_access_items.items():
+        self._http_client = value
+        for agent_item in self._get_agent_access_list():
             agent_item.http_client = value
             agent_item.clear_cache()
 
     def clear_cache(self):
         """
-        Clears out the agent items cache.
+        Clears out the agent items cache, and the negative cache of names/dids/urls that were not found.
 
         """
-        for name, agent_item in self._agent_access_items.items():
+        for agent_item in self._get_agent_access_list():
             agent_item.clear_cache()
+        self._clear_negative_cache()
+
+    @staticmethod
+    def to_url_key(url):
+        """
+        Return a normalized url, see :meth:`.DDOCache.to_url_key`.
+
+        """
+        return DDOCache.to_url_key(url)
+
+    @staticmethod
+    def to_did_key(did):
+        """
+        Return the id of a did, see :meth:`.DDOCache.to_did_key`.
+
+        """
+        return DDOCache.to_did_key(did)
+
+    def _resolve_cached_ddo(self, did_url, resolve_ddo):
+        ddo_cache = self.ddo_cache
+        if ddo_cache and did_url:
+            return ddo_cache.resolve(did_url, resolve_ddo)
+        return resolve_ddo()
+
+    def _add_agent_access(self, agent_access):
+        with self._index_lock:
+            if agent_access.name in self._agent_access_items:
+                self._remove_agent_access(agent_access.name)
+            self._agent_access_items[agent_access.name] = agent_access
+            for index, key in ((self._url_index, AgentManager.to_url_key(agent_access.url)),
+                               (self._did_index, AgentManager.to_did_key(agent_access.did))):
+                if key:
+                    index.setdefault(key, []).append(agent_access.name)
+            # the new agent may match a name/did/url that was not found, failures of other agents are kept
+            self._not_found_items = {}
+            self._resolve_failures.pop(agent_access.name, None)
+
+    def _remove_agent_access(self, name):
+        with self._index_lock:
+            self._agent_access_items.pop(name, None)
+            for index in (self._url_index, self._did_index):
+                for key in [key for key, names in index.items() if name in names]:
+                    index[key] = [item for item in index[key] if item != name]
+                    if not index[key]:
+                        del index[key]
+            self._resolve_failures.pop(name, None)
+
+    def _get_agent_access_list(self):
+        # copy of the agent access items, so that the items can be used while agents are added by other threads
+        with self._index_lock:
+            return list(self._agent_access_items.values())
+
+    def _submit_resolve_agents(self):
+        # return a dict of futures for each agent to resolve, an agent that is already being resolved is not
+        # submitted again
+        futures = {}
+        with self._index_lock:
+            for name, agent_access in self._agent_access_items.items():
+                if agent_access.ddo is not None or self._is_cache_item(self._resolve_failures, name):
+                    continue
+                if not (agent_access.url or (self._network and agent_access.did)):
+                    continue
+                future = self._resolve_futures.get(name)
+                if future is None:
+                    if self._resolve_executor is None:
+                        self._resolve_executor = ThreadPoolExecutor(
+                            max_workers=max(1, self._resolve_workers),
+                            thread_name_prefix='agent_resolve'
+                        )
+                    future = self._resolve_executor.submit(self._resolve_agent_access, agent_access)
+                    self._resolve_futures[name] = future
+                futures[future] = name
+        return futures
+
+    def _resolve_agent_access(self, agent_access):
+        # called by a resolve worker, the result is recorded before the future is done
+        name = agent_access.name
+        ddo = None
+        try:
+            if self._network and agent_access.did:
+                ddo = self._resolve_cached_ddo(agent_access.did, lambda: agent_access.resolve_did(self._network))
+            else:
+                ddo = self._resolve_cached_ddo(
+                    agent_access.url,
+                    lambda: agent_access.resolve_url(timeout=self._resolve_request_timeout)
+                )
+            if ddo:
+                agent_access.ddo = ddo
+        except Exception as error:
+            logger.warning(f'cannot resolve agent {name}: {error}')
+        finally:
+            with self._index_lock:
+                self._resolve_futures.pop(name, None)
+                # only record the result if the agent has not been unregistered or replaced
+                if self._agent_access_items.get(name) is agent_access:
+                    if ddo:
+                        # the agent did is now known
+                        self._add_agent_access(agent_access)
+                    else:
+                        self._set_cache_item(self._resolve_failures, name)
+        return ddo
+
+    def _find_index_items(self, name_did_url):
+        # return the agent access items that match by name, then url, then did
+        found_names = []
+        if name_did_url in self._agent_access_items:
+            found_names.append(name_did_url)
+        for index, key in ((self._url_index, AgentManager.to_url_key(name_did_url)),
+                           (self._did_index, AgentManager.to_did_key(name_did_url))):
+            if key:
+                found_names.extend(index.get(key, []))
+        items = []
+        for name in found_names:
+            agent_access = self._agent_access_items.get(name)
+            if agent_access and agent_access not in items:
+                items.append(agent_access)
+        return items
+
+    def _is_not_found(self, name_did_url):
+        return self._is_cache_item(self._not_found_items, name_did_url)
+
+    def _set_not_found(self, name_did_url):
+        self._set_cache_item(self._not_found_items, name_did_url)
+
+    def _is_cache_item(self, items, key):
+        expire_time = items.get(key)
+        if expire_time is None:
+            return False
+        if expire_time < time.monotonic():
+            items.pop(key, None)
+            return False
+        return True
+
+    def _set_cache_item(self, items, key):
+        if self._negative_cache_seconds <= 0 or not isinstance(key, str):
+            return
+        with self._index_lock:
+            while len(items) >= NEGATIVE_CACHE_SIZE:
+                # remove the oldest item
+                del items[next(iter(items))]
+            items[key] = time.monotonic() + self._negative_cache_seconds
+
+    def _clear_negative_cache(self):
+        with self._index_lock:
+            self._not_found_items = {}
+            self._resolve_failures = {}
+
+    @property
+    def ddo_cache(self):
+        """
+        :returns: DDO cache used to resolve agents, or None if resolved DDO's are not cached
+        """
+        if self._ddo_cache is None:
+            return get_default_ddo_cache()
+        return self._ddo_cache
 
     @property
     def local_agent(self):
@@ -305,6 +599,17 @@ class AgentManager:
     def local_agent_name(self):
         return self._local_agent_name
 
+    @property
+    def http_client(self):
+        """
+        Returns the HTTP client used by the agents in this manager, or the shared
+        :class:`.HTTPSessionPool` if no client has been set.
+
+        """
+        if self._http_client is None:
+            return get_default_session_pool()
+        return self._http_client
+
     @property
     def items(self):
         return self._agent_access_items
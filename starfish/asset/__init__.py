@@ -2,8 +2,14 @@ import json
 from eth_utils import remove_0x_prefix
 
 from starfish.asset.asset_base import AssetBase
+from starfish.asset.asset_catalog import AssetCatalog              # noqa: F401
 from starfish.asset.bundle_asset import BundleAsset
 from starfish.asset.data_asset import DataAsset
+from starfish.asset.data_source import (                           # noqa: F401
+    DataSource,
+    FileDataSource,
+    MemoryDataSource
+)
 from starfish.asset.operation_asset import OperationAsset
 from starfish.asset.remote_data_asset import RemoteDataAsset        # noqa: F401
 
@@ -5,6 +5,7 @@
 """
 
 import json
+import warnings
 from abc import ABC
 from typing import (
     Any,
@@ -16,6 +17,152 @@ from starfish.types import TAssetBase
 from starfish.utils.crypto_hash import hash_sha3_256
 
 
+def _set_metadata_changed(value):
+    warnings.warn(
+        'changing asset.metadata is deprecated, use metadata.copy() and asset.set_metadata to change the metadata',
+        DeprecationWarning,
+        stacklevel=3
+    )
+    state = getattr(value, '_state', None)
+    if state is not None:
+        state['is_changed'] = True
+
+
+def _metadata_change_method(base_class, name):
+    # return a method that marks the metadata as changed, and then makes the change
+    method = getattr(base_class, name)
+
+    def change(self, *args, **kwargs):
+        _set_metadata_changed(self)
+        return method(self, *args, **kwargs)
+    change.__name__ = name
+    return change
+
+
+class MetadataView(dict):
+    """
+
+    Dict of the asset metadata. The metadata text is only parsed once, and the same view
+    is returned by every call to :attr:`AssetBase.metadata`.
+
+    To change the metadata, use `copy` to get a normal dict, and then call :meth:`AssetBase.set_metadata`.
+
+    For example::
+
+        metadata = asset.metadata.copy()
+        metadata['description'] = 'new description'
+        asset.set_metadata(metadata)
+
+    Changing the view directly is deprecated, it raises a `DeprecationWarning` and the change is
+    not seen by the asset. The asset parses it's metadata text again on the next call
+    to :attr:`AssetBase.metadata`, so the asset metadata is not changed, as before the view was cached.
+    The dicts and lists within the view are also :class:`.MetadataView` and :class:`.MetadataListView`
+    objects, so a change to any part of the metadata is found.
+
+    """
+    __slots__ = ('_state', )
+
+    __setitem__ = _metadata_change_method(dict, '__setitem__')
+    __delitem__ = _metadata_change_method(dict, '__delitem__')
+    __ior__ = _metadata_change_method(dict, '__ior__')
+    clear = _metadata_change_method(dict, 'clear')
+    pop = _metadata_change_method(dict, 'pop')
+    popitem = _metadata_change_method(dict, 'popitem')
+    setdefault = _metadata_change_method(dict, 'setdefault')
+    update = _metadata_change_method(dict, 'update')
+
+    def copy(self) -> Any:
+        """
+        :return: a copy of the metadata as a normal dict that can be changed
+        """
+        return MetadataView._copy_value(self)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __reduce__(self):
+        return (dict, (self.copy(), ))
+
+    @property
+    def is_changed(self) -> bool:
+        """
+        :return: True if this view, or any dict or list within this view has been changed
+        """
+        state = getattr(self, '_state', None)
+        return state is not None and state['is_changed']
+
+    @staticmethod
+    def parse(metadata_text: str) -> Any:
+        # all of the dicts and lists in the metadata share the same state, so a change to any of them is found
+        state = {'is_changed': False}
+
+        def create_list_view(items):
+            view = MetadataListView(create_list_view(item) if type(item) is list else item for item in items)
+            view._state = state
+            return view
+
+        def create_view(items):
+            for key, item in items.items():
+                if type(item) is list:
+                    items[key] = create_list_view(item)
+            view = MetadataView(items)
+            view._state = state
+            return view
+
+        value = json.loads(metadata_text, object_hook=create_view)
+        if type(value) is list:
+            value = create_list_view(value)
+        return value
+
+    @staticmethod
+    def _copy_value(value):
+        if isinstance(value, dict):
+            return {key: MetadataView._copy_value(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [MetadataView._copy_value(item) for item in value]
+        return value
+
+
+class MetadataListView(list):
+    """
+
+    List within the asset metadata, see :class:`.MetadataView`.
+
+    """
+    __slots__ = ('_state', )
+
+    __setitem__ = _metadata_change_method(list, '__setitem__')
+    __delitem__ = _metadata_change_method(list, '__delitem__')
+    __iadd__ = _metadata_change_method(list, '__iadd__')
+    __imul__ = _metadata_change_method(list, '__imul__')
+    append = _metadata_change_method(list, 'append')
+    clear = _metadata_change_method(list, 'clear')
+    extend = _metadata_change_method(list, 'extend')
+    insert = _metadata_change_method(list, 'insert')
+    pop = _metadata_change_method(list, 'pop')
+    remove = _metadata_change_method(list, 'remove')
+    reverse = _metadata_change_method(list, 'reverse')
+    sort = _metadata_change_method(list, 'sort')
+
+    def copy(self) -> Any:
+        """
+        :return: a copy of the list that can be changed
+        """
+        return MetadataView._copy_value(self)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __reduce__(self):
+        return (list, (self.copy(), ))
+
+
 class AssetBase(ABC, Generic[TAssetBase]):
     """
 
@@ -24,6 +171,9 @@ class AssetBase(ABC, Generic[TAssetBase]):
     :type did: None or str
 
     """
+    # assets are held in large numbers by catalogs and indexes, so no instance __dict__ is used
+    __slots__ = ('_did', '_metadata_text', '_metadata', '_asset_id')
+
     def __init__(self, metadata_text: str) -> None:
         """
         init an asset class
@@ -32,7 +182,7 @@ class AssetBase(ABC, Generic[TAssetBase]):
             raise TypeError('metadata must be in text form')
 
         self._did = None
-        self._metadata_text = metadata_text
+        self._set_metadata_text(metadata_text)
 
         if 'name' not in self.metadata:
             raise ValueError('metadata must contain a metadata name')
@@ -52,7 +202,7 @@ class AssetBase(ABC, Generic[TAssetBase]):
         :param str agent_did: DID of the agent that this asset will be registered with
 
         """
-        metadata = self.metadata
+        metadata = self.metadata.copy()
         provenance = Provenance(agent_did=agent_did)
         metadata['provenance'] = provenance.create_publish
         self.set_metadata(metadata)
@@ -67,7 +217,7 @@ class AssetBase(ABC, Generic[TAssetBase]):
         :param str agent_did: DID of the agent that this asset will be registered with
 
         """
-        metadata = self.metadata
+        metadata = self.metadata.copy()
         provenance = Provenance(agent_did=agent_did, activity_id=job_id, asset_list=asset_list, inputs_text=inputs_text)
         metadata['provenance'] = provenance.create_invoke
         self.set_metadata(metadata)
@@ -96,9 +246,15 @@ class AssetBase(ABC, Generic[TAssetBase]):
         return asset_type == type_name
 
     def set_metadata(self, metadata: any):
-        self._metadata_text = json.dumps(metadata)
+        self._set_metadata_text(json.dumps(metadata))
         self._did = None
 
+    def _set_metadata_text(self, metadata_text: str) -> None:
+        # the parsed metadata and asset id are only calculated when first used
+        self._metadata_text = metadata_text
+        self._metadata = None
+        self._asset_id = None
+
     @property
     def did(self) -> str:
         """
@@ -111,13 +267,15 @@ class AssetBase(ABC, Generic[TAssetBase]):
     def metadata(self) -> Any:
         """
 
-        WARNING: The read only version for this metadata, use `set_metadata` to assign a new metadata.
+        WARNING: Changing this metadata does not change the asset, use `set_metadata` to assign a new metadata.
         Once you change metadata, the asset id is changed and the did is set to None.
 
-        :return: The metadata for this asset
-        :type: dict
+        :return: The metadata for this asset, use `metadata.copy()` to get a copy that can be changed
+        :type: :class:`.MetadataView`
         """
-        return json.loads(self._metadata_text)
+        if self._metadata is None or self._metadata.is_changed:
+            self._metadata = MetadataView.parse(self._metadata_text)
+        return self._metadata
 
     @property
     def metadata_text(self) -> str:
@@ -129,7 +287,9 @@ class AssetBase(ABC, Generic[TAssetBase]):
 
     @property
     def asset_id(self) -> str:
-        return hash_sha3_256(self._metadata_text)
+        if self._asset_id is None:
+            self._asset_id = hash_sha3_256(self._metadata_text)
+        return self._asset_id
 
     @property
     def name(self) -> str:
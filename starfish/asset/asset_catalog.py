@@ -0,0 +1,134 @@
+"""
+    Asset Catalog
+"""
+import sys
+from typing import (
+    Any,
+    Iterator
+)
+
+from eth_utils import remove_0x_prefix
+
+from starfish.asset.asset_base import AssetBase
+from starfish.network.did import decode_to_asset_id
+
+
+class AssetCatalog():
+    """
+
+    Compact store for a large number of assets, that only holds the metadata text of each asset.
+
+    Each asset is stored as one small tuple keyed by the 32 byte asset id, the metadata text is stored once for each
+    asset id, and the agent DID of each asset is interned so that all of the assets from the same agent
+    share one DID string. The asset objects are only created when they are read from the catalog.
+
+    Asset data is not stored in the catalog, so data assets are returned without their data.
+
+    For example::
+
+        catalog = AssetCatalog()
+        for asset in assets:
+            catalog.add(asset)
+
+        asset = catalog.get(asset_did)
+        print(asset.name, asset.did)
+
+    """
+    __slots__ = ('_items', )
+
+    def __init__(self) -> None:
+        self._items = {}
+
+    def add(self, asset: AssetBase, did: str = None) -> str:
+        """
+        Add an asset to the catalog, if the asset is already in the catalog then the DID is updated.
+
+        :param asset: asset to add
+        :type asset: :class:`.AssetBase`
+        :param str did: Optional asset DID, if None then the DID of the asset is used
+
+        :return: asset id of the asset
+        """
+        if not isinstance(asset, AssetBase):
+            raise TypeError('You need to pass an Asset object')
+
+        did = did or asset.did
+        agent_did = None
+        if did:
+            agent_did, _, _ = did.partition('/')
+            agent_did = sys.intern(agent_did)
+        asset_id = asset.asset_id
+        self._items[bytes.fromhex(asset_id)] = (asset.metadata_text, agent_did, type(asset))
+        return asset_id
+
+    def get(self, asset_did_id: str) -> Any:
+        """
+        Return a new asset object for an asset in the catalog.
+
+        :param str asset_did_id: asset DID or asset id of the asset
+
+        :return: asset object or None if the asset is not in the catalog
+        """
+        item = self._items.get(AssetCatalog.to_key(asset_did_id))
+        if item is None:
+            return None
+        metadata_text, agent_did, asset_class = item
+        asset = asset_class(metadata_text)
+        if agent_did:
+            asset.set_did(f'{agent_did}/{remove_0x_prefix(asset.asset_id)}')
+        return asset
+
+    def get_metadata_text(self, asset_did_id: str) -> str:
+        """
+        Return the metadata text of an asset, without creating the asset object.
+
+        :param str asset_did_id: asset DID or asset id of the asset
+
+        :return: metadata text or None if the asset is not in the catalog
+        """
+        item = self._items.get(AssetCatalog.to_key(asset_did_id))
+        return item[0] if item else None
+
+    def get_agent_did(self, asset_did_id: str) -> str:
+        """
+        Return the DID of the agent that holds the asset.
+
+        :param str asset_did_id: asset DID or asset id of the asset
+
+        :return: agent DID or None if the asset has no DID or is not in the catalog
+        """
+        item = self._items.get(AssetCatalog.to_key(asset_did_id))
+        return item[1] if item else None
+
+    def remove(self, asset_did_id: str) -> bool:
+        """
+        Remove an asset from the catalog.
+
+        :param str asset_did_id: asset DID or asset id of the asset
+
+        :return: True if the asset was found in the catalog
+        """
+        return self._items.pop(AssetCatalog.to_key(asset_did_id), None) is not None
+
+    def __contains__(self, asset_did_id: str) -> bool:
+        return AssetCatalog.to_key(asset_did_id) in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Return the asset id of each asset in the catalog.
+
+        """
+        for key in list(self._items.keys()):
+            yield key.hex()
+
+    @staticmethod
+    def to_key(asset_did_id: str) -> bytes:
+        # return None for an invalid asset DID or asset id, so that it is not found in the catalog
+        try:
+            asset_id = decode_to_asset_id(asset_did_id)
+        except (TypeError, ValueError):
+            return None
+        return bytes.fromhex(asset_id) if asset_id else None
@@ -2,7 +2,7 @@
     Bundle Asset
 """
 import json
-
+from contextlib import contextmanager
 from typing import (
     Any,
     Dict,
@@ -27,11 +27,15 @@ class BundleAsset(AssetBase, Generic[TBundleAsset]):
     :type did: None or str
 
     """
+    __slots__ = ('_assets', '_iter_index', '_names', '_batch_depth')
+
     def __init__(self, metadata_text: str) -> None:
 
         AssetBase.__init__(self, metadata_text)
         self._assets = {}
-        metadata = json.loads(metadata_text)
+        self._names = None
+        self._batch_depth = 0
+        metadata = self.metadata
         if 'contents' in metadata:
             for name, item in metadata['contents'].items():
                 self._assets[name] = item['assetID']
@@ -72,13 +76,65 @@ class BundleAsset(AssetBase, Generic[TBundleAsset]):
 
         """
 
-        if not isinstance(name, str):
-            raise TypeError('You need to pass the asset name as a string')
-        if not isinstance(asset, AssetBase):
-            raise TypeError('You need to pass an Asset object')
+        self.add_many({name: asset})
+
+    def add_many(self, asset_items: Any) -> None:
+        """
+
+        Add many assets to the bundle, the bundle metadata is only built once after all of the
+        assets have been added. All of the items are checked before any are added, so if an item is not
+        valid then the bundle is not changed.
 
-        self._assets[name] = asset.asset_id
-        self._rebuild_metadata(self._assets)
+        :param asset_items: dict of asset name and asset object, or a list of (name, asset) tuples
+
+        For example::
+
+            bundle.add_many({'chunk:0': chunk_asset_0, 'chunk:1': chunk_asset_1})
+
+        """
+        if isinstance(asset_items, dict):
+            asset_items = asset_items.items()
+        asset_items = list(asset_items)
+        for name, asset in asset_items:
+            if not isinstance(name, str):
+                raise TypeError('You need to pass the asset name as a string')
+            if not isinstance(asset, AssetBase):
+                raise TypeError('You need to pass an Asset object')
+        for name, asset in asset_items:
+            if name not in self._assets:
+                self._names = None
+            self._assets[name] = asset.asset_id
+        self._update_metadata()
+
+    @contextmanager
+    def batch(self) -> Any:
+        """
+
+        Context manager to add or remove many assets, the bundle metadata is only built once when the
+        context exits. Inside the context the metadata and asset id of the bundle are not updated.
+        If an exception is raised inside the context, then the assets added or removed inside the context
+        are restored, and the bundle is not changed.
+
+        For example::
+
+            with bundle.batch():
+                for index, chunk_asset in enumerate(chunk_assets):
+                    bundle.add(f'chunk:{index}', chunk_asset)
+
+        """
+        assets = dict(self._assets)
+        names = self._names
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            # the metadata is not changed inside the context, so only the assets need to be restored
+            self._assets = assets
+            self._names = names
+            raise
+        finally:
+            self._batch_depth -= 1
+        self._update_metadata()
 
     def get_asset_id(self, name: str) -> str:
         """
@@ -98,7 +154,7 @@ class BundleAsset(AssetBase, Generic[TBundleAsset]):
         if isinstance(name, int):
             if name < 0 or name > self.asset_count:
                 raise ValueError(f'Cannot find asset at index {name}')
-            name = self.asset_names[name]
+            name = self._get_names()[name]
         return self._assets[name]
 
     def asset_remove(self, name: str) -> str:
@@ -115,7 +171,8 @@ class BundleAsset(AssetBase, Generic[TBundleAsset]):
             raise ValueError(f'Cannot find asset named {name}')
         asset = self._assets[name]
         del self._assets[name]
-        self._rebuild_metadata(self._assets)
+        self._names = None
+        self._update_metadata()
 
         return asset
 
@@ -141,7 +198,7 @@ class BundleAsset(AssetBase, Generic[TBundleAsset]):
         """
         if self._iter_index < self.asset_count:
             index = self._iter_index
-            name = self.asset_names[index]
+            name = self._get_names()[index]
             asset = self._assets[name]
             self._iter_index += 1
             return name, asset
@@ -153,15 +210,24 @@ class BundleAsset(AssetBase, Generic[TBundleAsset]):
 
     def get_asset_id_at_index(self, index) -> str:
         """ return the asset based on the index of available assets """
-        return list(self._assets.values())[index]
+        return self._assets[self._get_names()[index]]
+
+    def _get_names(self):
+        # list of the asset names, so that assets can be found by index without building a new list for each call
+        if self._names is None:
+            self._names = list(self._assets.keys())
+        return self._names
+
+    def _update_metadata(self):
+        if self._batch_depth == 0:
+            self._rebuild_metadata(self._assets)
 
     def _rebuild_metadata(self, asset_list):
-        metadata = self.metadata
-        metadata['contents'] = {}
-        for name, asset_id in asset_list.items():
-            metadata['contents'][name] = {
-                'assetID': asset_id
-            }
+        # only the top level is copied, the old contents are replaced and not copied
+        metadata = dict(self.metadata)
+        # the merkle root of the old contents is no longer valid
+        metadata.pop('merkleRoot', None)
+        metadata['contents'] = {name: {'assetID': asset_id} for name, asset_id in asset_list.items()}
         self.set_metadata(metadata)
 
     @property
@@ -173,7 +239,7 @@ class BundleAsset(AssetBase, Generic[TBundleAsset]):
         :return: count of assets
         :type: int
         """
-        return len(self._assets.keys())
+        return len(self._assets)
 
     @property
     def asset_items(self) -> Dict[str, str]:
@@ -181,7 +247,7 @@ class BundleAsset(AssetBase, Generic[TBundleAsset]):
 
     @property
     def asset_names(self) -> List[str]:
-        return list(self._assets.keys())
+        return list(self._get_names())
 
     @property
     def is_bundle(self) -> bool:
@@ -12,6 +12,11 @@ from typing import (
 )
 
 from starfish.asset.asset_base import AssetBase
+from starfish.asset.data_source import (
+    DataSource,
+    FileDataSource,
+    MemoryDataSource
+)
 from starfish.types import TDataAsset
 from starfish.utils.crypto_hash import hash_sha3_256
 
@@ -26,17 +31,28 @@ class DataAsset(AssetBase, Generic[TDataAsset]):
     :param did: Optional did of the asset if it's registered
     :type did: None or str
     :param str data: Optional data of the asset, this can be str or bytes
+    :param str filename: Optional filename that holds the data of the asset, the file is only read
+        when the data is uploaded or saved, so the data is not held in memory.
+    :param data_source: Optional source of the data, such as a region of a file, that is only read when used.
+    :type data_source: :class:`.DataSource`
 
     """
-    def __init__(self, metadata_text: str, data: Any = None) -> None:
+    __slots__ = ('_data', '_data_source')
+
+    def __init__(self, metadata_text: str, data: Any = None, filename: str = None, data_source: DataSource = None) -> None:
 
         if data:
             if not (isinstance(data, str) or isinstance(data, bytes)):
                 raise ValueError('data can only be str or bytes')
             if not isinstance(data, bytes):
                 data = data.encode('utf-8')
+        if filename and data_source is None:
+            data_source = FileDataSource(filename)
+        if data_source is not None and not isinstance(data_source, DataSource):
+            raise TypeError('data_source must be a DataSource object')
 
         self._data = data
+        self._data_source = data_source
         AssetBase.__init__(self, metadata_text)
 
     @staticmethod
@@ -81,7 +97,8 @@ class DataAsset(AssetBase, Generic[TDataAsset]):
             the contents will be saved in the asset
         :param dict metadata: Optional metadata to add to the assets metadata
         :param str did: Option DID to assign to this asset
-        :param bool is_read: If True read the file contents in as asset data.
+        :param bool is_read: If True read the file contents in as asset data, else the asset only keeps the
+            filename and the data is streamed from the file when it's uploaded.
 
         :return: a new DataAsset
         :type: :class:`.DataAsset`
@@ -92,6 +109,7 @@ class DataAsset(AssetBase, Generic[TDataAsset]):
         if 'filename' not in metadata:
             metadata['filename'] = os.path.basename(str(filename))
         data = None
+        data_source = None
         if os.path.exists(filename):
             content_type = 'application/octet-stream'
             mime = MimeTypes()
@@ -100,15 +118,47 @@ class DataAsset(AssetBase, Generic[TDataAsset]):
                 content_type = mime_type[0]
             if 'contentType' not in metadata:
                 metadata['contentType'] = content_type
+            if 'contentLength' not in metadata:
+                metadata['contentLength'] = os.path.getsize(filename)
             if is_read:
                 with open(filename, 'rb') as fp:
                     data = fp.read()
-                if 'contentLength' not in metadata:
-                    metadata['contentLength'] = os.path.getsize(filename)
-            if 'contentHash' not in metadata:
-                metadata['contentHash'] = hash_sha3_256(data)
+                if 'contentHash' not in metadata:
+                    metadata['contentHash'] = hash_sha3_256(data)
+            else:
+                data_source = FileDataSource(filename)
+                if 'contentHash' not in metadata:
+                    metadata['contentHash'] = data_source.hash()
 
-        return DataAsset(json.dumps(metadata), data=data)
+        return DataAsset(json.dumps(metadata), data=data, data_source=data_source)
+
+    @staticmethod
+    def create_from_data_source(name: str, data_source: DataSource, metadata: Any = None) -> TDataAsset:
+        """
+
+        Create a new DataAsset from a data source, the data is hashed from the source without reading
+        all of the data into memory.
+
+        :param str name: Name of the asset to create
+        :param data_source: Source of the data for the asset
+        :type data_source: :class:`.DataSource`
+        :param dict metadata: Optional metadata to add to the assets metadata
+
+        :return: a new DataAsset
+        :type: :class:`.DataAsset`
+
+        """
+        metadata = AssetBase.generateMetadata(name, 'dataset', metadata)
+        if data_source.filename and 'filename' not in metadata:
+            metadata['filename'] = os.path.basename(data_source.filename)
+        if 'contentType' not in metadata:
+            metadata['contentType'] = 'application/octet-stream'
+        if 'contentHash' not in metadata:
+            metadata['contentHash'] = data_source.hash()
+        if 'contentLength' not in metadata:
+            metadata['contentLength'] = data_source.size
+
+        return DataAsset(json.dumps(metadata), data_source=data_source)
 
     def save_to_file(self, filename: str) -> None:
         """
@@ -121,7 +171,46 @@ class DataAsset(AssetBase, Generic[TDataAsset]):
         if self._data:
             with open(filename, 'wb') as fp:
                 fp.write(self._data)
+        elif self._data_source is not None:
+            self._data_source.save_to_file(filename)
 
     @property
     def data(self) -> Any:
+        """
+        :return: data of the asset, if the data is held by a data source then all of the data is read into
+            memory on the first call, use `data_source.open_view()` to use the data without reading it into memory.
+        """
+        if self._data is None and self._data_source is not None:
+            self._data = self._data_source.read()
         return self._data
+
+    @property
+    def data_source(self) -> DataSource:
+        """
+        :return: source of the asset data, or None if the asset has no data
+        :type: :class:`.DataSource`
+        """
+        if self._data_source is None and self._data is not None:
+            return MemoryDataSource(self._data)
+        return self._data_source
+
+    @property
+    def filename(self) -> str:
+        """
+        :return: filename of the asset data, if the data has not been read into memory
+        """
+        return self._data_source.filename if self._data_source is not None else None
+
+    @property
+    def has_data(self) -> bool:
+        """
+        :return: True if the asset has data in memory, or a data source to read the data
+        """
+        if self._data:
+            return True
+        if self._data_source is None:
+            return False
+        try:
+            return self._data_source.size > 0
+        except OSError:
+            return False
@@ -0,0 +1,174 @@
+"""
+    Data Source
+
+    Sources of asset data, that can be read, hashed, uploaded and saved without holding
+    a copy of all of the data in memory.
+"""
+import os
+import shutil
+from abc import (
+    ABC,
+    abstractmethod
+)
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Iterator
+)
+
+from starfish.utils.crypto_hash import hash_sha3_256
+from starfish.utils.data_stream import open_file_view
+
+# size of each block of data that is hashed or returned by `iter_chunks`
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+
+class DataSource(ABC):
+    """
+
+    Base class for the data held by a :class:`.DataAsset`.
+
+    """
+    __slots__ = ()
+
+    @abstractmethod
+    def open_view(self) -> Any:
+        """
+        Context manager to return a read only bytes like view of the data, the view can only be used
+        inside the context.
+
+        """
+        pass
+
+    @property
+    @abstractmethod
+    def size(self) -> int:
+        """
+        :return: size of the data in bytes
+        """
+        pass
+
+    @property
+    def filename(self) -> str:
+        """
+        :return: filename of the data, or None if the data is not held in a file
+        """
+        return None
+
+    def read(self) -> bytes:
+        """
+        Read all of the data into memory.
+
+        :return: bytes of the data
+        """
+        with self.open_view() as view:
+            return bytes(view)
+
+    def iter_chunks(self, chunk_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[bytes]:
+        """
+        Return the data as a sequence of chunks, so that only one chunk is held in memory.
+
+        :param int chunk_size: Maximum size of each chunk
+
+        """
+        with self.open_view() as view:
+            for offset in range(0, len(view), chunk_size):
+                yield bytes(view[offset:offset + chunk_size])
+
+    def hash(self) -> str:
+        """
+        :return: sha3_256 hash of the data, as a hex string
+        """
+        # the view is hashed in one call, so the GIL is released while the data is hashed
+        with self.open_view() as view:
+            return hash_sha3_256(view)
+
+    def save_to_file(self, filename: str) -> None:
+        """
+        Save the data to a file.
+
+        :param str filename: Filename to write the data
+
+        """
+        with self.open_view() as view, open(filename, 'wb') as fp:
+            fp.write(view)
+
+
+class MemoryDataSource(DataSource):
+    """
+
+    Data that is held in memory.
+
+    :param data: bytes, bytearray, memoryview or mmap object of the data
+
+    """
+    __slots__ = ('_data', )
+
+    def __init__(self, data: Any) -> None:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._data = data
+
+    @contextmanager
+    def open_view(self) -> Any:
+        yield self._data
+
+    @property
+    def size(self) -> int:
+        return len(self._data)
+
+
+class FileDataSource(DataSource):
+    """
+
+    Data that is held in a file, or a region of a file. The file is only read when the data is used,
+    and is then memory mapped so that the data is not copied.
+
+    :param str filename: Filename of the data
+    :param int offset: Optional start of the data in the file
+    :param int length: Optional length of the data, if None then the data is read to the end of the file
+
+    For example::
+
+        data_source = FileDataSource('large_file.dat', offset=1024 * 1024, length=64 * 1024 * 1024)
+        asset = DataAsset.create_from_data_source('part of a large file', data_source)
+        agent.upload_asset(asset)
+
+    """
+    __slots__ = ('_filename', '_offset', '_length')
+
+    def __init__(self, filename: str, offset: int = 0, length: int = None) -> None:
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError('offset and length must be positive values')
+        self._filename = str(filename)
+        self._offset = offset
+        self._length = length
+
+    @contextmanager
+    def open_view(self) -> Any:
+        with open_file_view(self._filename, self._offset, self._length) as view:
+            yield view
+
+    def save_to_file(self, filename: str) -> None:
+        if os.path.abspath(filename) == os.path.abspath(self._filename):
+            if self._offset == 0 and self._length is None:
+                return
+            raise ValueError(f'cannot save a region of the file {filename} to the same file')
+        if self._offset == 0 and self._length is None:
+            shutil.copyfile(self._filename, filename)
+        else:
+            super().save_to_file(filename)
+
+    @property
+    def size(self) -> int:
+        if self._length is not None:
+            return self._length
+        return max(0, os.path.getsize(self._filename) - self._offset)
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    @property
+    def offset(self) -> int:
+        return self._offset
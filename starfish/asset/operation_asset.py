@@ -24,6 +24,8 @@ class OperationAsset(AssetBase, Generic[TOperationAsset]):
     :type did: None or str
 
     """
+    __slots__ = ()
+
     def __init__(self, metadata_text: str) -> None:
         AssetBase.__init__(self, metadata_text)
 
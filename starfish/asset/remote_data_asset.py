@@ -16,6 +16,7 @@ from starfish.types import TRemoteDataAsset
 
 
 class RemoteDataAsset(DataAsset, Generic[TRemoteDataAsset]):
+    __slots__ = ()
 
     @staticmethod
     def create_with_url(name: str, url: str, metadata: Any = None, did: str = None) -> TRemoteDataAsset:
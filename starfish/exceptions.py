@@ -27,3 +27,7 @@ class StarfishInsufficientFunds(Exception):
 
 class StarfishRemoteAgentInvalidAccess(Exception):
     """ Raised when a access token can not be generated by the remote agent """
+
+
+class StarfishRemoteAgentUnauthorized(StarfishRemoteAgentInvalidAccess):
+    """ Raised when the remote agent rejects an access token, the token may have expired or been revoked """
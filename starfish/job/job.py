@@ -7,4 +7,4 @@ from starfish.job.job_base import JobBase
 
 
 class Job(JobBase):
-    pass
+    __slots__ = ()
@@ -19,6 +19,8 @@ class JobBase(ABC, Generic[TJobBase]):
         :type agent: :class:`.Agent` object to assign to this Listing
         :param str job_id: id of the job.
     """
+    # jobs are held in large numbers by catalogs and indexes, so no instance __dict__ is used
+    __slots__ = ('_job_id', '_status', '_outputs')
 
     IsWorkingStatusList = [
         'scheduled',
@@ -22,6 +22,7 @@ class Listing(ListingBase):
         :param ddo: Optional ddo for the listing
         :type data: dict
     """
+    __slots__ = ()
 
     def purchase(self, account: AccountBase) -> bool:
         """
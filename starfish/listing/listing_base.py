@@ -29,6 +29,9 @@ class ListingBase(ABC, Generic[TListingBase]):
         :param ddo: Optional DDO object for this listing
         :type data: dict
     """
+    # listings are held in large numbers by catalogs and indexes, so no instance __dict__ is used
+    __slots__ = ('_agent', '_listing_id', '_asset_did', '_data', '_ddo')
+
     def __init__(self, agent: AgentBase, listing_id: str, asset_did: str, data: Any, ddo: DDO = None) -> None:
         """init the the Listing Object Base with the agent instance"""
         self._agent = agent
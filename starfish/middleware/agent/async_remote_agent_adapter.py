@@ -0,0 +1,403 @@
+"""
+    AsyncRemoteAgentAdapter - Asyncio adapter to access the Remote Services
+"""
+import asyncio
+import logging
+from urllib.parse import urljoin
+
+import requests
+
+from starfish.exceptions import StarfishConnectionError
+from starfish.middleware.agent.remote_agent_adapter import (
+    DEFAULT_CHUNK_SIZE,
+    RemoteAgentAdapter,
+    ResponseWrapper
+)
+from starfish.middleware.multipart_stream import MultipartStream
+from starfish.utils.crypto_hash import hash_sha3_256
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+
+CONNECTION_ERRORS = (OSError, asyncio.TimeoutError)
+if httpx:
+    CONNECTION_ERRORS = CONNECTION_ERRORS + (httpx.HTTPError, )
+
+
+class AsyncRemoteAgentAdapter(RemoteAgentAdapter):
+    """
+
+    Asyncio adapter to make the HTTP calls to the remote agent services.
+    All of the request methods are coroutines, with the same parameters and results as
+    the :class:`.RemoteAgentAdapter` methods.
+
+    :param http_client: Optional async HTTP client with the same calls as the `httpx.AsyncClient`.
+        If not set, this defaults to a `httpx.AsyncClient` with a keep-alive connection pool.
+        The client must support:
+
+        + coroutines `get`, `post`, `put` and `head`, with the `url`, `headers`, `json`, `content` and `auth`
+          parameters, that return a response with `status_code`, `headers`, `content`, `text` and `json()`.
+        + `build_request(method, url, **kwargs)` and the coroutine `send(request, stream=True)`, used to
+          download the asset data as a stream. The streamed response must also have the async iterator
+          `aiter_bytes(chunk_size)` and the coroutine `aclose()`.
+    :param int max_connections: Maximum number of open connections for the default client.
+    :param int max_keepalive_connections: Maximum number of idle keep-alive connections for the default client.
+
+    """
+    def __init__(
+        self,
+        http_client=None,
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections=DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+    ):
+        self._http_client = http_client
+        self._is_owner = False
+        self._max_connections = max_connections
+        self._max_keepalive_connections = max_keepalive_connections
+
+    async def register_asset(self, metadata, url, authorization_token=None):
+        saved_asset_id = await self.save_metadata(metadata, url, authorization_token)
+        result = {
+                'asset_id': saved_asset_id,
+                'metadata': metadata,
+                'hash': hash_sha3_256(metadata)
+            }
+        return result
+
+    async def get_metadata_list(self, url, authorization_token=None):
+        url = urljoin(f'{url}/', 'index')
+        logger.debug(f'metadata list url {url}')
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_get(url, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            return ResponseWrapper(response).json
+        msg = f'metadata asset response failed: {response.status_code}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def save_metadata(self, metadata, url, authorization_token=None):
+        url = urljoin(f'{url}/', 'data')
+        logger.debug(f'metadata save url {url}')
+        headers = RemoteAgentAdapter.create_headers('text/plain', authorization_token)
+        response = await self.request_post(url, content=metadata, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            return ResponseWrapper(response).json
+        msg = f'metadata asset response failed: {response.status_code}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def create_listing(self, listing_data, asset_id, url, authorization_token=None):
+        data = {
+            'assetid': asset_id,
+            'info': listing_data,
+        }
+        url = urljoin(f'{url}/', 'listings')
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_post(url, json=data, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            data = ResponseWrapper(response).json
+            logger.debug('listing response returned: ' + str(data))
+            return data
+        msg = f'listing response failed: {response.status_code} {response.text}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def download_asset(self, asset_id, url, authorization_token=None):
+        url = urljoin(f'{url}/', asset_id)
+        headers = RemoteAgentAdapter.create_headers('application/octet-stream', authorization_token)
+        response = await self.request_get(url, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            return ResponseWrapper(response).data
+        msg = f'GET assets response failed: {response.status_code} {response}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def download_asset_stream(self, asset_id, url, chunk_size=DEFAULT_CHUNK_SIZE, authorization_token=None):
+        """
+        Download the asset data as an async stream of chunks, see :func:`.RemoteAgentAdapter.download_asset_stream`.
+
+        :return: async iterator of bytes chunks
+        """
+        url = urljoin(f'{url}/', asset_id)
+        headers = RemoteAgentAdapter.create_headers('application/octet-stream', authorization_token)
+        response = await self.request_stream('GET', url, headers=headers)
+        if response.status_code != requests.codes.ok:
+            await response.aclose()
+            msg = f'GET assets response failed: {response.status_code} {response}'
+            logger.error(msg)
+            raise ValueError(msg)
+        return AsyncRemoteAgentAdapter._aiter_response(response, chunk_size)
+
+    async def get_asset_data_size(self, asset_id, url, authorization_token=None):
+        url = urljoin(f'{url}/', asset_id)
+        headers = RemoteAgentAdapter.create_headers('application/octet-stream', authorization_token)
+        response = await self.request_head(url, headers=headers)
+        if response is not None and response.status_code == requests.codes.ok:
+            content_length = response.headers.get('Content-Length')
+            if content_length is not None:
+                return int(content_length)
+        return None
+
+    async def get_listing(self, listing_id, url, authorization_token=None):
+        url = urljoin(f'{url}/', f'listings/{listing_id}')
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_get(url, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            return ResponseWrapper(response).json
+        msg = f'GET listings response failed: {response.status_code}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def get_listings(self, url, authorization_token=None):
+        url = urljoin(f'{url}/', 'listings')
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_get(url, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            return ResponseWrapper(response).json
+        msg = f'GET listings response failed: {response.status_code}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def update_listing(self, listing_id, data, url, authorization_token=None):
+        url = urljoin(f'{url}/', f'listings/{listing_id}')
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_put(url, json=data, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            return True
+        msg = f'PUT listings response failed: {response.status_code}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def upload_asset_data(self, asset_id, data, url, authorization_token=None):
+        url = urljoin(f'{url}/', asset_id)
+        logger.debug(f'uploading data to {url}')
+        with MultipartStream('file', asset_id, data) as stream:
+            headers = RemoteAgentAdapter.create_upload_headers(stream, authorization_token)
+            response = await self.request_post(url, content=stream.aiter_blocks(), headers=headers)
+        if response and (response.status_code == requests.codes.ok or response.status_code == requests.codes.created):
+            return True
+        msg = f'upload asset response failed: {response.status_code}:{response.text}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def read_metadata(self, asset_id, url, authorization_token=None):
+        result = None
+        url = urljoin(f'{url}/', f'data/{asset_id}')
+        logger.debug(f'metadata read url {url}')
+        headers = RemoteAgentAdapter.create_headers('text/plain', authorization_token)
+        response = await self.request_get(url, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            data = ResponseWrapper(response).data
+            result = {
+                'asset_id': asset_id,
+                'metadata_text': data,
+                'hash': hash_sha3_256(data)
+            }
+            if isinstance(data, bytes):
+                result['metadata_text'] = data.decode('utf-8')
+        else:
+            logger.warning(f'metadata asset read {asset_id} response returned {response} for {url}')
+        return result
+
+    async def purchase_asset(self, purchase, url, authorization_token=None):
+        url = urljoin(f'{url}/', 'purchases')
+        logger.debug(f'market url for purchases {url}')
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_post(url, json=purchase, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            data = ResponseWrapper(response).json
+            logger.debug(f'purchase response returned {data}')
+            return data
+        msg = f'purchase response failed: {response.status_code}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def invoke(self, asset_id, inputs, url, authorization_token=None):
+        url = urljoin(f'{url}/', asset_id)
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_post(url, json=inputs, headers=headers)
+        if response and (response.status_code == requests.codes.ok or response.status_code == requests.codes.created):
+            data = ResponseWrapper(response).json
+            logger.debug('invoke response returned: ' + str(data))
+            return data
+        msg = f'invoke response failed: {response.status_code} {response} for {url}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def get_job(self, job_id, url, authorization_token=None):
+        url = urljoin(f'{url}/', job_id)
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_get(url, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            return ResponseWrapper(response).json
+        msg = f'GET job response failed: {response.status_code} for {url}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def get_authorization_token(self, username, password, url):
+        response = await self.request_get(url, auth=(username, password))
+        token = None
+        if response.status_code == requests.codes.ok:
+            tokens = ResponseWrapper(response).json
+            if len(tokens) > 0:
+                token = tokens[-1]
+            else:   # need to create a token
+                response = await self.request_post(url, auth=(username, password))
+                if response.status_code == requests.codes.ok:
+                    token = ResponseWrapper(response).json
+                else:
+                    msg = f'unable to create token, status {response.status_code}'
+                    logger.error(msg)
+                    raise ValueError(msg)
+        else:
+            msg = f'unable to get tokens, status {response.status_code}'
+            logger.error(msg)
+            raise ValueError(msg)
+        logger.debug(f'using agent token {token}')
+        return token
+
+    async def get_ddo(self, url, authorization_token=None):
+        ddo_text = None
+        url = urljoin(f'{url}/', '/api/ddo')
+        logger.debug(f'get_ddo url {url}')
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_get(url, headers=headers)
+        if response.status_code == requests.codes.ok:
+            ddo_text = ResponseWrapper(response).data.decode('utf-8')
+        return ddo_text
+
+    async def get_collection_items(self, url, collection_name=None, authorization_token=None):
+        if collection_name:
+            url = urljoin(f'{url}/', f'data/{collection_name}')
+        else:
+            url = urljoin(f'{url}/', 'index')
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_get(url, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            return ResponseWrapper(response).json
+        msg = f'GET collection response failed: {response.status_code} for {url}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def add_collection_items(self, url, collection_name, asset_list, authorization_token=None):
+        url = urljoin(f'{url}/', f'data/{collection_name}/add')
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_post(url, json=asset_list, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            return ResponseWrapper(response).json
+        msg = f'POST collection add response failed: {response.status_code} {response.text} for {url}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def remove_collection_items(self, url, collection_name, asset_list, authorization_token=None):
+        url = urljoin(f'{url}/', f'data/{collection_name}/remove')
+        headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
+        response = await self.request_post(url, json=asset_list, headers=headers)
+        if response and response.status_code == requests.codes.ok:
+            return ResponseWrapper(response).json
+        msg = f'POST collection remove response failed: {response.status_code} for {url}'
+        logger.error(msg)
+        raise ValueError(msg)
+
+    async def request_get(self, *args, **kwargs):
+        try:
+            response = await self.http_client.get(*args, **kwargs)
+        except CONNECTION_ERRORS as e:
+            raise StarfishConnectionError(e)
+        RemoteAgentAdapter.check_authorized(response, kwargs.get('headers'))
+        return response
+
+    async def request_post(self, *args, **kwargs):
+        try:
+            response = await self.http_client.post(*args, **kwargs)
+        except CONNECTION_ERRORS as e:
+            raise StarfishConnectionError(e)
+        RemoteAgentAdapter.check_authorized(response, kwargs.get('headers'))
+        return response
+
+    async def request_put(self, *args, **kwargs):
+        try:
+            response = await self.http_client.put(*args, **kwargs)
+        except CONNECTION_ERRORS as e:
+            raise StarfishConnectionError(e)
+        RemoteAgentAdapter.check_authorized(response, kwargs.get('headers'))
+        return response
+
+    async def request_head(self, *args, **kwargs):
+        try:
+            response = await self.http_client.head(*args, **kwargs)
+        except CONNECTION_ERRORS as e:
+            raise StarfishConnectionError(e)
+        RemoteAgentAdapter.check_authorized(response, kwargs.get('headers'))
+        return response
+
+    async def request_stream(self, method, url, **kwargs):
+        """
+        Send a request and return the response before the body has been read.
+        The caller must close the response.
+
+        """
+        try:
+            request = self.http_client.build_request(method, url, **kwargs)
+            response = await self.http_client.send(request, stream=True)
+        except CONNECTION_ERRORS as e:
+            raise StarfishConnectionError(e)
+        if response.status_code == requests.codes.unauthorized:
+            await response.aclose()
+        RemoteAgentAdapter.check_authorized(response, kwargs.get('headers'))
+        return response
+
+    @staticmethod
+    async def _aiter_response(response, chunk_size):
+        try:
+            async for chunk in response.aiter_bytes(chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            await response.aclose()
+
+    async def aclose(self):
+        """
+        Close the default async HTTP client and it's open connections.
+        An injected `http_client` is not closed, since it's owned by the caller.
+
+        """
+        if self._is_owner and self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            self._is_owner = False
+
+    @property
+    def http_client(self):
+        if self._http_client is None:
+            self._http_client = self.create_http_client(self._max_connections, self._max_keepalive_connections)
+            self._is_owner = True
+        return self._http_client
+
+    @http_client.setter
+    def http_client(self, value):
+        """Set the http client to something other than the default `httpx.AsyncClient`"""
+        self._http_client = value
+        self._is_owner = False
+
+    @staticmethod
+    def create_http_client(
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections=DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+    ):
+        """
+        Create the default async HTTP client, with a pool of keep-alive connections.
+
+        :raises: ImportError if the `httpx` library is not installed
+        """
+        if httpx is None:
+            raise ImportError('The httpx library is needed for the default async http client, use "pip install starfish-py[async]"')
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        return httpx.AsyncClient(limits=limits)
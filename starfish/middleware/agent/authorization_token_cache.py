@@ -0,0 +1,240 @@
+"""
+    AuthorizationTokenCache - Cache of remote agent authorization tokens
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# number of seconds before a cached token is requested again from the agent
+DEFAULT_EXPIRE_SECONDS = 30 * 60
+
+_default_token_cache = None
+_default_token_cache_lock = threading.Lock()
+
+
+class AuthorizationTokenCache():
+    """
+
+    Cache of authorization tokens, using the agent token url and username as the key.
+
+    When many threads ( or tasks ) request a token for the same agent at the same time, only one
+    request is sent to the agent, the other callers wait and then use the same token.
+
+    :param int expire_seconds: Number of seconds to keep a token before requesting it again from the agent.
+
+    For example::
+
+        token_cache = AuthorizationTokenCache(expire_seconds=600)
+        agent = RemoteAgent(ddo, authentication={'username': 'Aladdin', 'password': 'OpenSesame'}, token_cache=token_cache)
+        agent.get_listings()
+        print(token_cache.stats)
+
+    """
+    def __init__(self, expire_seconds: float = DEFAULT_EXPIRE_SECONDS) -> None:
+        if expire_seconds <= 0:
+            raise ValueError('expire_seconds must be greater than 0')
+        self._expire_seconds = expire_seconds
+        self._items = {}
+        # locks for each key that is being requested, a lock is removed when no caller is using it
+        self._locks = {}
+        # asyncio locks can only be used by the event loop that created them, so they are held for each loop
+        self._async_locks = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_token(self, url: str, username: str, password: str, request_token):
+        """
+        Return a cached token, or call `request_token` to get a new token from the agent.
+
+        :param str url: URL of the agent token endpoint
+        :param str username: username used to get the token
+        :param str password: password used to get the token
+        :param request_token: function with no parameters, that returns a new token from the agent
+
+        :return: token string or None if no token can be obtained
+        """
+        key = AuthorizationTokenCache.to_key(url, username, password)
+        token = self._get_item(key)
+        if token is not None:
+            return token
+
+        lock_item = self._acquire_lock(self._locks, key, threading.Lock)
+        try:
+            with lock_item[0]:
+                # another thread may have requested the token while we were waiting
+                token = self._get_item(key, is_counted=False)
+                if token is None:
+                    logger.debug(f'requesting authorization token from {url}')
+                    token = request_token()
+                    self._set_item(key, token)
+        finally:
+            self._release_lock(self._locks, key, lock_item)
+        return token
+
+    async def async_get_token(self, url: str, username: str, password: str, request_token):
+        """
+        Return a cached token, or await `request_token` to get a new token from the agent.
+
+        :param str url: URL of the agent token endpoint
+        :param str username: username used to get the token
+        :param str password: password used to get the token
+        :param request_token: function with no parameters, that returns an awaitable for a new token
+
+        :return: token string or None if no token can be obtained
+        """
+        key = AuthorizationTokenCache.to_key(url, username, password)
+        token = self._get_item(key)
+        if token is not None:
+            return token
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            locks = self._async_locks.get(loop)
+            if locks is None:
+                locks = {}
+                self._async_locks[loop] = locks
+        lock_item = self._acquire_lock(locks, key, asyncio.Lock)
+        try:
+            async with lock_item[0]:
+                token = self._get_item(key, is_counted=False)
+                if token is None:
+                    logger.debug(f'requesting authorization token from {url}')
+                    token = await request_token()
+                    self._set_item(key, token)
+        finally:
+            self._release_lock(locks, key, lock_item)
+        return token
+
+    def set_token(self, url: str, username: str, password: str, token: str) -> None:
+        """
+        Add a token to the cache, that has already been obtained from the agent.
+
+        :param str url: URL of the agent token endpoint
+        :param str username: username used to get the token
+        :param str password: password used to get the token
+        :param str token: token to add to the cache
+        """
+        self._set_item(AuthorizationTokenCache.to_key(url, username, password), token)
+
+    def invalidate(self, url: str, username: str, password: str, token: str = None) -> bool:
+        """
+        Remove a token from the cache, so that the next call requests a new token from the agent.
+
+        :param str url: URL of the agent token endpoint
+        :param str username: username used to get the token
+        :param str password: password used to get the token
+        :param str token: Optional token that was rejected by the agent, the cache item is only removed if it
+            is still this token. This stops a token that has just been refreshed by another thread from being removed.
+
+        :return: True if a token was removed from the cache
+        """
+        key = AuthorizationTokenCache.to_key(url, username, password)
+        with self._lock:
+            if key in self._items:
+                if token is None or self._items[key][0] == token:
+                    del self._items[key]
+                    return True
+        return False
+
+    def clear(self) -> None:
+        """
+        Remove all of the tokens from the cache, and reset the hit/miss counters.
+
+        """
+        with self._lock:
+            self._items = {}
+            self._hits = 0
+            self._misses = 0
+
+    @property
+    def stats(self):
+        """
+        :return: dict of the cache stats, hits, misses and size
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'size': len(self._items),
+            }
+
+    @property
+    def expire_seconds(self) -> float:
+        return self._expire_seconds
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @staticmethod
+    def to_key(url: str, username: str, password: str):
+        # only a hash of the credentials is held in the cache, not the password
+        credentials = hashlib.sha256(f'{username or ""}\n{password or ""}'.encode('utf-8')).digest()
+        return (url.rstrip('/'), credentials)
+
+    def _get_item(self, key, is_counted=True):
+        with self._lock:
+            item = self._items.get(key)
+            if item and item[1] < time.monotonic():
+                del self._items[key]
+                item = None
+            if is_counted:
+                if item:
+                    self._hits += 1
+                else:
+                    self._misses += 1
+            return item[0] if item else None
+
+    def _set_item(self, key, token):
+        if token is None:
+            return
+        with self._lock:
+            self._items[key] = (token, time.monotonic() + self._expire_seconds)
+
+    def _acquire_lock(self, locks, key, lock_class):
+        # return a [lock, user count] item for the key, the caller must call `_release_lock` when finished
+        with self._lock:
+            lock_item = locks.get(key)
+            if lock_item is None:
+                lock_item = [lock_class(), 0]
+                locks[key] = lock_item
+            lock_item[1] += 1
+            return lock_item
+
+    def _release_lock(self, locks, key, lock_item):
+        with self._lock:
+            lock_item[1] -= 1
+            if lock_item[1] <= 0 and locks.get(key) is lock_item:
+                del locks[key]
+
+
+def get_default_token_cache() -> AuthorizationTokenCache:
+    """
+    Return the default token cache, that is shared by all of the remote agents that
+    do not have a `token_cache` assigned.
+
+    """
+    global _default_token_cache
+    with _default_token_cache_lock:
+        if _default_token_cache is None:
+            _default_token_cache = AuthorizationTokenCache()
+        return _default_token_cache
+
+
+def set_default_token_cache(token_cache: AuthorizationTokenCache) -> None:
+    """
+    Set the default token cache used by all remote agents.
+
+    :param token_cache: new token cache to use as the default, if None a new default cache is
+        created on next use.
+    :type token_cache: :class:`.AuthorizationTokenCache`
+
+    """
+    global _default_token_cache
+    with _default_token_cache_lock:
+        _default_token_cache = token_cache
@@ -0,0 +1,226 @@
+"""
+    MetadataCache - Content addressed cache of asset metadata
+"""
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+from eth_utils import remove_0x_prefix
+
+from starfish.exceptions import StarfishAssetInvalid
+from starfish.utils.crypto_hash import hash_sha3_256
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 4096
+
+# the asset id is used as the filename of the disk cache, so only a 32 byte hex value is a valid key
+ASSET_ID_KEY_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+
+class MetadataCache():
+    """
+
+    Bounded LRU cache of asset metadata text, using the asset id as the key.
+
+    The asset id is the hash of the metadata text, so a cached item can never be out of date.
+    The hash is only checked once, when the metadata is added to the cache.
+
+    :param int max_size: Maximum number of metadata items to hold in memory.
+    :param str cache_path: Optional folder to also save the metadata items on disk, so that they
+        can be used by other processes. Items read from disk are checked before they are added to memory.
+
+    """
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, cache_path: str = None) -> None:
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self._max_size = max_size
+        self._cache_path = cache_path
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._disk_hits = 0
+        if cache_path:
+            os.makedirs(cache_path, exist_ok=True)
+
+    def get(self, asset_id: str) -> str:
+        """
+        Return the metadata text for the asset id.
+
+        :param str asset_id: asset id of the metadata
+
+        :return: metadata text or None if not found in the cache, or the asset id is not valid
+        """
+        asset_id = MetadataCache.to_key(asset_id)
+        if asset_id is None:
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock:
+            if asset_id in self._items:
+                self._items.move_to_end(asset_id)
+                self._hits += 1
+                return self._items[asset_id]
+
+        metadata_text = self._read_from_disk(asset_id)
+        with self._lock:
+            if metadata_text is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._disk_hits += 1
+                self._add_item(asset_id, metadata_text)
+        return metadata_text
+
+    def add(self, asset_id: str, metadata_text: str, is_valid: bool = False) -> None:
+        """
+        Add metadata text to the cache.
+
+        :param str asset_id: asset id of the metadata
+        :param str metadata_text: metadata text to add
+        :param bool is_valid: If True then the caller has already checked that the hash of the metadata is
+            the same as the asset id.
+
+        :raises: ValueError if the asset id is not a 32 byte hex value
+        :raises: StarfishAssetInvalid if the asset id is not the hash of the metadata text
+        """
+        key = MetadataCache.to_key(asset_id)
+        if key is None:
+            raise ValueError(f'invalid asset id {asset_id}')
+        asset_id = key
+        if not is_valid and hash_sha3_256(metadata_text) != asset_id:
+            raise StarfishAssetInvalid(f'metadata is not valid for asset {asset_id}')
+        with self._lock:
+            self._add_item(asset_id, metadata_text)
+        self._write_to_disk(asset_id, metadata_text)
+
+    def remove(self, asset_id: str) -> bool:
+        """
+        Remove the metadata from the memory and disk cache.
+
+        :return: True if the item was found in memory
+        """
+        asset_id = MetadataCache.to_key(asset_id)
+        if asset_id is None:
+            return False
+        filename = self._get_filename(asset_id)
+        if filename:
+            try:
+                os.remove(filename)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            if asset_id in self._items:
+                del self._items[asset_id]
+                return True
+        return False
+
+    def clear(self) -> None:
+        """
+        Clear all of the items held in memory, and reset the hit/miss counters.
+
+        """
+        with self._lock:
+            self._items = OrderedDict()
+            self._hits = 0
+            self._misses = 0
+            self._disk_hits = 0
+
+    @property
+    def stats(self):
+        """
+        :return: dict of the cache stats, hits, misses, disk_hits and size
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'disk_hits': self._disk_hits,
+                'size': len(self._items),
+            }
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def cache_path(self) -> str:
+        return self._cache_path
+
+    def __contains__(self, asset_id: str) -> bool:
+        with self._lock:
+            return MetadataCache.to_key(asset_id) in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @staticmethod
+    def to_key(asset_id: str) -> str:
+        """
+        Return the cache key of an asset id.
+
+        :param str asset_id: asset id with or without a '0x' prefix
+
+        :return: asset id as 64 lower case hex characters, or None if the asset id is not valid
+        """
+        if not isinstance(asset_id, str):
+            return None
+        key = remove_0x_prefix(asset_id).lower()
+        if not ASSET_ID_KEY_PATTERN.fullmatch(key):
+            return None
+        return key
+
+    def _add_item(self, asset_id, metadata_text):
+        self._items[asset_id] = metadata_text
+        self._items.move_to_end(asset_id)
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def _get_filename(self, asset_id):
+        # the asset id must already be checked by `to_key`, so the file is always inside the cache path
+        if self._cache_path and asset_id:
+            return os.path.join(self._cache_path, asset_id)
+        return None
+
+    def _read_from_disk(self, asset_id):
+        filename = self._get_filename(asset_id)
+        if filename is None or not os.path.exists(filename):
+            return None
+        try:
+            with open(filename, 'r', encoding='utf-8', newline='') as fp:
+                metadata_text = fp.read()
+        except OSError as e:
+            logger.warning(f'unable to read cached metadata {filename}: {e}')
+            return None
+        if hash_sha3_256(metadata_text) != asset_id:
+            logger.warning(f'cached metadata {filename} is not valid, removing')
+            self.remove(asset_id)
+            return None
+        return metadata_text
+
+    def _write_to_disk(self, asset_id, metadata_text):
+        filename = self._get_filename(asset_id)
+        if filename is None or os.path.exists(filename):
+            return
+        # write to a temp file and then rename, so that other processes never read a partial file
+        handle, temp_filename = tempfile.mkstemp(dir=self._cache_path, prefix='.tmp_')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8', newline='') as fp:
+                fp.write(metadata_text)
+            os.replace(temp_filename, filename)
+        except OSError as e:
+            logger.warning(f'unable to write cached metadata {filename}: {e}')
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
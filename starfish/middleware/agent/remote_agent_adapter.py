@@ -1,17 +1,24 @@
 """
     RemoteAgentAdapter - Adapter to access the Remote Services
 """
-import io
 import logging
 from urllib.parse import urljoin
 
 import requests
 
-from starfish.exceptions import StarfishConnectionError
+from starfish.exceptions import (
+    StarfishConnectionError,
+    StarfishRemoteAgentUnauthorized
+)
+from starfish.middleware.http_session_pool import get_default_session_pool
+from starfish.middleware.multipart_stream import MultipartStream
 from starfish.utils.crypto_hash import hash_sha3_256
 
 logger = logging.getLogger(__name__)
 
+# size of each data chunk when streaming asset data
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
 
 class ResponseWrapper():
     """
@@ -46,13 +53,42 @@ class ResponseWrapper():
             raise TypeError('Cannot find correct response data')
         return data
 
+    def iter_data(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Return an iterator of the response data in chunks, if the response was requested with `stream=True`
+        then only one chunk is held in memory at a time.
+
+        :param int chunk_size: maximum size of each chunk
+
+        """
+        if hasattr(self._response, 'iter_content'):
+            return self._response.iter_content(chunk_size=chunk_size)
+        return ResponseWrapper._iter_chunks(self.data, chunk_size)
+
+    def close(self):
+        if hasattr(self._response, 'close'):
+            self._response.close()
+
+    @staticmethod
+    def _iter_chunks(data, chunk_size):
+        view = memoryview(data)
+        for offset in range(0, len(view), chunk_size):
+            yield bytes(view[offset:offset + chunk_size])
+
 
 class RemoteAgentAdapter():
+    """
+
+    Adapter to make the HTTP calls to the remote agent services.
+
+    :param http_client: Optional HTTP client with the same `get`, `post` and `put` calls as the `requests` library.
+        If not set, this defaults to the shared keep-alive :class:`.HTTPSessionPool`.
 
+    """
     def __init__(self, http_client=None):
         self._http_client = http_client
         if self._http_client is None:
-            self._http_client = requests
+            self._http_client = get_default_session_pool()
 
     def register_asset(self, metadata, url, authorization_token=None):
         """
@@ -138,6 +174,47 @@ class RemoteAgentAdapter():
             raise ValueError(msg)
         return None
 
+    def download_asset_stream(self, asset_id, url, chunk_size=DEFAULT_CHUNK_SIZE, authorization_token=None):
+        """
+        Download the asset data as a stream of chunks, so that the full data is never held in memory.
+        The request is sent before this method returns, so any errors are raised here.
+
+        :param str asset_id: asset id of the data to download
+        :param str url: url of the storage service
+        :param int chunk_size: maximum size of each chunk
+
+        :return: iterator of bytes chunks
+        """
+        url = urljoin(f'{url}/', asset_id)
+
+        headers = RemoteAgentAdapter.create_headers('application/octet-stream', authorization_token)
+        response = self.request_get(url, headers=headers, stream=True)
+        if response is None:
+            msg = f'GET assets response failed: no response from {url}'
+            logger.error(msg)
+            raise ValueError(msg)
+        if response.status_code != requests.codes.ok:
+            msg = f'GET assets response failed: {response.status_code} {response}'
+            logger.error(msg)
+            ResponseWrapper(response).close()
+            raise ValueError(msg)
+        return RemoteAgentAdapter._iter_response(ResponseWrapper(response), chunk_size)
+
+    def get_asset_data_size(self, asset_id, url, authorization_token=None):
+        """
+        Return the size of the asset data held by the agent, without downloading the data.
+
+        :return: size of the data in bytes, or None if the agent does not have the data
+        """
+        url = urljoin(f'{url}/', asset_id)
+        headers = RemoteAgentAdapter.create_headers('application/octet-stream', authorization_token)
+        response = self.request_head(url, headers=headers)
+        if response is not None and response.status_code == requests.codes.ok:
+            content_length = response.headers.get('Content-Length')
+            if content_length is not None:
+                return int(content_length)
+        return None
+
     def get_listing(self, listing_id, url, authorization_token=None):
         url = urljoin(f'{url}/', f'listings/{listing_id}')
         headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
@@ -177,14 +254,17 @@ class RemoteAgentAdapter():
         return None
 
     def upload_asset_data(self, asset_id, data, url, authorization_token=None):
+        """
+        Upload the asset data as a multipart file. The data is streamed to the agent without being copied,
+        so `data` can be bytes, str, memoryview, mmap or an open binary file.
+
+        """
         url = urljoin(f'{url}/', asset_id)
 
         logger.debug(f'uploading data to {url}')
-        files = {
-            'file': (asset_id, io.BytesIO(data), 'application/octet-stream'),
-        }
-        headers = RemoteAgentAdapter.create_headers(None, authorization_token)
-        response = self.request_post(url, files=files, headers=headers)
+        with MultipartStream('file', asset_id, data) as stream:
+            headers = RemoteAgentAdapter.create_upload_headers(stream, authorization_token)
+            response = self.request_post(url, data=stream, headers=headers)
         if response and (response.status_code == requests.codes.ok or response.status_code == requests.codes.created):
             return True
         else:
@@ -272,17 +352,17 @@ class RemoteAgentAdapter():
             raise ValueError(msg)
         return None
 
-    def get_authorization_token(self, username, password, url):
+    def get_authorization_token(self, username, password, url, timeout=None):
         """Get an agent authorization token (create one if needed).
         Throws exception on error."""
-        response = self.request_get(url, auth=(username, password))
+        response = self.request_get(url, auth=(username, password), timeout=timeout)
         token = None
         if response.status_code == 200:
             tokens = ResponseWrapper(response).json
             if len(tokens) > 0:
                 token = tokens[-1]
             else:   # need to create a token
-                response = self.request_post(url, auth=(username, password))
+                response = self.request_post(url, auth=(username, password), timeout=timeout)
                 if response.status_code == 200:
                     token = ResponseWrapper(response).json
                 else:
@@ -296,20 +376,20 @@ class RemoteAgentAdapter():
         logger.debug(f'using agent token {token}')
         return token
 
-    def get_ddo(self, url, authorization_token=None):
+    def get_ddo(self, url, authorization_token=None, timeout=None):
         ddo_text = None
         url = urljoin(f'{url}/', '/api/ddo')
         logger.debug(f'get_ddo url {url}')
 
         headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
-        response = self.request_get(url, headers=headers)
+        response = self.request_get(url, headers=headers, timeout=timeout)
         if response.status_code == 200:
             ddo_text = ResponseWrapper(response).data.decode('utf-8')
         return ddo_text
 
     def get_collection_items(self, url, collection_name=None, authorization_token=None):
         if collection_name:
-            url = urljoin(url + '/', 'data/', collection_name)
+            url = urljoin(url + '/', f'data/{collection_name}')
         else:
             url = urljoin(url + '/', 'index')
         headers = RemoteAgentAdapter.create_headers('application/json', authorization_token)
@@ -363,6 +443,23 @@ class RemoteAgentAdapter():
             raise StarfishConnectionError(e)
         except requests.exceptions.Timeout as e:
             raise StarfishConnectionError(e)
+        RemoteAgentAdapter.check_authorized(response, kwargs.get('headers'))
+        return response
+
+    def request_head(self, *args, **kwargs):
+        try:
+            response = self._http_client.head(*args, **kwargs)
+        except requests.exceptions.HTTPError as e:
+            raise StarfishConnectionError(e)
+        except requests.exceptions.ConnectionError as e:
+            raise StarfishConnectionError(e)
+        except requests.exceptions.ProxyError as e:
+            raise StarfishConnectionError(e)
+        except requests.exceptions.SSLError as e:
+            raise StarfishConnectionError(e)
+        except requests.exceptions.Timeout as e:
+            raise StarfishConnectionError(e)
+        RemoteAgentAdapter.check_authorized(response, kwargs.get('headers'))
         return response
 
     def request_post(self, *args, **kwargs):
@@ -378,6 +475,7 @@ class RemoteAgentAdapter():
             raise StarfishConnectionError(e)
         except requests.exceptions.Timeout as e:
             raise StarfishConnectionError(e)
+        RemoteAgentAdapter.check_authorized(response, kwargs.get('headers'))
         return response
 
     def request_put(self, *args, **kwargs):
@@ -393,6 +491,7 @@ class RemoteAgentAdapter():
             raise StarfishConnectionError(e)
         except requests.exceptions.Timeout as e:
             raise StarfishConnectionError(e)
+        RemoteAgentAdapter.check_authorized(response, kwargs.get('headers'))
         return response
 
     @property
@@ -401,7 +500,7 @@ class RemoteAgentAdapter():
 
     @http_client.setter
     def http_client(self, value):
-        """Set the http client to something other than the default `requests`"""
+        """Set the http client to something other than the default `HTTPSessionPool`"""
         self._http_client = value
 
     @staticmethod
@@ -431,6 +530,36 @@ class RemoteAgentAdapter():
         """
         return hash_sha3_256(metadata_text)
 
+    @staticmethod
+    def _iter_response(response, chunk_size):
+        # release the connection back to the pool, even if the caller stops reading early
+        try:
+            for chunk in response.iter_data(chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            response.close()
+
+    @staticmethod
+    def check_authorized(response, headers=None):
+        """
+        Check that the agent has not rejected the authorization token sent in the request headers.
+
+        :param response: response returned by the http client
+        :param dict headers: headers sent with the request
+
+        :raises: StarfishRemoteAgentUnauthorized if a token was sent and the agent returned 401
+        """
+        if headers and 'Authorization' in headers and response is not None:
+            if getattr(response, 'status_code', None) == requests.codes.unauthorized:
+                raise StarfishRemoteAgentUnauthorized(f'agent rejected the authorization token: {response.status_code}')
+
+    @staticmethod
+    def create_upload_headers(stream, authorization_token=None):
+        headers = RemoteAgentAdapter.create_headers(stream.content_type, authorization_token)
+        headers['Content-Length'] = str(stream.content_length)
+        return headers
+
     @staticmethod
     def create_headers(content_type=None, authorization_token=None):
         headers = {}
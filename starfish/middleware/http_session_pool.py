@@ -0,0 +1,258 @@
+"""
+    HTTPSessionPool - Keep-alive HTTP sessions shared between remote agents
+
+"""
+import logging
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_MAXSIZE = 10
+
+_default_session_pool = None
+_default_session_pool_lock = threading.Lock()
+
+
+class HTTPSessionPool():
+    """
+
+    Managed pool of `requests.Session` objects, with one session for each host ( scheme, host and port ).
+    Each session keeps it's connections alive, so repeated calls to the same agent re-use the same
+    TCP/TLS connection.
+
+    This object has the same `get`, `post` and `put` calls as the `requests` library, so it can be used as the
+    `http_client` for the :class:`.RemoteAgentAdapter`, :class:`.RemoteAgent` and :class:`.AgentManager` objects.
+
+    :param int pool_maxsize: Maximum number of connections to keep open for each host.
+    :param bool keep_alive: If False then close the connection after each request.
+    :param int host_request_limit: Optional maximum number of concurrent requests to each host ( agent ).
+        Requests over this limit will wait for a free slot, and are counted as `pool_waits`.
+    :param int max_retries: Number of retries for failed connections.
+
+    For example::
+
+        session_pool = HTTPSessionPool(pool_maxsize=20, host_request_limit=8)
+        agent = RemoteAgent(ddo, http_client=session_pool)
+        agent.get_listings()
+        print(session_pool.stats)
+
+    """
+    def __init__(
+        self,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        keep_alive: bool = True,
+        host_request_limit: int = None,
+        max_retries: int = 0
+    ) -> None:
+        if pool_maxsize < 1:
+            raise ValueError('pool_maxsize must be at least 1')
+        if host_request_limit is not None and host_request_limit < 1:
+            raise ValueError('host_request_limit must be at least 1')
+
+        self._pool_maxsize = pool_maxsize
+        self._keep_alive = keep_alive
+        self._host_request_limit = host_request_limit
+        self._max_retries = max_retries
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        return self.request('get', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('post', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('put', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('delete', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('head', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request using the session for the url host.
+
+        :param str method: HTTP method to call
+        :param str url: URL of the request
+
+        :return: requests.Response object
+        """
+        host = self._get_host(url)
+        limit = host['limit']
+        if limit:
+            if not limit.acquire(blocking=False):
+                with self._lock:
+                    host['pool_waits'] += 1
+                limit.acquire()
+        try:
+            with self._lock:
+                host['requests'] += 1
+            return host['session'].request(method, url, **kwargs)
+        finally:
+            if limit:
+                limit.release()
+
+    def get_session(self, url: str) -> requests.Session:
+        """
+        Return the keep-alive session used for the url host.
+
+        :param str url: URL to find the host session
+
+        :return: session that is used for all requests to this host
+        :type: requests.Session
+        """
+        return self._get_host(url)['session']
+
+    def host_stats(self, url: str):
+        """
+        Return the usage stats for the host of this url.
+
+        :param str url: URL to find the host stats
+
+        :return: dict of stats, or None if no requests have been made to this host
+        """
+        key = HTTPSessionPool.get_host_key(url)
+        with self._lock:
+            if key not in self._hosts:
+                return None
+            return HTTPSessionPool._calc_stats(self._hosts[key])
+
+    def close(self) -> None:
+        """
+        Close all of the host sessions and their open connections.
+
+        """
+        with self._lock:
+            hosts = self._hosts
+            self._hosts = {}
+        for host in hosts.values():
+            host['session'].close()
+
+    @property
+    def stats(self):
+        """
+        Return the usage stats of all the hosts in this pool.
+
+        :return: dict of stats with the following items
+
+            requests: number of requests sent
+            connections: number of new connections opened
+            reused: number of requests that re-used an open connection
+            reuse_ratio: reused / requests
+            pool_waits: number of requests that had to wait for the `host_request_limit`
+            hosts: dict of the same stats for each host
+
+        """
+        result = {
+            'requests': 0,
+            'connections': 0,
+            'reused': 0,
+            'reuse_ratio': 0.0,
+            'pool_waits': 0,
+            'hosts': {}
+        }
+        with self._lock:
+            for key, host in self._hosts.items():
+                host_stats = HTTPSessionPool._calc_stats(host)
+                result['hosts'][key] = host_stats
+                for name in ('requests', 'connections', 'reused', 'pool_waits'):
+                    result[name] += host_stats[name]
+        if result['requests'] > 0:
+            result['reuse_ratio'] = result['reused'] / result['requests']
+        return result
+
+    @property
+    def pool_maxsize(self) -> int:
+        return self._pool_maxsize
+
+    @property
+    def keep_alive(self) -> bool:
+        return self._keep_alive
+
+    @property
+    def host_request_limit(self) -> int:
+        return self._host_request_limit
+
+    @staticmethod
+    def get_host_key(url: str) -> str:
+        """
+        Return the host key of the url, this is the lower case scheme, host and port.
+
+        """
+        parts = urlparse(url)
+        return f'{parts.scheme.lower()}://{parts.netloc.lower()}'
+
+    def _get_host(self, url):
+        key = HTTPSessionPool.get_host_key(url)
+        with self._lock:
+            if key not in self._hosts:
+                logger.debug(f'creating http session for {key}')
+                self._hosts[key] = {
+                    'session': self._create_session(),
+                    'limit': threading.BoundedSemaphore(self._host_request_limit) if self._host_request_limit else None,
+                    'requests': 0,
+                    'pool_waits': 0,
+                }
+            return self._hosts[key]
+
+    def _create_session(self):
+        session = requests.Session()
+        # only one host per session, so only one connection pool is needed in the adapter
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_maxsize, max_retries=self._max_retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not self._keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    @staticmethod
+    def _calc_stats(host):
+        connections = 0
+        adapters = set(host['session'].adapters.values())
+        for adapter in adapters:
+            pools = getattr(getattr(adapter, 'poolmanager', None), 'pools', None)
+            if pools:
+                for key in pools.keys():
+                    connections += getattr(pools[key], 'num_connections', 0)
+        reused = max(host['requests'] - connections, 0)
+        return {
+            'requests': host['requests'],
+            'connections': connections,
+            'reused': reused,
+            'reuse_ratio': reused / host['requests'] if host['requests'] > 0 else 0.0,
+            'pool_waits': host['pool_waits'],
+        }
+
+
+def get_default_session_pool() -> HTTPSessionPool:
+    """
+    Return the default session pool, that is shared by all of the remote agents that
+    do not have a `http_client` assigned.
+
+    """
+    global _default_session_pool
+    with _default_session_pool_lock:
+        if _default_session_pool is None:
+            _default_session_pool = HTTPSessionPool()
+        return _default_session_pool
+
+
+def set_default_session_pool(session_pool: HTTPSessionPool) -> None:
+    """
+    Set the default session pool, to change the pool size and limits for all remote agents.
+
+    :param session_pool: new session pool to use as the default, if None a new default pool is
+        created on next use.
+    :type session_pool: :class:`.HTTPSessionPool`
+
+    """
+    global _default_session_pool
+    with _default_session_pool_lock:
+        _default_session_pool = session_pool
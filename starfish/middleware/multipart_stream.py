@@ -0,0 +1,177 @@
+"""
+    MultipartStream - Stream a file upload as a multipart/form-data request body
+
+"""
+import io
+import os
+import secrets
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterator
+)
+
+# size of each block read from the payload when the body is sent
+DEFAULT_BLOCK_SIZE = 256 * 1024
+
+
+class MultipartStream():
+    """
+
+    File like object that contains a multipart/form-data body with one file field.
+
+    The payload is never copied into the body. Bytes, memoryview and mmap payloads are returned as memoryview
+    slices, and file payloads are read one block at a time, so the memory used by an upload stays the same
+    for any size of payload.
+
+    This object can be sent as the `data` of a `requests` call, or the `content` of a `httpx` call,
+    with the `content_type` and `content_length` as the request headers, for `httpx.AsyncClient` use :meth:`aiter_blocks`.
+
+    :param str field_name: Name of the form field
+    :param str filename: Filename to send in the form field
+    :param payload: Data to send, this can be bytes, str, memoryview, mmap or an open binary file.
+    :param str payload_content_type: Content type of the payload
+    :param int block_size: Maximum size of each block returned when sending the body
+
+    For example::
+
+        with open('large_file.dat', 'rb') as fp, MultipartStream('file', 'large_file.dat', fp) as stream:
+            headers = {'content-type': stream.content_type}
+            requests.post(url, data=stream, headers=headers)
+
+    """
+    def __init__(
+        self,
+        field_name: str,
+        filename: str,
+        payload: Any,
+        payload_content_type: str = 'application/octet-stream',
+        block_size: int = DEFAULT_BLOCK_SIZE
+    ) -> None:
+        self._boundary = secrets.token_hex(16)
+        self._block_size = block_size
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+
+        self._payload_file = None
+        self._payload_start = 0
+        if hasattr(payload, 'read') and not hasattr(payload, '__getitem__'):
+            # file object, the payload is read from the current file position to the end of the file
+            self._payload_file = payload
+            self._payload_start = payload.tell()
+            payload_length = MultipartStream._get_file_size(payload) - self._payload_start
+            self._payload_view = None
+        else:
+            self._payload_view = memoryview(payload).cast('B')
+            payload_length = len(self._payload_view)
+
+        self._header = (
+            f'--{self._boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+            f'Content-Type: {payload_content_type}\r\n\r\n'
+        ).encode('utf-8')
+        self._footer = f'\r\n--{self._boundary}--\r\n'.encode('utf-8')
+        self._payload_length = payload_length
+        self._length = len(self._header) + payload_length + len(self._footer)
+        self._offset = 0
+
+    def read(self, size: int = -1) -> Any:
+        """
+        Read the next block of the body, the block is never larger than `size` or the `block_size`.
+
+        :param int size: maximum number of bytes to read
+
+        :return: bytes or memoryview, an empty value is returned at the end of the body
+        """
+        if size is None or size < 0 or size > self._block_size:
+            size = self._block_size
+        header_end = len(self._header)
+        payload_end = header_end + self._payload_length
+        offset = self._offset
+        if offset >= self._length:
+            return b''
+        if offset < header_end:
+            block = self._header[offset:offset + size]
+        elif offset < payload_end:
+            block = self._read_payload(offset - header_end, min(size, payload_end - offset))
+        else:
+            block = self._footer[offset - payload_end:offset - payload_end + size]
+        self._offset += len(block)
+        return block
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._offset
+        elif whence == io.SEEK_END:
+            offset += self._length
+        self._offset = max(0, min(offset, self._length))
+        return self._offset
+
+    def tell(self) -> int:
+        return self._offset
+
+    def close(self) -> None:
+        """
+        Release the view of the payload, so that a mmap payload can be closed. The payload file is not closed.
+
+        """
+        if self._payload_view is not None:
+            self._payload_view.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self) -> Iterator[Any]:
+        self.seek(0)
+        while True:
+            block = self.read()
+            if not block:
+                break
+            yield block
+
+    async def aiter_blocks(self) -> AsyncIterator[Any]:
+        """
+        Return an async iterator of the body blocks, this can be used as the `content` of an async `httpx` request.
+
+        """
+        for block in self:
+            yield block
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self._boundary}'
+
+    @property
+    def content_length(self) -> int:
+        return self._length
+
+    @property
+    def boundary(self) -> str:
+        return self._boundary
+
+    def _read_payload(self, position, size):
+        if self._payload_view is not None:
+            return self._payload_view[position:position + size]
+        self._payload_file.seek(self._payload_start + position)
+        block = self._payload_file.read(size)
+        if len(block) != size:
+            raise IOError('payload file has changed size during the upload')
+        return block
+
+    @staticmethod
+    def _get_file_size(fp):
+        if hasattr(fp, 'fileno'):
+            try:
+                return os.fstat(fp.fileno()).st_size
+            except (OSError, io.UnsupportedOperation):
+                pass
+        position = fp.tell()
+        size = fp.seek(0, io.SEEK_END)
+        fp.seek(position)
+        return size
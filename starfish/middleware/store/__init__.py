@@ -0,0 +1,9 @@
+"""
+
+    Store Module
+
+"""
+from starfish.middleware.store.dict_store import DictStore                  # noqa: F401
+from starfish.middleware.store.sharded_store import ShardedStore            # noqa: F401
+from starfish.middleware.store.sqlite_store import SQLiteStore              # noqa: F401
+from starfish.middleware.store.store_base import StoreBase                  # noqa: F401
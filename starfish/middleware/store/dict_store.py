@@ -0,0 +1,50 @@
+"""
+    DictStore - In memory store held in one dict
+"""
+import threading
+from typing import (
+    Any,
+    Iterator,
+    List,
+    Tuple
+)
+
+from starfish.middleware.store.store_base import StoreBase
+
+
+class DictStore(StoreBase):
+    """
+
+    Store that holds all of the values in memory. Reads do not take a lock, and all writes use one lock.
+
+    For example::
+
+        agent = MemoryAgent(store=DictStore())
+
+    """
+    def __init__(self) -> None:
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def get(self, table: str, key: str, default: Any = None) -> Any:
+        return self._tables.get(table, {}).get(key, default)
+
+    def set(self, table: str, key: str, value: Any) -> None:
+        with self._lock:
+            self._tables.setdefault(table, {})[key] = value
+
+    def delete(self, table: str, key: str) -> bool:
+        with self._lock:
+            return self._tables.get(table, {}).pop(key, None) is not None
+
+    def items(self, table: str) -> Iterator[Tuple[str, Any]]:
+        with self._lock:
+            items = list(self._tables.get(table, {}).items())
+        return iter(items)
+
+    def keys(self, table: str) -> List[str]:
+        with self._lock:
+            return list(self._tables.get(table, {}).keys())
+
+    def count(self, table: str) -> int:
+        return len(self._tables.get(table, {}))
@@ -0,0 +1,63 @@
+"""
+    ShardedStore - In memory store split into shards, each with it's own lock
+"""
+import threading
+from typing import (
+    Any,
+    Iterator,
+    List,
+    Tuple
+)
+
+from starfish.middleware.store.store_base import StoreBase
+
+DEFAULT_SHARD_COUNT = 16
+
+
+class ShardedStore(StoreBase):
+    """
+
+    Store that holds all of the values in memory, split across a number of shards by the hash of the key.
+    Each shard has it's own lock, so writes to different shards do not wait for each other.
+
+    :param int shard_count: Number of shards
+
+    For example::
+
+        agent = MemoryAgent(store=ShardedStore(shard_count=64))
+
+    """
+    def __init__(self, shard_count: int = DEFAULT_SHARD_COUNT) -> None:
+        if shard_count < 1:
+            raise ValueError('shard_count must be 1 or more')
+        self._shards = [{} for _ in range(shard_count)]
+        self._locks = [threading.Lock() for _ in range(shard_count)]
+
+    def get(self, table: str, key: str, default: Any = None) -> Any:
+        return self._shards[self._get_index(table, key)].get((table, key), default)
+
+    def set(self, table: str, key: str, value: Any) -> None:
+        index = self._get_index(table, key)
+        with self._locks[index]:
+            self._shards[index][(table, key)] = value
+
+    def delete(self, table: str, key: str) -> bool:
+        index = self._get_index(table, key)
+        with self._locks[index]:
+            return self._shards[index].pop((table, key), None) is not None
+
+    def items(self, table: str) -> Iterator[Tuple[str, Any]]:
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                items = [(item_key[1], value) for item_key, value in shard.items() if item_key[0] == table]
+            yield from items
+
+    def keys(self, table: str) -> List[str]:
+        return [key for key, value in self.items(table)]
+
+    @property
+    def shard_count(self) -> int:
+        return len(self._shards)
+
+    def _get_index(self, table, key):
+        return hash((table, key)) % len(self._shards)
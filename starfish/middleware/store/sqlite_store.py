@@ -0,0 +1,120 @@
+"""
+    SQLiteStore - Store held in a SQLite database file
+"""
+import json
+import sqlite3
+import threading
+from typing import (
+    Any,
+    Iterator,
+    Tuple
+)
+
+from starfish.middleware.store.store_base import StoreBase
+
+# size of the memory map used to read the database file
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+
+
+class SQLiteStore(StoreBase):
+    """
+
+    Store that holds all of the values in a SQLite database file, so that the values are kept after a restart.
+
+    Each thread uses it's own connection, and the database uses write ahead logging, so reads from many threads
+    do not wait for each other or for a write. The database file is read using a memory map.
+
+    :param str filename: Filename of the database, the file is created if it does not exist
+    :param int mmap_size: Size of the memory map used to read the database file, 0 to read without a memory map
+
+    For example::
+
+        with SQLiteStore('memory_agent.db') as store:
+            agent = MemoryAgent(store=store)
+
+    """
+    def __init__(self, filename: str, mmap_size: int = DEFAULT_MMAP_SIZE) -> None:
+        filename = str(filename)
+        if filename == ':memory:' or filename.startswith('file::memory:'):
+            raise ValueError('SQLiteStore needs a database file, use DictStore to hold the values in memory')
+        self._filename = filename
+        self._mmap_size = int(mmap_size)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        connection = self._get_connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS store_item ('
+            'table_name TEXT NOT NULL, key TEXT NOT NULL, value, PRIMARY KEY (table_name, key)'
+            ') WITHOUT ROWID'
+        )
+
+    def get(self, table: str, key: str, default: Any = None) -> Any:
+        row = self._get_connection().execute(
+            'SELECT value FROM store_item WHERE table_name = ? AND key = ?', (table, key)
+        ).fetchone()
+        if row is None:
+            return default
+        return SQLiteStore._decode(row[0])
+
+    def set(self, table: str, key: str, value: Any) -> None:
+        self._get_connection().execute(
+            'INSERT OR REPLACE INTO store_item (table_name, key, value) VALUES (?, ?, ?)',
+            (table, key, SQLiteStore._encode(value))
+        )
+
+    def delete(self, table: str, key: str) -> bool:
+        cursor = self._get_connection().execute('DELETE FROM store_item WHERE table_name = ? AND key = ?', (table, key))
+        return cursor.rowcount > 0
+
+    def items(self, table: str) -> Iterator[Tuple[str, Any]]:
+        cursor = self._get_connection().execute('SELECT key, value FROM store_item WHERE table_name = ?', (table, ))
+        for key, value in cursor:
+            yield key, SQLiteStore._decode(value)
+
+    def has(self, table: str, key: str) -> bool:
+        row = self._get_connection().execute(
+            'SELECT 1 FROM store_item WHERE table_name = ? AND key = ?', (table, key)
+        ).fetchone()
+        return row is not None
+
+    def count(self, table: str) -> int:
+        return self._get_connection().execute('SELECT COUNT(*) FROM store_item WHERE table_name = ?', (table, )).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    def _get_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # autocommit, each statement is written in it's own transaction
+            connection = sqlite3.connect(self._filename, isolation_level=None, check_same_thread=False, timeout=30)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(f'PRAGMA mmap_size={self._mmap_size}')
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @staticmethod
+    def _encode(value):
+        # bytes are stored as a blob, all other values as JSON text
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value)
+        return json.dumps(value)
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, bytes):
+            return value
+        return json.loads(value)
@@ -0,0 +1,92 @@
+"""
+    StoreBase - Base class for the storage backends used by the MemoryAgent
+"""
+from abc import (
+    ABC,
+    abstractmethod
+)
+from typing import (
+    Any,
+    Iterator,
+    List,
+    Tuple
+)
+
+
+class StoreBase(ABC):
+    """
+
+    Key value store, where each value is held in a named table. Values can be any JSON value or bytes.
+
+    Values are returned as stored, so a returned value should not be changed, call `set` with a new value instead.
+
+    """
+
+    @abstractmethod
+    def get(self, table: str, key: str, default: Any = None) -> Any:
+        """
+        Return a value from the store.
+
+        :param str table: Name of the table
+        :param str key: Key of the value
+        :param default: Value to return if the key is not in the table
+
+        :return: stored value or the default value
+        """
+        pass
+
+    @abstractmethod
+    def set(self, table: str, key: str, value: Any) -> None:
+        """
+        Add or replace a value in the store.
+
+        :param str table: Name of the table
+        :param str key: Key of the value
+        :param value: JSON value or bytes to store
+
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, table: str, key: str) -> bool:
+        """
+        Remove a value from the store.
+
+        :param str table: Name of the table
+        :param str key: Key of the value
+
+        :return: True if the key was found in the table
+        """
+        pass
+
+    @abstractmethod
+    def items(self, table: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Return each key and value in a table.
+
+        :param str table: Name of the table
+
+        """
+        pass
+
+    def has(self, table: str, key: str) -> bool:
+        return self.get(table, key) is not None
+
+    def keys(self, table: str) -> List[str]:
+        return [key for key, value in self.items(table)]
+
+    def count(self, table: str) -> int:
+        return len(self.keys(table))
+
+    def close(self) -> None:
+        """
+        Close the store, and release any files or connections.
+
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
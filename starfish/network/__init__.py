@@ -1,2 +1,3 @@
 
 from starfish.network.ddo import DDO                                                  # noqa: F401
+from starfish.network.ddo_cache import DDOCache                                       # noqa: F401
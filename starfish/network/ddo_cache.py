@@ -0,0 +1,301 @@
+"""
+    DDOCache - Cache of resolved agent DDO's that is kept on disk
+"""
+import logging
+import os
+import threading
+import time
+from typing import (
+    Any,
+    Callable
+)
+from urllib.parse import urlparse
+
+from eth_utils import remove_0x_prefix
+
+from starfish.middleware.store.sqlite_store import SQLiteStore
+from starfish.middleware.store.store_base import StoreBase
+from starfish.network.ddo import DDO
+from starfish.network.did import (
+    did_to_id,
+    is_did
+)
+
+logger = logging.getLogger(__name__)
+
+# number of seconds that a cached DDO is used without resolving it again
+DEFAULT_TTL_SECONDS = 60 * 60
+
+# number of seconds after the TTL that a cached DDO is still used, while it is resolved again in the background
+DEFAULT_STALE_SECONDS = 24 * 60 * 60
+
+DEFAULT_FILENAME = os.path.join(os.path.expanduser('~'), '.cache', 'starfish', 'ddo_cache.db')
+
+STORE_TABLE_NAME = 'ddo'
+
+_default_ddo_cache = None
+_default_ddo_cache_lock = threading.Lock()
+
+
+class DDOCache():
+    """
+
+    Cache of resolved agent DDO's, keyed by the agent DID and by the agent URL.
+
+    The cache is held in a :class:`.SQLiteStore` database file by default, so the resolved DDO's are kept
+    after a process has finished, and many processes can use the same cache file at the same time.
+    Each DDO is stored with it's checksum, and a DDO that does not match it's checksum is not used.
+
+    A DDO is used without resolving the agent again until the TTL has passed. Then for another
+    `stale_seconds` the cached DDO is still returned, while the agent is resolved again in the background.
+
+    :param str filename: Optional filename of the cache database, defaults to `~/.cache/starfish/ddo_cache.db`
+    :param store: Optional store to hold the cache, if set then `filename` is not used
+    :type store: :class:`.StoreBase`
+    :param float ttl_seconds: Number of seconds that a cached DDO is used without resolving the agent again
+    :param float stale_seconds: Number of seconds after the TTL that the cached DDO is still used, 0 to always
+        wait for the agent to resolve again after the TTL
+
+    For example::
+
+        ddo_cache = DDOCache('/var/cache/ddo_cache.db', ttl_seconds=600)
+        agent_manager = AgentManager(ddo_cache=ddo_cache)
+        agent_manager.register_agent('surfer', url='http://localhost:3030')
+        agent = agent_manager.load_agent('surfer')
+        print(ddo_cache.stats)
+
+    """
+    def __init__(
+        self,
+        filename: str = None,
+        store: StoreBase = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        stale_seconds: float = DEFAULT_STALE_SECONDS
+    ) -> None:
+        if ttl_seconds < 0 or stale_seconds < 0:
+            raise ValueError('ttl_seconds and stale_seconds must be positive values')
+        if store is None:
+            filename = filename or DEFAULT_FILENAME
+            directory = os.path.dirname(os.path.abspath(filename))
+            os.makedirs(directory, exist_ok=True)
+            store = SQLiteStore(filename)
+        self._store = store
+        self._ttl_seconds = ttl_seconds
+        self._stale_seconds = stale_seconds
+        self._lock = threading.Lock()
+        self._revalidate_keys = set()
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+
+    def resolve(self, did_url: str, resolve_ddo: Callable[[], Any]) -> DDO:
+        """
+        Return a cached DDO, or call `resolve_ddo` to resolve the agent and cache the result.
+
+        :param str did_url: DID or URL of the agent
+        :param resolve_ddo: function with no parameters, that resolves the agent and returns a DDO or None
+
+        :return: DDO of the agent or None if the agent cannot be resolved
+        """
+        ddo, age = self._get_item(did_url)
+        if ddo is not None:
+            if age < self._ttl_seconds:
+                self._count('_hits')
+                return ddo
+            if age < self._ttl_seconds + self._stale_seconds:
+                self._count('_stale_hits')
+                self._revalidate(did_url, resolve_ddo)
+                return ddo
+        self._count('_misses')
+        ddo = resolve_ddo()
+        if ddo:
+            self.set(did_url, ddo)
+        return ddo
+
+    def get(self, did_url: str, allow_stale: bool = False) -> DDO:
+        """
+        Return a cached DDO.
+
+        :param str did_url: DID or URL of the agent
+        :param bool allow_stale: If True then return a DDO that is past the TTL, but still within the stale time
+
+        :return: DDO or None if the agent is not in the cache
+        """
+        ddo, age = self._get_item(did_url)
+        max_age = self._ttl_seconds + (self._stale_seconds if allow_stale else 0)
+        if ddo is not None and age < max_age:
+            return ddo
+        return None
+
+    def set(self, did_url: str, ddo: DDO) -> None:
+        """
+        Add a DDO to the cache, the DDO is also added using the DID of the DDO.
+
+        :param str did_url: DID or URL of the agent
+        :param ddo: DDO of the agent
+        :type ddo: :class:`.DDO`
+
+        """
+        value = {
+            'ddo_text': ddo.as_text,
+            'checksum': ddo.checksum,
+            'time': time.time(),
+        }
+        keys = {DDOCache.to_key(did_url), DDOCache.to_key(ddo.did)}
+        for key in keys:
+            if key:
+                self._store.set(STORE_TABLE_NAME, key, value)
+
+    def delete(self, did_url: str) -> bool:
+        """
+        Remove a DDO from the cache.
+
+        :param str did_url: DID or URL of the agent
+
+        :return: True if the DDO was found in the cache
+        """
+        key = DDOCache.to_key(did_url)
+        return bool(key) and self._store.delete(STORE_TABLE_NAME, key)
+
+    def clear(self) -> None:
+        """
+        Remove all of the DDO's from the cache.
+
+        """
+        for key in self._store.keys(STORE_TABLE_NAME):
+            self._store.delete(STORE_TABLE_NAME, key)
+
+    def close(self) -> None:
+        self._store.close()
+
+    @property
+    def stats(self) -> dict:
+        """
+        :return: dict of the number of hits, stale hits and misses of the cache
+        """
+        return {
+            'hits': self._hits,
+            'stale_hits': self._stale_hits,
+            'misses': self._misses,
+        }
+
+    @property
+    def store(self) -> StoreBase:
+        return self._store
+
+    @staticmethod
+    def to_key(did_url: str) -> str:
+        """
+        Return the cache key of an agent DID or URL.
+
+        :param str did_url: DID or URL of the agent
+
+        :return: 'did:' and the DID id, or 'url:' and the normalized URL, or None if the value is not a DID or URL
+        """
+        did_key = DDOCache.to_did_key(did_url)
+        if did_key:
+            return f'did:{did_key}'
+        url_key = DDOCache.to_url_key(did_url)
+        if url_key:
+            return f'url:{url_key}'
+        return None
+
+    @staticmethod
+    def to_url_key(url: str) -> str:
+        """
+        Return a normalized url, so that urls that only differ by case or a trailing '/' are the same.
+
+        :param str url: url to normalize
+
+        :returns: normalized url, or None if the value is not a url
+        """
+        if not isinstance(url, str):
+            return None
+        parts = urlparse(url.strip())
+        if not parts.scheme or not parts.netloc:
+            return None
+        url_key = f'{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path.rstrip("/")}'
+        if parts.query:
+            url_key += f'?{parts.query}'
+        return url_key
+
+    @staticmethod
+    def to_did_key(did: str) -> str:
+        """
+        Return the id of a did, so that dids can be matched with or without a path or '0x' prefix.
+
+        :param str did: did to convert
+
+        :returns: did id as lower case hex, or None if the value is not a did
+        """
+        if not isinstance(did, str) or not is_did(did):
+            return None
+        did_id = did_to_id(did)
+        return remove_0x_prefix(did_id).lower() if did_id else None
+
+    def _get_item(self, did_url):
+        # return the cached DDO and it's age in seconds, or None if not found or the DDO is not valid
+        key = DDOCache.to_key(did_url)
+        if not key:
+            return None, None
+        value = self._store.get(STORE_TABLE_NAME, key)
+        if not value:
+            return None, None
+        try:
+            ddo = DDO.import_from_text(value['ddo_text'])
+            if ddo.checksum == value['checksum']:
+                return ddo, time.time() - value['time']
+        except (KeyError, TypeError, ValueError):
+            pass
+        logger.warning(f'invalid DDO found in the cache for {did_url}')
+        self._store.delete(STORE_TABLE_NAME, key)
+        return None, None
+
+    def _revalidate(self, did_url, resolve_ddo):
+        # resolve the agent again in a background thread, only one thread is used for each key
+        key = DDOCache.to_key(did_url)
+        with self._lock:
+            if key in self._revalidate_keys:
+                return
+            self._revalidate_keys.add(key)
+
+        def revalidate():
+            try:
+                ddo = resolve_ddo()
+                if ddo:
+                    self.set(did_url, ddo)
+            except Exception as error:
+                logger.warning(f'cannot resolve agent {did_url}: {error}')
+            finally:
+                with self._lock:
+                    self._revalidate_keys.discard(key)
+
+        threading.Thread(target=revalidate, name='ddo_cache_revalidate', daemon=True).start()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+def get_default_ddo_cache() -> DDOCache:
+    """
+    Return the default DDO cache, that is used by the agent managers and networks that do
+    not have a `ddo_cache` assigned.
+
+    :return: DDO cache object, or None if no default DDO cache has been set
+    """
+    with _default_ddo_cache_lock:
+        return _default_ddo_cache
+
+
+def set_default_ddo_cache(ddo_cache: DDOCache) -> None:
+    """
+    Set the default DDO cache used to resolve agents.
+
+    :param ddo_cache: new DDO cache to use as the default, if None then resolved DDO's are not cached.
+    :type ddo_cache: :class:`.DDOCache`
+
+    """
+    global _default_ddo_cache
+    with _default_ddo_cache_lock:
+        _default_ddo_cache = ddo_cache
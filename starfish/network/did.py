@@ -6,16 +6,40 @@ DID utils
 import re
 import secrets
 import warnings
-
+from functools import lru_cache
+from typing import (
+    Any,
+    List,
+    Tuple
+)
 from urllib.parse import urlparse
-from eth_utils import remove_0x_prefix
 
-from web3 import Web3
+from eth_utils import (
+    add_0x_prefix,
+    remove_0x_prefix
+)
 
 from starfish.types import DIDParts
 
 NETWORK_DID_METHOD = 'dep'
 
+# maximum number of parsed DIDs held in memory
+DID_PARSE_CACHE_SIZE = 64 * 1024
+
+DID_START_PATTERN = re.compile('^did:', re.IGNORECASE)
+DID_METHOD_PATTERN = re.compile('^did:([a-z0-9]+):', re.IGNORECASE)
+DID_PATTERN = re.compile('^did:([a-z0-9]+):([a-f0-9]{64})(.*)', re.IGNORECASE)
+DID_ID_HEX_PATTERN = re.compile('^[0-9a-f]{1,64}$', re.IGNORECASE)
+# a DID path that `urlparse` would return unchanged, with no fragment
+DID_SIMPLE_PATH_PATTERN = re.compile(r'/(?!/)[^#?;:\s\x00-\x1f\x7f]*')
+ASSET_ID_PATTERN = re.compile(r'^[0x]{0,2}[a-f0-9]{64}$')
+ASSET_ID_HEX_PATTERN = re.compile(r'^[0-9a-fx]+$', re.IGNORECASE)
+ASSET_DID_PATH_PATTERN = re.compile('^[0-9a-fx]{1,66}$', re.IGNORECASE)
+# an asset DID with a hex path, or an asset id, that can be decoded to 32 bytes without parsing the DID
+ASSET_ID_BYTES_PATTERN = re.compile(r'(?:did:[a-z0-9]+:[a-f0-9]{64}/)?(?:0x)?([a-f0-9]{64})', re.IGNORECASE)
+
+ASSET_ID_SIZE = 32
+
 
 def did_validate(did: str) -> bool:
     """
@@ -31,14 +55,9 @@ def did_validate(did: str) -> bool:
     if not isinstance(did, str):
         raise TypeError('Expecting DID of string type, got %s of %s type' % (did, type(did)))
 
-    if not re.match('^did:', did, re.IGNORECASE):
-        raise ValueError(f'DID {did} must start with the text "did"')
-
-    if not re.match('^did:([a-z0-9]+):', did, re.IGNORECASE):
-        raise ValueError(f'DID {did} "id" must have only a-z 0-9 characters')
-
-    if not re.match('^did:[a-z0-9]+:[a-f0-9]{64}.*', did, re.IGNORECASE):
-        raise ValueError(f'DID {did} path should only have hex characters')
+    error, _ = _did_parse_cached(did)
+    if error:
+        raise ValueError(error)
     return True
 
 
@@ -50,11 +69,10 @@ def is_did(did: str) -> bool:
     :param str did: DID string to validate, this can be an agent did or an asset_did
 
     """
-    try:
-        return did_validate(did)
-    except (ValueError, TypeError):
-        pass
-    return False
+    if not isinstance(did, str):
+        return False
+    error, _ = _did_parse_cached(did)
+    return error is None
 
 
 def asset_did_validate(asse_did: str) -> bool:
@@ -71,7 +89,7 @@ def asset_did_validate(asse_did: str) -> bool:
     value = did_parse(asse_did)
     if value['path'] is None:
         raise ValueError(f'DID {asse_did} does not have an asset_id')
-    if not re.match(r'^[0x]{0,2}[a-f0-9]{64}$', value['path']):
+    if not ASSET_ID_PATTERN.match(value['path']):
         raise ValueError(f'DID {asse_did} has an invalid asset_id')
     return True
 
@@ -96,6 +114,9 @@ def did_parse(did: str) -> DIDParts:
 
     did:<method>:<id/id_hex>[/<path>[#<fragment>]]
 
+    The parsed parts of the most recently used DIDs are held in memory, so parsing the
+    same DID again does not run any of the regular expressions.
+
     :param str did: DID to parse into seperate components
     :return: Dict of parts they are:
         method,
@@ -108,31 +129,15 @@ def did_parse(did: str) -> DIDParts:
     """
 
     did_validate(did)
-
-    match = re.match('^did:([a-z0-9]+):([a-f0-9]{64})(.*)', did, re.IGNORECASE)
-    result = {
-        'method': match.group(1),
-        'id': match.group(2),
-        'path': None,
-        'fragment': None,
-        'id_hex': None
+    _, (method, did_id, path, fragment, id_hex) = _did_parse_cached(did)
+    return {
+        'method': method,
+        'id': did_id,
+        'path': path,
+        'fragment': fragment,
+        'id_hex': id_hex
     }
 
-    uri_text = match.group(3)
-    if uri_text:
-        uri = urlparse(uri_text)
-        result['fragment'] = uri.fragment
-        if uri.path:
-            result['path'] = uri.path[1:]
-
-    if result['method'] == NETWORK_DID_METHOD and re.match('^[0-9a-f]{1,64}$', result['id'], re.IGNORECASE):
-        result['id_hex'] = Web3.toHex(hexstr=result['id'])
-
-    if not result['id_hex'] and result['id'].startswith('0x'):
-        result['id_hex'] = result['id']
-
-    return result
-
 
 def did_generate_random() -> str:
     """
@@ -151,8 +156,9 @@ def did_to_id(did: str) -> str:
 
     """
 
-    data = did_parse(did)
-    return data['id_hex']
+    did_validate(did)
+    _, parts = _did_parse_cached(did)
+    return parts[4]
 
 
 def id_to_did(did_id: str) -> str:
@@ -178,20 +184,100 @@ def decode_to_asset_id(asset_did_id: str) -> str:
     """
 
     asset_id = None
-    if re.match(r'^[0-9a-fx]+$', asset_did_id, re.IGNORECASE):
-        asset_id = Web3.toHex(hexstr=asset_did_id)
+    if ASSET_ID_HEX_PATTERN.match(asset_did_id):
+        # same as `Web3.toHex(hexstr=asset_did_id)`
+        asset_id = add_0x_prefix(asset_did_id.lower())
     else:
-        data = did_parse(asset_did_id)
-        if data['path'] is None:
+        did_validate(asset_did_id)
+        _, parts = _did_parse_cached(asset_did_id)
+        path = parts[2]
+        if path is None:
             raise ValueError(f'Unable to get an asset_id from an agent DID address {asset_did_id}')
 
-        if data['path'] and re.match('^[0-9a-fx]{1,66}$', data['path'], re.IGNORECASE):
-            asset_id = data['path']
+        if path and ASSET_DID_PATH_PATTERN.match(path):
+            asset_id = path
         else:
             raise ValueError(f'DID with asset_id is not valid {asset_did_id}')
     return remove_0x_prefix(asset_id)
 
 
+def is_did_many(dids: Any) -> bytearray:
+    """
+
+    Validate each DID in a sequence with the same checks as :func:`is_did`, without using the DID parse cache.
+    The DIDs are checked one at a time, this only saves building a list of results.
+
+    :param dids: sequence of DID strings, or a NumPy or Arrow string array
+    :return: bytearray mask with 1 for each valid DID and 0 for each invalid DID, in the same order as the DIDs
+
+    For example::
+
+        mask = is_did_many(did_list)
+        valid_dids = [did for did, is_valid in zip(did_list, mask) if is_valid]
+
+    """
+    items = _to_string_list(dids)
+    mask = bytearray(len(items))
+    for index, did in enumerate(items):
+        if isinstance(did, str) and _did_parse_parts(did)[0] is None:
+            mask[index] = 1
+    return mask
+
+
+def is_asset_did_many(asset_dids: Any) -> bytearray:
+    """
+
+    Validate each asset DID in a sequence with the same checks as :func:`is_asset_did`, without using the DID parse cache.
+
+    :param asset_dids: sequence of asset DID strings, or a NumPy or Arrow string array
+    :return: bytearray mask with 1 for each valid asset DID and 0 for each invalid asset DID
+
+    """
+    items = _to_string_list(asset_dids)
+    mask = bytearray(len(items))
+    for index, asset_did in enumerate(items):
+        if not isinstance(asset_did, str):
+            continue
+        error, parts = _did_parse_parts(asset_did)
+        if error is None and parts[2] is not None and ASSET_ID_PATTERN.match(parts[2]):
+            mask[index] = 1
+    return mask
+
+
+def decode_to_asset_id_many(asset_did_ids: Any) -> Tuple[bytearray, bytes]:
+    """
+
+    Decode each asset DID or asset id in a sequence to a 32 byte asset id, see :func:`decode_to_asset_id`.
+    The values are decoded one at a time, a plain asset DID or asset id only needs one regex match.
+
+    :param asset_did_ids: sequence of asset DID or asset id strings, or a NumPy or Arrow string array
+    :return: tuple of ( mask, asset_ids ). The mask is a bytearray with 1 for each value that was decoded, and
+        0 for each value that is not an asset DID or asset id of 32 bytes. The asset ids are packed into one
+        bytes value, with 32 bytes for each value in the same order as the values, and all zero bytes for a value
+        that was not decoded.
+
+    For example::
+
+        mask, asset_ids = decode_to_asset_id_many(catalog_dids)
+        asset_id = asset_ids[index * 32:(index + 1) * 32]
+
+        # as NumPy arrays
+        is_valid = numpy.frombuffer(mask, dtype=bool)
+        asset_id_array = numpy.frombuffer(asset_ids, dtype='S32')
+
+    """
+    items = _to_string_list(asset_did_ids)
+    mask = bytearray(len(items))
+    asset_ids = bytearray(len(items) * ASSET_ID_SIZE)
+    for index, asset_did_id in enumerate(items):
+        asset_id = _decode_to_asset_id_bytes(asset_did_id)
+        if asset_id is not None:
+            mask[index] = 1
+            offset = index * ASSET_ID_SIZE
+            asset_ids[offset:offset + ASSET_ID_SIZE] = asset_id
+    return mask, bytes(asset_ids)
+
+
 def did_to_asset_id(did: str) -> str:
     """
 
@@ -199,3 +285,73 @@ def did_to_asset_id(did: str) -> str:
     """
     warnings.warn('use "decode_to_asset_id" instead', DeprecationWarning)
     return decode_to_asset_id(did)
+
+
+def _did_parse_parts(did):
+    # return a tuple of ( error message, None ) for an invalid DID, or
+    # ( None, ( method, id, path, fragment, id_hex ) ) for a valid DID
+    match = DID_PATTERN.match(did)
+    if match is None:
+        if not DID_START_PATTERN.match(did):
+            return f'DID {did} must start with the text "did"', None
+        if not DID_METHOD_PATTERN.match(did):
+            return f'DID {did} "id" must have only a-z 0-9 characters', None
+        return f'DID {did} path should only have hex characters', None
+
+    method, did_id, uri_text = match.groups()
+    path = None
+    fragment = None
+    if uri_text:
+        if DID_SIMPLE_PATH_PATTERN.fullmatch(uri_text):
+            # most asset DIDs only have a hex path, so there is no need to call `urlparse`
+            path = uri_text[1:]
+            fragment = ''
+        else:
+            uri = urlparse(uri_text)
+            fragment = uri.fragment
+            if uri.path:
+                path = uri.path[1:]
+
+    id_hex = None
+    if method == NETWORK_DID_METHOD and DID_ID_HEX_PATTERN.match(did_id):
+        # same as `Web3.toHex(hexstr=did_id)`
+        id_hex = add_0x_prefix(did_id.lower())
+
+    if not id_hex and did_id.startswith('0x'):
+        id_hex = did_id
+
+    return None, (method, did_id, path, fragment, id_hex)
+
+
+# the batch functions call `_did_parse_parts` directly, so that many different DIDs do not fill the cache
+_did_parse_cached = lru_cache(maxsize=DID_PARSE_CACHE_SIZE)(_did_parse_parts)
+
+
+def _to_string_list(values: Any) -> List[Any]:
+    # convert an Arrow array, NumPy array or any other sequence to a list
+    if hasattr(values, 'to_pylist'):
+        return values.to_pylist()
+    if hasattr(values, 'tolist'):
+        return values.tolist()
+    return list(values)
+
+
+def _decode_to_asset_id_bytes(asset_did_id):
+    if isinstance(asset_did_id, bytes):
+        # NumPy bytes string arrays
+        asset_did_id = asset_did_id.decode('utf-8', 'replace')
+    if not isinstance(asset_did_id, str):
+        return None
+    match = ASSET_ID_BYTES_PATTERN.fullmatch(asset_did_id)
+    if match:
+        return bytes.fromhex(match.group(1))
+    try:
+        asset_id = decode_to_asset_id(asset_did_id)
+    except ValueError:
+        return None
+    if len(asset_id) != ASSET_ID_SIZE * 2:
+        return None
+    try:
+        return bytes.fromhex(asset_id)
+    except ValueError:
+        return None
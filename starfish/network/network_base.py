@@ -15,6 +15,7 @@ from abc import (
 
 from starfish.network.account_base import AccountBase
 from starfish.network.ddo import DDO
+from starfish.network.ddo_cache import get_default_ddo_cache
 from starfish.network.did import is_did
 from starfish.types import Authentication
 
@@ -55,6 +56,23 @@ class NetworkBase(ABC):
         authentication: Authentication = None
     ) -> DDO:
 
+        # use the default DDO cache, if one has been set
+        ddo_cache = get_default_ddo_cache()
+        if ddo_cache:
+            return ddo_cache.resolve(
+                agent_url_did,
+                lambda: self._resolve_agent(agent_url_did, username, password, authentication)
+            )
+        return self._resolve_agent(agent_url_did, username, password, authentication)
+
+    def _resolve_agent(
+        self,
+        agent_url_did: str,
+        username: str = None,
+        password: str = None,
+        authentication: Authentication = None
+    ) -> DDO:
+
         # stop circular references on import
 
         from starfish.agent.remote_agent import RemoteAgent
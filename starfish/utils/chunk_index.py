@@ -0,0 +1,131 @@
+"""
+
+Utils: Chunk Index.
+
+Index of the data chunks that have already been uploaded to an agent, so that the same data is not uploaded twice.
+
+
+"""
+import json
+import os
+import tempfile
+import threading
+from typing import Any
+
+from eth_utils import remove_0x_prefix
+
+
+class ChunkIndex():
+    """
+
+    Thread safe index of data chunks that are stored on one agent, using the `contentHash` of the chunk
+    as the key and the asset id of the chunk asset as the value.
+
+    :param str filename: Optional JSON file to load and save the index, so that it can be used
+        by later uploads.
+
+    For example::
+
+        chunk_index = ChunkIndex('~/.starfish/chunk_index.json')
+        bundle_asset = register_upload_bundle_file(agent, 'large_file.dat', chunk_index=chunk_index)
+        chunk_index.save()
+        print(f'{chunk_index.hits} chunks were already on the agent')
+
+    """
+    def __init__(self, filename: str = None) -> None:
+        self._filename = os.path.expanduser(filename) if filename else None
+        self._items = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        if self._filename and os.path.exists(self._filename):
+            with open(self._filename, 'r') as fp:
+                self._items = json.load(fp)
+
+    def get(self, content_hash: str) -> str:
+        """
+        Return the asset id of the chunk with the content hash.
+
+        :param str content_hash: hash of the chunk data
+
+        :return: asset id or None if the chunk is not in the index
+        """
+        with self._lock:
+            asset_id = self._items.get(ChunkIndex.to_key(content_hash))
+            if asset_id:
+                self._hits += 1
+            return asset_id
+
+    def add(self, content_hash: str, asset_id: str) -> None:
+        """
+        Add a chunk that has been uploaded to the agent.
+
+        :param str content_hash: hash of the chunk data
+        :param str asset_id: asset id of the chunk asset on the agent
+        """
+        with self._lock:
+            self._items[ChunkIndex.to_key(content_hash)] = remove_0x_prefix(asset_id)
+
+    def remove(self, content_hash: str) -> bool:
+        """
+        Remove a chunk from the index.
+
+        :return: True if the chunk was found in the index
+        """
+        with self._lock:
+            return self._items.pop(ChunkIndex.to_key(content_hash), None) is not None
+
+    def update_from_agent(self, remote_agent: Any) -> int:
+        """
+        Add all of the data assets that are listed by the agent metadata index.
+
+        :param remote_agent: Agent that has the `get_metadata_list` call
+
+        :return: number of chunks added to the index
+        """
+        count = 0
+        metadata_list = remote_agent.get_metadata_list() or {}
+        with self._lock:
+            for asset_id, metadata in metadata_list.items():
+                if isinstance(metadata, dict) and metadata.get('type') == 'dataset' and metadata.get('contentHash'):
+                    self._items[ChunkIndex.to_key(metadata['contentHash'])] = remove_0x_prefix(asset_id)
+                    count += 1
+        return count
+
+    def save(self) -> None:
+        """
+        Save the index to the index file.
+
+        """
+        if not self._filename:
+            raise ValueError('no filename set for the chunk index')
+        with self._lock:
+            items = dict(self._items)
+        folder = os.path.dirname(os.path.abspath(self._filename))
+        os.makedirs(folder, exist_ok=True)
+        handle, temp_filename = tempfile.mkstemp(dir=folder, prefix='.tmp_')
+        try:
+            with os.fdopen(handle, 'w') as fp:
+                json.dump(items, fp)
+            os.replace(temp_filename, self._filename)
+        finally:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    def __contains__(self, content_hash: str) -> bool:
+        with self._lock:
+            return ChunkIndex.to_key(content_hash) in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @staticmethod
+    def to_key(content_hash: str) -> str:
+        return remove_0x_prefix(content_hash).lower()
@@ -3,19 +3,147 @@
 CryptoHash utils
 
 """
-from typing import Any
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    List
+)
 
-from Crypto.Hash import SHA3_256
 from web3 import Web3
 
+# size of each block read from a file object when hashing
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+
+class Sha3Hasher():
+    """
+
+    Incremental sha3_256 hash, that can be updated with str, bytes like values, file objects or
+    iterables of chunks, so that the data never needs to be held in memory at once.
+
+    This uses the native `hashlib` sha3_256, which releases the GIL while it hashes large buffers, so
+    many threads can hash data at the same time.
+
+    :param data: Optional first value to add to the hash
+
+    For example::
+
+        hasher = Sha3Hasher()
+        with open('large_file.dat', 'rb') as fp:
+            hasher.update(fp)
+        print(hasher.hexdigest())
+
+    """
+    __slots__ = ('_message_digest', )
+
+    def __init__(self, data: Any = None) -> None:
+        self._message_digest = hashlib.sha3_256()
+        if data is not None:
+            self.update(data)
+
+    def update(self, data: Any, block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        """
+        Add data to the hash.
+
+        :param data: str, bytes, bytearray, memoryview, mmap, a binary file object or a list, tuple or
+            iterator of any of these
+        :param int block_size: Size of each block read from a file object
+
+        :raises TypeError: if the data is None or cannot be hashed
+        """
+        if isinstance(data, str):
+            self._message_digest.update(data.encode('utf-8'))
+        elif isinstance(data, (bytes, bytearray, memoryview)) or _is_buffer(data):
+            self._message_digest.update(data)
+        elif hasattr(data, 'readinto'):
+            self._update_from_file(data, block_size)
+        elif hasattr(data, 'read'):
+            while True:
+                block = data.read(block_size)
+                if not block:
+                    break
+                self.update(block)
+        elif hasattr(data, '__iter__') and not isinstance(data, (dict, set, frozenset)):
+            for item in data:
+                self.update(item, block_size)
+        else:
+            raise TypeError(f'cannot hash a value of type {type(data).__name__}')
+
+    def digest(self) -> bytes:
+        return self._message_digest.digest()
+
+    def hexdigest(self) -> str:
+        return self._message_digest.hexdigest()
+
+    def copy(self) -> Any:
+        hasher = Sha3Hasher()
+        hasher._message_digest = self._message_digest.copy()
+        return hasher
+
+    def _update_from_file(self, fp, block_size):
+        # read into the same buffer for each block, so no new bytes object is made for each block
+        buffer = bytearray(block_size)
+        with memoryview(buffer) as view:
+            while True:
+                size = fp.readinto(buffer)
+                if not size:
+                    break
+                self._message_digest.update(view[:size])
+
 
 def hash_sha3_256(data: Any) -> str:
+    """
+    Return the sha3_256 hash of the data.
+
+    :param data: str, bytes like value, file object or iterable of chunks, see :meth:`Sha3Hasher.update`
+
+    :return: hash as a hex string
+    :raises TypeError: if the data is None or cannot be hashed
+    """
     if isinstance(data, str):
         data = data.encode('utf-8')
+    if isinstance(data, bytes):
+        return hashlib.sha3_256(data).hexdigest()
+    hasher = Sha3Hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def hash_sha3_256_file(filename: str, block_size: int = DEFAULT_BLOCK_SIZE) -> str:
+    """
+    Return the sha3_256 hash of a file, the file is read in blocks so it's never held in memory.
+
+    """
+    hasher = Sha3Hasher()
+    with open(filename, 'rb') as fp:
+        hasher.update(fp, block_size)
+    return hasher.hexdigest()
+
 
-    messageDigest = SHA3_256.new()
-    messageDigest.update(data)
-    return messageDigest.hexdigest()
+def hash_sha3_256_many(items: Any, max_workers: int = None) -> List[str]:
+    """
+    Return the sha3_256 hash of many values, the values are hashed in parallel across threads.
+
+    :param items: list of values to hash, each value can be any type accepted by :func:`hash_sha3_256`
+    :param int max_workers: Number of threads to use, if None then the number of cpus is used
+
+    :return: list of hashes as hex strings, in the same order as the items
+
+    For example::
+
+        content_hashes = hash_sha3_256_many(chunk_list)
+
+    """
+    items = list(items)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(items))
+    if max_workers <= 1:
+        return [hash_sha3_256(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(hash_sha3_256, items))
 
 
 def hash_keccak_256(data: Any) -> str:
@@ -23,3 +151,11 @@ def hash_keccak_256(data: Any) -> str:
         data = data.encode('utf-8')
 
     return Web3.toHex(Web3.sha3(data))[2:]
+
+
+def _is_buffer(data):
+    try:
+        memoryview(data).release()
+    except TypeError:
+        return False
+    return True
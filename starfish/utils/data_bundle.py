@@ -7,20 +7,53 @@ Allow to split up data into 'chunks' and each chunk is an asset, and all of the
 
 """
 
+import hashlib
+import logging
 import math
 import os
 import re
-from typing import Any
+import threading
+from collections import deque
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    as_completed
+)
+from typing import (
+    Any,
+    Iterator
+)
+
+from eth_utils import remove_0x_prefix
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from starfish.agent.agent_base import AgentBase
 from starfish.asset import (
     BundleAsset,
     DataAsset
 )
+from starfish.exceptions import StarfishAssetInvalid
+from starfish.utils.chunk_index import ChunkIndex
+from starfish.utils.crypto_hash import (
+    Sha3Hasher,
+    hash_sha3_256
+)
+from starfish.utils.merkle_tree import calculate_merkle_root
+
+logger = logging.getLogger(__name__)
 
 # WARNING currently surfer cannot support > 6mb in asset data size
 DEFAULT_CHUNK_SIZE = '6mb'
 
+# number of chunks to register and upload at the same time
+DEFAULT_UPLOAD_WORKERS = 4
+
+# number of chunks to download at the same time
+DEFAULT_DOWNLOAD_WORKERS = 4
+
 
 def decode_readable_size(text: str, base_size: int = 1024) -> str:
     sizes = {
@@ -43,7 +76,33 @@ def decode_readable_size(text: str, base_size: int = 1024) -> str:
     return None
 
 
-def register_upload_data(remote_agent: AgentBase, name: str, data_stream: Any, chunk_size_value: int = None) -> Any:
+def register_upload_data(
+    remote_agent: AgentBase,
+    name: str,
+    data_stream: Any,
+    chunk_size_value: int = None,
+    max_workers: int = DEFAULT_UPLOAD_WORKERS,
+    chunk_index: ChunkIndex = None,
+    is_content_defined: bool = False
+) -> Any:
+    """
+    Split the data stream into chunks, and register and upload each chunk as a data asset.
+    The chunks are uploaded in parallel, with at most `max_workers` chunks held in memory at once.
+
+    :param remote_agent: Agent to register and upload the data assets
+    :param str name: Name of the bundle asset
+    :param data_stream: Stream to read the data
+    :param chunk_size_value: Size of each chunk, as an int or a readable size such as '6mb'.
+        For content defined chunks this is the maximum chunk size.
+    :param int max_workers: Number of chunks to register and upload at the same time
+    :param chunk_index: Optional :class:`.ChunkIndex` of the chunks already on the agent. Chunks found in the index
+        are added to the bundle without being uploaded, and new chunks are added to the index.
+    :param bool is_content_defined: If True, split the data at points found by a rolling hash of the data, so that
+        inserting or removing data only changes the chunks near the change. This only pays off with a `chunk_index`
+        of data that has been uploaded before, see :func:`iter_content_defined_chunks` for the cost.
+
+    :return: the registered bundle asset, with each data asset in the same order as the data stream
+    """
 
     if chunk_size_value is None:
         chunk_size_value = DEFAULT_CHUNK_SIZE
@@ -57,45 +116,357 @@ def register_upload_data(remote_agent: AgentBase, name: str, data_stream: Any, c
     bundle_asset = BundleAsset.create(name)
     index = 0
     asset = None
-    while True:
-        data = data_stream.read(chunk_size)
-        if data:
-            asset_name = f'{name}:{index}'
-            data_asset = DataAsset.create(asset_name, data)
-            asset = remote_agent.register_asset(data_asset)
-            remote_agent.upload_asset(asset)
-            bundle_asset.add(asset_name, asset)
-            index += 1
-        else:
-            break
+    pending = deque()
+    content_hashes = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor, bundle_asset.batch():
+        try:
+            if is_content_defined:
+                chunks = iter_content_defined_chunks(data_stream, chunk_size)
+            else:
+                chunks = iter_fixed_chunks(data_stream, chunk_size)
+            for data in chunks:
+                asset_name = f'{name}:{index}'
+                future = executor.submit(_register_upload_chunk, remote_agent, asset_name, data, chunk_index)
+                pending.append((asset_name, future))
+                index += 1
+                # wait for the oldest chunk, so that the read ahead is limited and the bundle is in the same order
+                if len(pending) >= max_workers:
+                    asset_name, future = pending.popleft()
+                    _add_bundle_chunk(bundle_asset, asset_name, future.result(), content_hashes)
+            while pending:
+                asset_name, future = pending.popleft()
+                _add_bundle_chunk(bundle_asset, asset_name, future.result(), content_hashes)
+        finally:
+            for asset_name, future in pending:
+                future.cancel()
+
     if index > 0:
+        # the merkle root covers all of the data, so the data can be checked one chunk at a time
+        metadata = bundle_asset.metadata.copy()
+        metadata['merkleRoot'] = calculate_merkle_root(content_hashes)
+        bundle_asset.set_metadata(metadata)
         asset = remote_agent.register_asset(bundle_asset)
     return asset
 
 
-def register_upload_bundle_file(remote_agent: AgentBase, filename: str, chunk_size: int = None) -> Any:
+def register_upload_bundle_file(
+    remote_agent: AgentBase,
+    filename: str,
+    chunk_size: int = None,
+    max_workers: int = DEFAULT_UPLOAD_WORKERS,
+    chunk_index: ChunkIndex = None,
+    is_content_defined: bool = False
+) -> Any:
     if not os.path.exists(filename):
         raise FileNotFoundError(f'Cannot find file {filename}')
     bundle_asset = None
     with open(filename, 'rb') as fp:
         name = f'file: {os.path.basename(filename)}'
-        bundle_asset = register_upload_data(remote_agent, name, fp, chunk_size)
+        bundle_asset = register_upload_data(
+            remote_agent,
+            name,
+            fp,
+            chunk_size,
+            max_workers=max_workers,
+            chunk_index=chunk_index,
+            is_content_defined=is_content_defined
+        )
     return bundle_asset
 
 
+def iter_fixed_chunks(data_stream: Any, chunk_size: int) -> Iterator[bytes]:
+    """
+    Read the data stream as chunks of the same size, the last chunk can be smaller.
+
+    """
+    while True:
+        data = data_stream.read(chunk_size)
+        if not data:
+            break
+        yield data
+
+
+def iter_content_defined_chunks(
+    data_stream: Any,
+    max_size: int,
+    average_size: int = None,
+    min_size: int = None
+) -> Iterator[bytes]:
+    """
+    Read the data stream as chunks that end where a gear rolling hash of the last 64 bytes matches a mask.
+    The chunk ends only depend on the nearby data, so after an insert or delete in the data the later
+    chunks are the same as before, and can be found in a :class:`.ChunkIndex`.
+
+    :param data_stream: Stream to read the data
+    :param int max_size: Maximum size of a chunk
+    :param int average_size: Average size of a chunk, defaults to a quarter of the `max_size`
+    :param int min_size: Minimum size of a chunk, defaults to a quarter of the `average_size`
+
+    The rolling hash reads every byte of the data. With `numpy` installed the hash is calculated for a block
+    of the data at a time, which is many times faster than the pure python hash that is used without `numpy`.
+    The pure python hash runs at only a few MB per second and holds the GIL, so without `numpy` only use
+    content defined chunks for data that is likely to have been uploaded before.
+
+    """
+    if average_size is None:
+        average_size = max(1, max_size // 4)
+    if min_size is None:
+        min_size = average_size // 4
+    if not 0 <= min_size < average_size <= max_size:
+        raise ValueError('chunk sizes must be min_size < average_size <= max_size')
+
+    # the number of mask bits sets the average distance from the min_size to a chunk end
+    bits = max(1, int(math.log2(average_size - min_size)))
+    mask = ((1 << bits) - 1) << (64 - bits)
+    buffer = bytearray()
+    is_end = False
+    while True:
+        while not is_end and len(buffer) < max_size:
+            data = data_stream.read(max_size)
+            if data:
+                buffer += data
+            else:
+                is_end = True
+        if not buffer:
+            break
+        end = _find_chunk_end(buffer, min_size, min(len(buffer), max_size), mask)
+        yield bytes(buffer[:end])
+        del buffer[:end]
+
+
+def _find_chunk_end(buffer: bytearray, start: int, end: int, mask: int) -> int:
+    if numpy is not None:
+        return _find_chunk_end_numpy(buffer, start, end, mask)
+    gear_table = GEAR_TABLE
+    value = 0
+    for index in range(start, end):
+        value = ((value << 1) + gear_table[buffer[index]]) & 0xFFFFFFFFFFFFFFFF
+        if not value & mask:
+            return index + 1
+    return end
+
+
+def _find_chunk_end_numpy(buffer: bytearray, start: int, end: int, mask: int) -> int:
+    # the hash at each index is the sum of the gear values of the last 64 bytes, each shifted left by it's distance
+    # from the index. The sum over the last 2 * n bytes is the sum over the last n bytes, plus the sum over the n
+    # bytes before that shifted left by n, so the hash of a block of indexes is calculated in 6 numpy passes.
+    gear_table = _get_gear_table_numpy()
+    mask_value = numpy.uint64(mask)
+    data = numpy.frombuffer(buffer, dtype=numpy.uint8, count=end)
+    for block_start in range(start, end, GEAR_BLOCK_SIZE):
+        block_end = min(block_start + GEAR_BLOCK_SIZE, end)
+        # the 63 bytes before the block are also in the hash, the bytes before `start` are not used so are zero
+        context_start = max(start, block_start - 63)
+        values = numpy.zeros(63 + block_end - block_start, dtype=numpy.uint64)
+        values[63 - (block_start - context_start):] = gear_table[data[context_start:block_end]]
+        for shift in (1, 2, 4, 8, 16, 32):
+            values[shift:] += values[:-shift] << numpy.uint64(shift)
+        found = numpy.flatnonzero((values[63:] & mask_value) == 0)
+        if len(found):
+            return block_start + int(found[0]) + 1
+    return end
+
+
+def _get_gear_table_numpy():
+    global _gear_table_numpy
+    if _gear_table_numpy is None:
+        _gear_table_numpy = numpy.array(GEAR_TABLE, dtype=numpy.uint64)
+    return _gear_table_numpy
+
+
+def _create_gear_table():
+    # the table must be the same for every upload, so that the same data is always split at the same points
+    return [int.from_bytes(hashlib.sha256(f'gear:{index}'.encode()).digest()[:8], 'big') for index in range(0, 256)]
+
+
+GEAR_TABLE = _create_gear_table()
+
+# number of bytes hashed at a time by the numpy rolling hash
+GEAR_BLOCK_SIZE = 256 * 1024
+
+_gear_table_numpy = None
+
+
+def _add_bundle_chunk(bundle_asset: BundleAsset, asset_name: str, asset: Any, content_hashes: list) -> None:
+    bundle_asset.add(asset_name, asset)
+    content_hashes.append(asset.metadata['contentHash'])
+
+
+def _register_upload_chunk(remote_agent: AgentBase, asset_name: str, data: bytes, chunk_index: ChunkIndex = None) -> Any:
+    # the content length of each chunk is needed to download the chunks in parallel, see `download_bundle_file`
+    data_asset = DataAsset.create(asset_name, data, {'contentLength': len(data)})
+    content_hash = data_asset.metadata['contentHash']
+    if chunk_index is not None:
+        asset_id = chunk_index.get(content_hash)
+        if asset_id:
+            asset = remote_agent.get_asset(asset_id)
+            # the metadata can be registered without the data being uploaded, so also check the data on the agent,
+            # if the agent cannot return the size of the data, then the chunk is uploaded again
+            if asset and asset.metadata.get('contentHash') == content_hash \
+                    and remote_agent.get_asset_data_size(asset_id) == len(data):
+                return asset
+            # the agent does not have the chunk, so upload it again
+            chunk_index.remove(content_hash)
+
+    asset = remote_agent.register_asset(data_asset)
+    remote_agent.upload_asset(asset)
+    if chunk_index is not None:
+        chunk_index.add(content_hash, asset.asset_id)
+    return asset
+
+
 def download_bundle_data(remote_agent: AgentBase, bundle_asset: Any, data_stream: Any) -> int:
     size = 0
     for name, asset_id in bundle_asset:
-        store_asset = remote_agent.download_asset(asset_id)
-        data_stream.write(store_asset.data)
-        size += len(store_asset.data)
+        data = remote_agent.download_asset(asset_id).data
+        data_stream.write(data)
+        size += len(data)
     return size
 
 
-def download_bundle_file(remote_agent: AgentBase, bundle_asset: Any, filename: str) -> int:
+def download_bundle_file(
+    remote_agent: AgentBase,
+    bundle_asset: Any,
+    filename: str,
+    max_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+    resume: bool = False
+) -> int:
+    """
+    Download all of the data assets in a bundle to a file. The data assets are downloaded in parallel, and
+    each one is written directly to it's position in the file, and checked against it's `contentHash`.
+
+    :param remote_agent: Agent to download the data assets
+    :param bundle_asset: Bundle asset that holds the data assets
+    :param str filename: Filename to write the data
+    :param int max_workers: Number of data assets to download at the same time
+    :param bool resume: If True, then data assets that have already been written to the file
+        and have a valid hash are not downloaded again.
+
+    :return: size of the data written to the file
+    """
     if not bundle_asset.is_bundle:
         raise TypeError(f'asset type {bundle_asset.type} is not a bundle asset')
+
+    asset_ids = [asset_id for name, asset_id in bundle_asset]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        chunk_assets = list(executor.map(remote_agent.get_asset, asset_ids))
+        if not all(asset and 'contentLength' in asset.metadata for asset in chunk_assets):
+            # without the size of each data asset, the file can only be written in order
+            logger.debug(f'bundle {bundle_asset.did} has no content lengths, downloading in order')
+            with open(filename, 'wb') as fp:
+                return download_bundle_data(remote_agent, bundle_asset, fp)
+
+        check_merkle_root(bundle_asset, chunk_assets)
+
+        offsets = []
+        size = 0
+        for asset in chunk_assets:
+            offsets.append(size)
+            size += int(asset.metadata['contentLength'])
+
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        if not resume:
+            flags |= os.O_TRUNC
+        handle = os.open(filename, flags, 0o666)
+        try:
+            existing_size = os.fstat(handle).st_size
+            os.ftruncate(handle, size)
+            file_writer = _FileWriter(handle)
+            futures = []
+            for asset, offset in zip(chunk_assets, offsets):
+                length = int(asset.metadata['contentLength'])
+                if resume and offset + length <= existing_size:
+                    if file_writer.hash_range(offset, length) == remove_0x_prefix(asset.metadata['contentHash']):
+                        continue
+                futures.append(executor.submit(_download_chunk, remote_agent, asset, file_writer, offset))
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+        finally:
+            os.close(handle)
+    return size
+
+
+def check_merkle_root(bundle_asset: Any, chunk_assets: list) -> None:
+    """
+    Check the content hashes of the data assets in a bundle against the `merkleRoot` of the bundle. Once the
+    content hashes are checked, each data asset only needs to be checked against it's own content hash,
+    so the data never needs to be hashed a second time to check all of the bundle data.
+
+    :param bundle_asset: Bundle asset that holds the data assets
+    :param list chunk_assets: Data assets in the same order as the bundle
+
+    :raises: StarfishAssetInvalid if the content hashes do not match the merkle root
+    """
+    merkle_root = bundle_asset.metadata.get('merkleRoot')
+    if not merkle_root:
+        return
+    content_hashes = [asset.metadata.get('contentHash') or '' for asset in chunk_assets]
+    if not chunk_assets or calculate_merkle_root(content_hashes) != remove_0x_prefix(merkle_root).lower():
+        raise StarfishAssetInvalid(f'content hashes for bundle {bundle_asset.did} do not match the merkle root {merkle_root}')
+
+
+class _FileWriter():
+    """
+    Positional writes and reads of an open file, that can be shared by many threads.
+    If the OS does not support `os.pwrite`, then each seek and write is done under a lock.
+
+    """
+    def __init__(self, handle):
+        self._handle = handle
+        self._lock = threading.Lock()
+
+    def write(self, data, offset):
+        view = memoryview(data)
+        while len(view) > 0:
+            if hasattr(os, 'pwrite'):
+                written = os.pwrite(self._handle, view, offset)
+            else:
+                with self._lock:
+                    os.lseek(self._handle, offset, os.SEEK_SET)
+                    written = os.write(self._handle, view)
+            view = view[written:]
+            offset += written
+
+    def read(self, length, offset):
+        if hasattr(os, 'pread'):
+            return os.pread(self._handle, length, offset)
+        with self._lock:
+            os.lseek(self._handle, offset, os.SEEK_SET)
+            return os.read(self._handle, length)
+
+    def hash_range(self, offset, length, block_size=1024 * 1024):
+        message_digest = Sha3Hasher()
+        end = offset + length
+        while offset < end:
+            data = self.read(min(block_size, end - offset), offset)
+            if not data:
+                break
+            message_digest.update(data)
+            offset += len(data)
+        return message_digest.hexdigest()
+
+
+def _download_chunk(remote_agent: AgentBase, asset: Any, file_writer: _FileWriter, offset: int) -> int:
+    length = int(asset.metadata['contentLength'])
+    if hasattr(remote_agent, 'download_asset_stream'):
+        # the hash of the data is checked as it's streamed
+        chunks = remote_agent.download_asset_stream(asset.asset_id)
+    else:
+        data = remote_agent.download_asset(asset.asset_id).data or b''
+        if 'contentHash' in asset.metadata and hash_sha3_256(data) != remove_0x_prefix(asset.metadata['contentHash']):
+            raise StarfishAssetInvalid(f'data hash for {asset.did} does not match the content hash')
+        chunks = [data]
+
     size = 0
-    with open(filename, 'wb') as fp:
-        size = download_bundle_data(remote_agent, bundle_asset, fp)
+    for chunk in chunks:
+        if size + len(chunk) > length:
+            raise StarfishAssetInvalid(f'data for {asset.did} is larger than the content length {length}')
+        file_writer.write(chunk, offset + size)
+        size += len(chunk)
+    if size != length:
+        raise StarfishAssetInvalid(f'data size {size} for {asset.did} is not the content length {length}')
     return size
@@ -0,0 +1,131 @@
+"""
+
+Utils: Data Stream.
+
+Helpers to check and save asset data that is read as a stream of chunks, so that only one chunk is held in memory.
+
+
+"""
+import logging
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterator
+)
+
+from eth_utils import remove_0x_prefix
+
+from starfish.exceptions import StarfishAssetInvalid
+from starfish.utils.crypto_hash import Sha3Hasher
+
+logger = logging.getLogger(__name__)
+
+
+def iter_hash_verified(chunks: Iterator[bytes], content_hash: str = None, name: str = '') -> Iterator[bytes]:
+    """
+    Return each chunk, while calculating the hash of the data. After the last chunk the hash is checked
+    against the `content_hash`.
+
+    :param chunks: iterator of bytes
+    :param str content_hash: expected sha3_256 hash of all of the data, if None then no check is made
+    :param str name: Name of the data to show in the error message
+
+    :raises: StarfishAssetInvalid if the data does not match the content hash
+    """
+    if not content_hash:
+        yield from chunks
+        return
+    message_digest = Sha3Hasher()
+    for chunk in chunks:
+        message_digest.update(chunk)
+        yield chunk
+    _check_hash(message_digest, content_hash, name)
+
+
+async def aiter_hash_verified(chunks: AsyncIterator[bytes], content_hash: str = None, name: str = '') -> AsyncIterator[bytes]:
+    """
+    Async version of :func:`iter_hash_verified`.
+
+    """
+    message_digest = Sha3Hasher() if content_hash else None
+    async for chunk in chunks:
+        if message_digest:
+            message_digest.update(chunk)
+        yield chunk
+    if message_digest:
+        _check_hash(message_digest, content_hash, name)
+
+
+@contextmanager
+def open_atomic_file(filename: str) -> Any:
+    """
+    Open a temporary file for writing, that is renamed to `filename` when the context exits without an error.
+    If an error occurs, such as an invalid hash, then the temporary file is removed and `filename` is not changed.
+
+    :param str filename: Filename to write
+
+    For example::
+
+        with open_atomic_file('data.dat') as fp:
+            for chunk in iter_hash_verified(chunks, content_hash):
+                fp.write(chunk)
+
+    """
+    folder = os.path.dirname(os.path.abspath(filename))
+    handle, temp_filename = tempfile.mkstemp(dir=folder, prefix='.tmp_')
+    try:
+        with os.fdopen(handle, 'wb') as fp:
+            yield fp
+        os.replace(temp_filename, filename)
+    finally:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+
+
+@contextmanager
+def open_file_view(filename: str, offset: int = 0, length: int = None) -> Any:
+    """
+    Open a read only memory map of a file, so that the file data can be sent without reading it into memory.
+
+    :param str filename: Filename to open
+    :param int offset: Optional start of the region of the file to map
+    :param int length: Optional length of the region to map, if None then map to the end of the file
+
+    :return: mmap object for the whole file, memoryview for a region of the file, or empty bytes if the region is empty
+    """
+    with open(filename, 'rb') as fp:
+        file_size = os.fstat(fp.fileno()).st_size
+        if length is None:
+            length = file_size - offset
+        if offset < 0 or length < 0 or offset + length > file_size:
+            raise ValueError(f'region {offset}:{offset + length} is outside of the file {filename}')
+        if length == 0:
+            yield b''
+            return
+        if offset == 0 and length == file_size:
+            file_map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            view = None
+        else:
+            # the map offset must be a multiple of the allocation granularity
+            map_offset = offset - offset % mmap.ALLOCATIONGRANULARITY
+            file_map = mmap.mmap(fp.fileno(), offset + length - map_offset, access=mmap.ACCESS_READ, offset=map_offset)
+            view = memoryview(file_map)[offset - map_offset:offset - map_offset + length]
+        try:
+            yield file_map if view is None else view
+        finally:
+            if view is not None:
+                view.release()
+            try:
+                file_map.close()
+            except BufferError:
+                # a view of the data is still in use, the map is closed when it's released
+                logger.debug(f'unable to close memory map of {filename}, the map is still in use')
+
+
+def _check_hash(message_digest, content_hash, name):
+    if message_digest.hexdigest() != remove_0x_prefix(content_hash).lower():
+        raise StarfishAssetInvalid(f'data hash for {name} does not match the content hash {content_hash}')
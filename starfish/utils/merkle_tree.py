@@ -0,0 +1,154 @@
+"""
+
+Utils: Merkle Tree.
+
+Merkle tree of the content hashes of the data chunks in a bundle, so that each chunk, or a range of chunks,
+can be checked against the one root hash of the bundle.
+
+
+"""
+import hashlib
+from typing import (
+    Any,
+    List
+)
+
+from eth_utils import remove_0x_prefix
+
+# prefixes so that a leaf hash can never be the same as a node hash
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+
+class MerkleTree():
+    """
+
+    Merkle tree built from a list of sha3_256 content hashes. Each pair of nodes is hashed to make the
+    next level of the tree, and if a level has an odd number of nodes the last node is moved up to the next level.
+
+    :param list leaf_hashes: list of the content hashes of each chunk, as hex strings, in the same order as the data
+
+    For example::
+
+        merkle_tree = MerkleTree([asset.metadata['contentHash'] for asset in chunk_assets])
+        proof = merkle_tree.get_proof(4)
+        assert(verify_merkle_proof([chunk_assets[4].metadata['contentHash']], 4, len(chunk_assets), proof, merkle_tree.root))
+
+    """
+    def __init__(self, leaf_hashes: List[str]) -> None:
+        if not leaf_hashes:
+            raise ValueError('a merkle tree must have at least one leaf hash')
+        level = [_hash_leaf(leaf_hash) for leaf_hash in leaf_hashes]
+        self._levels = [level]
+        while len(level) > 1:
+            level = _hash_level(level)
+            self._levels.append(level)
+
+    def get_proof(self, start: int, end: int = None) -> List[str]:
+        """
+        Return the node hashes needed to calculate the root hash from a range of leaf hashes.
+
+        :param int start: index of the first leaf in the range
+        :param int end: index after the last leaf in the range, if None then the range is only the `start` leaf
+
+        :return: list of node hashes as hex strings
+        """
+        if end is None:
+            end = start + 1
+        if not 0 <= start < end <= self.leaf_count:
+            raise ValueError(f'invalid leaf range {start}:{end}')
+        proof = []
+        for level in self._levels[:-1]:
+            start, end = _expand_range(start, end, len(level), lambda index: proof.append(level[index].hex()))
+            start, end = start // 2, (end + 1) // 2
+        return proof
+
+    @property
+    def root(self) -> str:
+        """
+        :return: root hash of the tree as a hex string
+        """
+        return self._levels[-1][0].hex()
+
+    @property
+    def leaf_count(self) -> int:
+        return len(self._levels[0])
+
+
+def calculate_merkle_root(leaf_hashes: List[str]) -> str:
+    """
+    Return the merkle root hash of a list of content hashes.
+
+    :param list leaf_hashes: list of content hashes as hex strings
+
+    :return: root hash as a hex string
+    """
+    return MerkleTree(leaf_hashes).root
+
+
+def verify_merkle_proof(leaf_hashes: List[str], start: int, leaf_count: int, proof: List[str], root: str) -> bool:
+    """
+    Check that a range of leaf hashes is part of a merkle tree.
+
+    :param list leaf_hashes: content hashes of the range of leafs to check
+    :param int start: index of the first leaf in the range
+    :param int leaf_count: number of leafs in the tree
+    :param list proof: node hashes returned by :meth:`MerkleTree.get_proof`
+    :param str root: root hash of the tree
+
+    :return: True if the leaf hashes and proof match the root hash
+    """
+    end = start + len(leaf_hashes)
+    if not leaf_hashes or start < 0 or end > leaf_count:
+        return False
+    proof_items = iter(proof)
+    # only the nodes in the current range are held for each level, keyed by the node index
+    nodes = {start + index: _hash_leaf(leaf_hash) for index, leaf_hash in enumerate(leaf_hashes)}
+
+    def add_proof_node(index):
+        nodes[index] = _decode(next(proof_items))
+
+    count = leaf_count
+    try:
+        while count > 1:
+            start, end = _expand_range(start, end, count, add_proof_node)
+            level = _hash_level([nodes[index] for index in range(start, end)])
+            start, end = start // 2, (end + 1) // 2
+            nodes = {start + index: node for index, node in enumerate(level)}
+            count = (count + 1) // 2
+    except (StopIteration, ValueError):
+        return False
+    if next(proof_items, None) is not None:
+        return False
+    return nodes[0] == _decode(root)
+
+
+def _expand_range(start: int, end: int, count: int, add_node: Any):
+    # add the sibling nodes, so that the range starts on a pair and ends on a pair or the end of the level
+    if start % 2 == 1:
+        start -= 1
+        add_node(start)
+    if end % 2 == 1 and end < count:
+        add_node(end)
+        end += 1
+    return start, end
+
+
+def _hash_level(nodes: List[bytes]) -> List[bytes]:
+    # `nodes` start at an even index, and only end on an odd index at the end of the level
+    level = []
+    for index in range(0, len(nodes), 2):
+        if index + 1 < len(nodes):
+            level.append(hashlib.sha3_256(NODE_PREFIX + nodes[index] + nodes[index + 1]).digest())
+        else:
+            # last node of a level with an odd number of nodes
+            level.append(nodes[index])
+    return level
+
+
+def _hash_leaf(leaf_hash: str) -> bytes:
+    return hashlib.sha3_256(LEAF_PREFIX + _decode(leaf_hash)).digest()
+
+
+def _decode(hash_hex: str) -> bytes:
+    return bytes.fromhex(remove_0x_prefix(hash_hex))
@@ -0,0 +1,207 @@
+"""
+
+Utils: Search Index.
+
+Inverted index of the words in JSON data items, so that items can be found without scanning all of the data.
+
+
+"""
+import json
+import re
+import threading
+from typing import (
+    Any,
+    List
+)
+
+TOKEN_PATTERN = re.compile(r'\w+')
+PLAIN_TEXT_PATTERN = re.compile(r'[\w\s]*')
+
+
+class SearchIndex():
+    """
+
+    Thread safe inverted index of the words found in the keys and values of JSON data items.
+
+    The search text is a regular expression that is matched against the JSON text of each item, the same as
+    `re.search(text, json.dumps(data))`. For plain text made of words and spaces, the index is only used to
+    find the items that can match, and then each of these items is checked with the regular expression,
+    so the results are the same as matching all of the items.
+
+    The top level fields of each item are also kept as sort keys, so the results can be sorted by a field
+    without reading the items again.
+
+    For example::
+
+        search_index = SearchIndex()
+        search_index.add('listing_1', {'name': 'Weather data', 'author': 'Test'})
+        search_index.search('Weather')              # ['listing_1']
+        search_index.search('eather da')            # ['listing_1']
+        search_index.search('Weath.*')              # ['listing_1']
+        search_index.search('weather')              # []
+
+    """
+    def __init__(self) -> None:
+        self._items = {}
+        self._postings = {}
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def add(self, item_id: str, data: Any) -> None:
+        """
+        Add or replace an item in the index.
+
+        :param str item_id: id of the item
+        :param data: JSON data of the item
+
+        """
+        text = json.dumps(data)
+        tokens = frozenset(SearchIndex.get_tokens(text))
+        sort_keys = None
+        if isinstance(data, dict):
+            sort_keys = {name: SearchIndex.to_sort_key(value) for name, value in data.items() if value is not None}
+        with self._lock:
+            if item_id in self._items:
+                self._remove_postings(item_id)
+                sequence = self._items[item_id][0]
+            else:
+                sequence = self._sequence
+                self._sequence += 1
+            self._items[item_id] = (sequence, text, tokens, sort_keys)
+            for token in tokens:
+                self._postings.setdefault(token, set()).add(item_id)
+
+    def remove(self, item_id: str) -> bool:
+        """
+        Remove an item from the index.
+
+        :return: True if the item was found in the index
+        """
+        with self._lock:
+            if item_id not in self._items:
+                return False
+            self._remove_postings(item_id)
+            del self._items[item_id]
+            return True
+
+    def search(self, text: str) -> List[str]:
+        """
+        Return the ids of the items that match the search text, in the order that the items were added.
+
+        :param str text: regular expression to match, if empty then all of the items are returned
+
+        :return: list of item ids
+        """
+        if not text:
+            with self._lock:
+                return list(self._items.keys())
+        if not SearchIndex.is_plain_text(text):
+            return self.search_pattern(text)
+        match = re.compile(text).search
+        with self._lock:
+            item_ids = self._find_candidates(text)
+            if item_ids is None:
+                items = list(self._items.items())
+            else:
+                items = [(item_id, self._items[item_id]) for item_id in item_ids]
+        items.sort(key=lambda item: item[1][0])
+        return [item_id for item_id, (sequence, item_text, tokens, sort_keys) in items if match(item_text)]
+
+    def sort(self, item_ids: List[str], field_name: str, is_reverse: bool = False) -> List[str]:
+        """
+        Sort item ids by a top level field of the items. Items without the field are always at the end.
+
+        :param list item_ids: ids of the items to sort
+        :param str field_name: name of the field to sort by
+        :param bool is_reverse: If True then sort in reverse order
+
+        :return: sorted list of item ids
+        """
+        keys = {}
+        missing_list = []
+        with self._lock:
+            for item_id in item_ids:
+                item = self._items.get(item_id)
+                key = item[3].get(field_name) if item and item[3] else None
+                if key is None:
+                    missing_list.append(item_id)
+                else:
+                    keys[item_id] = key
+        return sorted(keys, key=keys.get, reverse=is_reverse) + missing_list
+
+    def search_pattern(self, pattern: str) -> List[str]:
+        """
+        Return the ids of the items where the JSON text matches a regular expression.
+
+        :param str pattern: regular expression to match
+
+        :return: list of item ids
+        """
+        match = re.compile(pattern).search
+        with self._lock:
+            items = list(self._items.items())
+        return [item_id for item_id, (sequence, text, tokens, sort_keys) in items if match(text)]
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @staticmethod
+    def get_tokens(text: str) -> List[str]:
+        return TOKEN_PATTERN.findall(text.lower())
+
+    @staticmethod
+    def is_plain_text(text: str) -> bool:
+        return PLAIN_TEXT_PATTERN.fullmatch(text) is not None
+
+    @staticmethod
+    def to_sort_key(value: Any) -> tuple:
+        if isinstance(value, (int, float)):
+            return (0, value)
+        if isinstance(value, str):
+            return (1, value)
+        # values of different types are sorted by type, so that they can be compared
+        return (2, json.dumps(value, sort_keys=True))
+
+    def _find_candidates(self, text):
+        # return the ids of the items that can match the plain text, or None if all of the items need to be matched.
+        # A word with spaces on both sides is a whole token of the item, the first and last words can be part of
+        # a longer token, so the tokens that start, end or contain the word are used.
+        words = list(TOKEN_PATTERN.finditer(text))
+        if not words:
+            return None
+        posting_list = []
+        for word in words:
+            token = word.group().lower()
+            has_start = word.start() > 0
+            has_end = word.end() < len(text)
+            if has_start and has_end:
+                posting = self._postings.get(token, set())
+            else:
+                if has_start:
+                    is_match = str.startswith
+                elif has_end:
+                    is_match = str.endswith
+                else:
+                    is_match = str.__contains__
+                posting = set()
+                for index_token, index_posting in self._postings.items():
+                    if is_match(index_token, token):
+                        posting.update(index_posting)
+            posting_list.append(posting)
+        # start with the word that has the least items
+        posting_list.sort(key=len)
+        item_ids = set(posting_list[0])
+        for posting in posting_list[1:]:
+            item_ids &= posting
+        return item_ids
+
+    def _remove_postings(self, item_id):
+        for token in self._items[item_id][2]:
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.discard(item_id)
+                if not posting:
+                    del self._postings[token]
@@ -0,0 +1,86 @@
+"""
+    bench_asset_memory
+
+    Memory used to hold a large number of assets, as asset objects with an instance __dict__, as slotted asset objects
+    and in an AssetCatalog.
+
+    usage: python -m tests.benchmarks.bench_asset_memory [asset_count]
+
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+
+from starfish.asset import (
+    AssetCatalog,
+    DataAsset
+)
+from starfish.asset.asset_base import MetadataView
+from starfish.network.did import did_generate_random
+from starfish.utils.crypto_hash import hash_sha3_256
+
+ASSET_COUNT = 1000000
+AGENT_COUNT = 10
+
+
+class DictDataAsset():
+    # plain class with the same fields as DataAsset, held in an instance __dict__ instead of __slots__
+
+    def __init__(self, metadata_text, data=None, data_source=None):
+        self._did = None
+        self._metadata_text = metadata_text
+        self._metadata = MetadataView.parse(metadata_text)
+        self._asset_id = None
+        self._data = data
+        self._data_source = data_source
+
+    def set_did(self, did):
+        self._did = did
+
+    @property
+    def asset_id(self):
+        if self._asset_id is None:
+            self._asset_id = hash_sha3_256(self._metadata_text)
+        return self._asset_id
+
+
+def create_assets(asset_class, asset_count, agent_dids):
+    assets = []
+    for index in range(asset_count):
+        metadata_text = json.dumps({'name': f'asset {index}', 'type': 'dataset', 'contentType': 'text/plain'})
+        asset = asset_class(metadata_text)
+        asset.set_did(f'{agent_dids[index % len(agent_dids)]}/{asset.asset_id}')
+        assets.append(asset)
+    return assets
+
+
+def create_catalog(asset_count, agent_dids):
+    catalog = AssetCatalog()
+    for asset in create_assets(DataAsset, asset_count, agent_dids):
+        catalog.add(asset)
+    return catalog
+
+
+def measure(name, asset_count, build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{name:30} {size / 1024 / 1024:10.1f} MB {size / asset_count:10.1f} bytes per asset')
+    return value
+
+
+def bench_asset_memory(asset_count):
+    agent_dids = [did_generate_random() for _ in range(AGENT_COUNT)]
+    print(f'{asset_count} assets')
+    measure('assets with __dict__', asset_count, lambda: create_assets(DictDataAsset, asset_count, agent_dids))
+    measure('slotted assets', asset_count, lambda: create_assets(DataAsset, asset_count, agent_dids))
+    measure('asset catalog', asset_count, lambda: create_catalog(asset_count, agent_dids))
+
+
+if __name__ == '__main__':
+    bench_asset_memory(int(sys.argv[1]) if len(sys.argv) > 1 else ASSET_COUNT)
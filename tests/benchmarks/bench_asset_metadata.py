@@ -0,0 +1,34 @@
+"""
+    bench_asset_metadata
+
+    Compare the cost of reading the asset metadata and asset id, when the metadata text is parsed and
+    hashed on every access, against the cached values held by AssetBase.
+
+"""
+
+import json
+import timeit
+
+from starfish.asset import DataAsset
+from starfish.utils.crypto_hash import hash_sha3_256
+
+LOOP_COUNT = 10000
+
+
+def bench_asset_metadata():
+    asset = DataAsset.create('benchmark asset', 'benchmark data' * 100)
+    metadata_text = asset.metadata_text
+
+    results = {
+        'metadata (parse on access)': timeit.timeit(lambda: json.loads(metadata_text)['name'], number=LOOP_COUNT),
+        'metadata (cached)': timeit.timeit(lambda: asset.metadata['name'], number=LOOP_COUNT),
+        'asset_id (hash on access)': timeit.timeit(lambda: hash_sha3_256(metadata_text), number=LOOP_COUNT),
+        'asset_id (cached)': timeit.timeit(lambda: asset.asset_id, number=LOOP_COUNT),
+        'metadata.copy()': timeit.timeit(lambda: asset.metadata.copy(), number=LOOP_COUNT),
+    }
+    for name, seconds in results.items():
+        print(f'{name:30} {seconds * 1000000 / LOOP_COUNT:10.3f} us')
+
+
+if __name__ == '__main__':
+    bench_asset_metadata()
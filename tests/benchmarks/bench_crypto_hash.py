@@ -0,0 +1,47 @@
+"""
+    bench_crypto_hash
+
+    Compare the pycryptodome sha3_256 hash that was used before, against the native hashlib hash
+    and the parallel batch hash.
+
+"""
+
+import os
+import secrets
+import time
+
+from Crypto.Hash import SHA3_256
+
+from starfish.utils.crypto_hash import (
+    hash_sha3_256,
+    hash_sha3_256_many
+)
+
+PAYLOAD_SIZE = 4 * 1024 * 1024
+PAYLOAD_COUNT = 32
+
+
+def crypto_hash(data):
+    message_digest = SHA3_256.new()
+    message_digest.update(data)
+    return message_digest.hexdigest()
+
+
+def measure(name, total_size, call):
+    start_time = time.perf_counter()
+    call()
+    seconds = time.perf_counter() - start_time
+    print(f'{name:40} {seconds:8.3f} s {total_size / seconds / 1024 / 1024:10.1f} MB/s')
+
+
+def bench_crypto_hash():
+    payloads = [secrets.token_bytes(PAYLOAD_SIZE) for _ in range(PAYLOAD_COUNT)]
+    total_size = PAYLOAD_SIZE * PAYLOAD_COUNT
+    print(f'{PAYLOAD_COUNT} payloads of {PAYLOAD_SIZE} bytes, {os.cpu_count()} cpus')
+    measure('pycryptodome sha3_256', total_size, lambda: [crypto_hash(payload) for payload in payloads])
+    measure('hashlib sha3_256', total_size, lambda: [hash_sha3_256(payload) for payload in payloads])
+    measure('hash_sha3_256_many', total_size, lambda: hash_sha3_256_many(payloads))
+
+
+if __name__ == '__main__':
+    bench_crypto_hash()
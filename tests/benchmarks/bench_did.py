@@ -0,0 +1,51 @@
+"""
+    bench_did
+
+    Parse a large number of asset DIDs, with each DID parsed once so that the parse cache is not used,
+    and then with a small set of DIDs parsed many times, so that the parse cache is used.
+    Also decode all of the DIDs with one call to the batch decode function.
+
+    usage: python -m tests.benchmarks.bench_did [did_count]
+
+"""
+
+import secrets
+import sys
+import time
+
+from starfish.network.did import (
+    decode_to_asset_id,
+    decode_to_asset_id_many,
+    did_parse,
+    did_to_id,
+    id_to_did,
+    is_did
+)
+
+DEFAULT_DID_COUNT = 1000 * 1000
+REPEAT_DID_COUNT = 1000
+
+
+def measure(name, count, call):
+    start_time = time.perf_counter()
+    call()
+    seconds = time.perf_counter() - start_time
+    print(f'{name:40} {seconds:8.3f} s {count / seconds:12.0f} DIDs/s')
+
+
+def bench_did(did_count):
+    agent_did = id_to_did(secrets.token_hex(32))
+    asset_dids = [f'{agent_did}/{secrets.token_hex(32)}' for _ in range(did_count)]
+    repeat_dids = asset_dids[:REPEAT_DID_COUNT] * (did_count // REPEAT_DID_COUNT)
+    print(f'{did_count} asset DIDs')
+    measure('did_parse unique', did_count, lambda: [did_parse(did) for did in asset_dids])
+    measure('decode_to_asset_id unique', did_count, lambda: [decode_to_asset_id(did) for did in asset_dids[::-1]])
+    measure('decode_to_asset_id_many unique', did_count, lambda: decode_to_asset_id_many(asset_dids))
+    measure('did_parse repeated', len(repeat_dids), lambda: [did_parse(did) for did in repeat_dids])
+    measure('decode_to_asset_id repeated', len(repeat_dids), lambda: [decode_to_asset_id(did) for did in repeat_dids])
+    measure('is_did repeated', len(repeat_dids), lambda: [is_did(did) for did in repeat_dids])
+    measure('did_to_id repeated', len(repeat_dids), lambda: [did_to_id(did) for did in repeat_dids])
+
+
+if __name__ == '__main__':
+    bench_did(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DID_COUNT)
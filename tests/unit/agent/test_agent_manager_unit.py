@@ -3,10 +3,14 @@
 Unit test AgentManager
 
 """
+import threading
+import time
+
 import pytest
 import requests
 
 from starfish.agent_manager import AgentManager
+from starfish.agent_manager.agent_access import AgentAccess
 from starfish.exceptions import StarfishConnectionError
 from starfish.network.ddo import DDO
 
@@ -80,3 +84,152 @@ def test_agent_manager_resolve_with_no_network():
     url = 'http://invalid_agent.org'
     result = manager.resolve_agent_url(url)
     assert(result is None)
+
+def test_agent_manager_find_agent_access_by_url_and_did():
+    manager = AgentManager()
+
+    ddo = DDO.create('http://test.com')
+    manager.register_agent('test_agent', url='http://Test.com/', ddo=ddo)
+
+    assert(manager.find_agent_access('http://test.com').name == 'test_agent')
+    assert(manager.find_agent_access(ddo.did).name == 'test_agent')
+    assert(manager.find_agent_access(ddo.did.upper().replace('DID:DEP:', 'did:dep:')).name == 'test_agent')
+
+    # register again with a new url, the old url is no longer found
+    manager.register_agent('test_agent', url='http://test2.com', ddo=ddo)
+    assert(manager.find_agent_access('http://test.com') is None)
+    assert(manager.find_agent_access('http://test2.com').name == 'test_agent')
+
+    manager.unregister_agent(ddo.did)
+    assert(manager.find_agent_access('test_agent') is None)
+    assert(manager.find_agent_access(ddo.did) is None)
+
+def test_agent_manager_negative_cache(monkeypatch):
+    resolve_urls = []
+
+    def resolve_agent_url(url, authentication=None, http_client=None, timeout=None):
+        resolve_urls.append(url)
+        return None
+
+    monkeypatch.setattr('starfish.agent_manager.agent_access.AgentAccess.resolve_agent_url', resolve_agent_url)
+    manager = AgentManager()
+    manager.register_agent('test_agent', url='http://invalid_agent.org')
+
+    assert(manager.find_agent_access('invalid_test_agent') is None)
+    assert(resolve_urls == ['http://invalid_agent.org'])
+
+    # the miss and the failed agent are cached, so the agent is not resolved again
+    assert(manager.find_agent_access('invalid_test_agent') is None)
+    assert(manager.find_agent_access('another_test_agent') is None)
+    assert(len(resolve_urls) == 1)
+
+    # adding another agent does not clear the failure of the agent that could not be resolved
+    manager.register_agent('other_agent', ddo=DDO.create('http://other.com'))
+    assert(manager.find_agent_access('invalid_test_agent') is None)
+    assert(len(resolve_urls) == 1)
+
+    manager.clear_cache()
+    assert(manager.find_agent_access('invalid_test_agent') is None)
+    assert(len(resolve_urls) == 2)
+
+    manager = AgentManager(negative_cache_seconds=0)
+    manager.register_agent('test_agent', url='http://invalid_agent.org')
+    manager.find_agent_access('invalid_test_agent')
+    manager.find_agent_access('invalid_test_agent')
+    assert(len(resolve_urls) == 4)
+
+def test_agent_manager_resolve_access_agents_concurrent(monkeypatch):
+    ddo = DDO.create('http://test.com')
+
+    def resolve_agent_url(url, authentication=None, http_client=None, timeout=None):
+        if 'dead' in url:
+            time.sleep(1)
+            return None
+        return ddo
+
+    monkeypatch.setattr('starfish.agent_manager.agent_access.AgentAccess.resolve_agent_url', resolve_agent_url)
+    manager = AgentManager()
+    for index in range(4):
+        manager.register_agent(f'dead_agent_{index}', url=f'http://dead_agent_{index}.org')
+    manager.register_agent('test_agent', url='http://test.com')
+
+    start_time = time.time()
+    manager.resolve_access_agents(timeout=0.2)
+    # the dead agents are resolved at the same time, and are only waited for until the timeout
+    assert(time.time() - start_time < 0.8)
+    assert(manager.find_agent_access('test_agent', auto_resolve=False))
+    assert(manager.find_agent_access(ddo.did).name == 'test_agent')
+    assert(manager.find_agent_access('dead_agent_0', auto_resolve=False) is None)
+
+def test_agent_manager_resolve_access_agents_timeout(monkeypatch):
+    resolve_timeouts = []
+
+    def resolve_agent_url(url, authentication=None, http_client=None, timeout=None):
+        resolve_timeouts.append(timeout)
+        time.sleep(1)
+        return None
+
+    monkeypatch.setattr('starfish.agent_manager.agent_access.AgentAccess.resolve_agent_url', resolve_agent_url)
+    manager = AgentManager(resolve_workers=1, resolve_request_timeout=5)
+    for index in range(3):
+        manager.register_agent(f'dead_agent_{index}', url=f'http://dead_agent_{index}.org')
+
+    start_time = time.time()
+    manager.resolve_access_agents(timeout=0.3)
+    # the timeout is for all of the agents, so the agents waiting for the worker also time out
+    assert(time.time() - start_time < 0.8)
+    assert(resolve_timeouts == [5])
+    # the timed out agents are in the negative cache, so they are not submitted again
+    assert(manager.warm_up() == [])
+    time.sleep(1)
+    assert(resolve_timeouts == [5])
+    # the resolve workers are shut down, and exit after the running resolve has finished
+    assert(manager._resolve_executor is None)
+    for thread in threading.enumerate():
+        if thread.name.startswith('agent_resolve'):
+            thread.join(timeout=2)
+            assert(not thread.is_alive())
+
+def test_agent_manager_warm_up(monkeypatch):
+    ddo = DDO.create('http://test.com')
+    monkeypatch.setattr(
+        'starfish.agent_manager.agent_access.AgentAccess.resolve_agent_url',
+        lambda url, authentication=None, http_client=None, timeout=None: ddo
+    )
+    manager = AgentManager()
+    manager.register_agent('test_agent', url='http://test.com')
+
+    futures = manager.warm_up()
+    assert(len(futures) == 1)
+    assert(futures[0].result(timeout=10).did == ddo.did)
+    assert(manager.find_agent_access('test_agent', auto_resolve=False))
+    # nothing left to resolve
+    assert(manager.warm_up() == [])
+    manager.close()
+    assert(manager._resolve_executor is None)
+
+def test_agent_access_agent_cache():
+    ddo = DDO.create('http://test.com')
+    agent_access = AgentAccess('test_agent', ddo_text=ddo.as_text, agent_cache_size=2)
+
+    agent = agent_access.load_agent()
+    assert(agent_access.load_agent() is agent)
+    agent_1 = agent_access.load_agent({'username': 'user_1', 'password': 'password'})
+    assert(agent_access.load_agent({'password': 'password', 'username': 'user_1'}) is agent_1)
+    # the cached agents share the same adapter
+    assert(agent_1._adapter is agent._adapter)
+    # setting the http client of one agent does not change the other agents
+    http_client = agent.http_client
+    agent_1.http_client = requests.Session()
+    assert(agent_1._adapter is not agent._adapter)
+    assert(agent.http_client is http_client)
+
+    # the least recently used agent is removed
+    agent_2 = agent_access.load_agent({'username': 'user_2', 'password': 'password'})
+    assert(agent_access.agent_cache_stats == {'hits': 2, 'misses': 3, 'evictions': 1, 'size': 2})
+    assert(agent_access.load_agent({'username': 'user_2', 'password': 'password'}) is agent_2)
+    assert(agent_access.load_agent() is not agent)
+
+    agent_access.clear_cache()
+    assert(agent_access.agent_cache_stats['size'] == 0)
+    assert(agent_access.load_agent()._adapter is not agent._adapter)
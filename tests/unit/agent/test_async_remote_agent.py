@@ -0,0 +1,160 @@
+"""
+
+    Test AsyncRemoteAgent Unit
+
+
+"""
+import asyncio
+import inspect
+import secrets
+
+import pytest
+from eth_utils import remove_0x_prefix
+
+from starfish.agent import (
+    AsyncRemoteAgent,
+    RemoteAgent
+)
+from starfish.asset import DataAsset
+from starfish.exceptions import (
+    StarfishAssetInvalid,
+    StarfishConnectionError
+)
+from starfish.middleware.agent.async_remote_agent_adapter import AsyncRemoteAgentAdapter
+from starfish.middleware.agent.remote_agent_adapter import RemoteAgentAdapter
+from starfish.middleware.agent.authorization_token_cache import AuthorizationTokenCache
+from starfish.network.ddo import DDO
+from tests.unit.libs.unit_test_agent_client import UnitTestAsyncAgentClient
+
+
+TEST_DDO = DDO.create('http://localhost:3030')
+
+
+def test_async_remote_agent_register_upload_download():
+    async def run():
+        client = UnitTestAsyncAgentClient()
+        ddo = DDO.create('http://localhost:3030')
+        async with AsyncRemoteAgent(ddo, http_client=client) as agent:
+            asset = DataAsset.create('test async asset', secrets.token_bytes(256))
+            asset = await agent.register_asset(asset)
+            assert(asset.did)
+            assert(await agent.upload_asset(asset))
+            store_asset = await agent.download_asset(asset.did)
+            assert(store_asset.data == asset.data)
+            assert(store_asset.did == asset.did)
+
+            listing = await agent.create_listing({'price': 1}, asset.did)
+            assert(listing.listing_id)
+            listings = await agent.get_listings()
+            assert(len(listings) == 1)
+            assert(listings[0].listing_id == listing.listing_id)
+
+            asset_2 = await agent.register_asset(DataAsset.create('test async asset 2', 'data'))
+            for index in range(0, 3):
+                await agent.create_listing({'price': index}, asset_2.did)
+            agent = AsyncRemoteAgent(ddo, http_client=client)
+            client.calls = {}
+            listing_ids = [item.listing_id async for item in agent.iter_listings(max_workers=2)]
+            assert(len(listing_ids) == 4)
+            # only one metadata read for each asset
+            assert(client.call_count('get', '/api/v1/meta/data/') == 2)
+        # injected clients are not closed by the agent
+        assert(agent.http_client is client)
+
+    asyncio.run(run())
+
+
+def test_async_remote_agent_concurrent_agents():
+    async def run():
+        client = UnitTestAsyncAgentClient()
+        agents = [AsyncRemoteAgent(DDO.create(f'http://localhost:{3000 + index}'), http_client=client) for index in range(0, 20)]
+        assets = [DataAsset.create(f'asset {index}', f'data {index}') for index in range(0, 20)]
+        results = await asyncio.gather(*[agent.register_asset(asset) for agent, asset in zip(agents, assets)])
+        for agent, asset in zip(agents, results):
+            assert(asset.did.startswith(agent.did))
+
+    asyncio.run(run())
+
+
+def test_async_remote_agent_load():
+    async def run():
+        agent = await AsyncRemoteAgent.load('http://localhost:3030', http_client=UnitTestAsyncAgentClient(TEST_DDO))
+        assert(isinstance(agent, AsyncRemoteAgent))
+        assert(agent.did == TEST_DDO.did)
+
+    asyncio.run(run())
+
+
+def test_async_remote_agent_connection_error():
+    async def run():
+        ddo = DDO.create('http://localhost:1')
+        async with AsyncRemoteAgent(ddo) as agent:
+            assert(isinstance(agent.adapter, AsyncRemoteAgentAdapter))
+            with pytest.raises(StarfishConnectionError):
+                await agent.get_metadata_list()
+
+    asyncio.run(run())
+
+
+def test_async_remote_agent_authorization_token_cache():
+    async def run():
+        client = UnitTestAsyncAgentClient()
+        token_cache = AuthorizationTokenCache()
+        authentication = {'username': 'test', 'password': 'secret'}
+        agent = AsyncRemoteAgent(TEST_DDO, authentication=authentication, http_client=client, token_cache=token_cache)
+        tokens = await asyncio.gather(*[agent.get_authorization_token() for index in range(0, 8)])
+        assert(len(set(tokens)) == 1)
+        assert(client.call_count('post', '/api/v1/auth/token') == 1)
+
+        client.revoke_tokens()
+        asset = await agent.register_asset(DataAsset.create('test async asset', 'data'))
+        assert(asset.did)
+        assert(await agent.get_authorization_token() != tokens[0])
+        assert(client.call_count('post', '/api/v1/auth/token') == 2)
+    asyncio.run(run())
+
+
+def test_async_remote_agent_download_asset_stream(tmp_path):
+    async def run():
+        client = UnitTestAsyncAgentClient()
+        agent = AsyncRemoteAgent(TEST_DDO, http_client=client)
+        data = secrets.token_bytes(10000)
+        asset = await agent.register_asset(DataAsset.create('test async stream asset', data))
+        assert(await agent.upload_asset(asset))
+
+        assert(await agent.get_asset_data_size(asset.did) == len(data))
+        missing_asset = await agent.register_asset(DataAsset.create('test async missing data', b'missing'))
+        assert(await agent.get_asset_data_size(missing_asset.did) is None)
+
+        chunks = [chunk async for chunk in await agent.download_asset_stream(asset.did, chunk_size=1024)]
+        assert(len(chunks) == 10)
+        assert(b''.join(chunks) == data)
+
+        filename = tmp_path / 'download.dat'
+        await agent.download_asset_to_file(asset.did, str(filename))
+        assert(filename.read_bytes() == data)
+
+        client.data[remove_0x_prefix(asset.asset_id)] = secrets.token_bytes(10000)
+        filename = tmp_path / 'invalid.dat'
+        with pytest.raises(StarfishAssetInvalid):
+            await agent.download_asset_to_file(asset.did, str(filename))
+        assert(not filename.exists())
+    asyncio.run(run())
+
+
+def test_async_remote_agent_methods_are_coroutines():
+    # every public method of the sync classes must be a coroutine in the async classes, apart from the helpers
+    sync_methods = {'get_endpoint', 'is_service'}
+    for sync_class, async_class in ((RemoteAgent, AsyncRemoteAgent), (RemoteAgentAdapter, AsyncRemoteAgentAdapter)):
+        for name, value in vars(sync_class).items():
+            if name.startswith('_') or name in sync_methods or not inspect.isfunction(value):
+                continue
+            method = getattr(async_class, name)
+            is_async = inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method)
+            assert(is_async), f'{async_class.__name__}.{name} is not async'
+
+    async def run():
+        agent = AsyncRemoteAgent(TEST_DDO, http_client=UnitTestAsyncAgentClient())
+        assert(await agent.get_asset_purchase_ids('asset') == [])
+        assert(not await agent.is_access_granted_for_asset('asset', None))
+    asyncio.run(run())
@@ -1,12 +1,15 @@
 
 import datetime
+import json
 import pytest
+import re
 import secrets
 import tempfile
 
 
 from starfish.agent.memory_agent import MemoryAgent
 from starfish.asset.data_asset import DataAsset
+from starfish.middleware.store import SQLiteStore
 from starfish.network.ethereum.ethereum_account import EthereumAccount
 
 
@@ -87,3 +90,99 @@ def test_consume_asset(resources, config):
     purchase, listing, agent, asset, account = purchase_asset(resources, config)
     assert(agent.consume_asset(listing, account, purchase.purchase_id,))
 
+
+def test_search_listings_index():
+    agent = create_agent()
+    listings = []
+    for index in range(0, 25):
+        asset = register_asset(agent)
+        listing_data = {
+            'name': f'Weather station {index}' if index % 2 else f'Traffic count {index}',
+            'price': (index * 7) % 25,
+        }
+        listings.append(agent.create_listing(listing_data, asset.did))
+
+    weather_ids = [listing.listing_id for listing in listings[1::2]]
+    assert(agent.search_listings('Weather') == weather_ids)
+    assert(agent.search_listings('Weather station') == weather_ids)
+    assert(agent.search_listings('Weather traffic') == [])
+    assert(agent.search_listings('unknown') == [])
+    # the same results as matching the text against all of the listing data
+    for text in ('weather', 'eather', 'eather stat', 'station 1', 'Weather station 1', 'price', 'e', ' '):
+        expected_ids = [listing.listing_id for listing in listings if re.search(text, json.dumps(listing.data))]
+        assert(agent.search_listings(text) == expected_ids)
+    # regular expressions are matched against the listing data
+    assert(agent.search_listings('Weath.*n 1') == [listing.listing_id for listing in listings if listing.data['name'].startswith('Weather station 1')])
+
+    # paging
+    assert(len(agent.search_listings('')) == 25)
+    assert(len(agent.search_listings('', offset=10)) == 10)
+    assert(agent.search_listings('Weather', offset=5, page=1) == weather_ids[5:10])
+    assert(agent.search_listings('Weather', offset=5, page=3) == [])
+
+    # sorting
+    prices = [agent.get_listing(listing_id).data['price'] for listing_id in agent.search_listings('', sort='price')]
+    assert(prices == sorted(prices))
+    prices = [agent.get_listing(listing_id).data['price'] for listing_id in agent.search_listings('', sort='-price')]
+    assert(prices == sorted(prices, reverse=True))
+
+    # the index is updated with the listing
+    listing = listings[0]
+    listing.data['name'] = 'Weather radar'
+    agent.update_listing(listing)
+    assert(agent.search_listings('Weather')[0] == listing.listing_id)
+    assert(agent.search_listings('radar') == [listing.listing_id])
+    assert(listing.listing_id not in agent.search_listings('Traffic'))
+
+def test_memory_agent_sqlite_store(tmp_path, resources, config):
+    filename = str(tmp_path / 'memory_agent.db')
+    with SQLiteStore(filename) as store:
+        agent = MemoryAgent(store=store)
+        asset = register_asset(agent)
+        listing = agent.create_listing({'name': 'Weather data'}, asset.did)
+        account = EthereumAccount.import_from_text(config.ethereum.accounts[1].key_data, config.ethereum.accounts[1].password)
+        purchase = agent.purchase_asset(listing, account)
+
+    # all of the assets, listings and purchases are kept after a restart
+    with SQLiteStore(filename) as store:
+        agent = MemoryAgent(store=store)
+        assert(agent.did == asset.did.split('/')[0])
+        store_asset = agent.get_asset(asset.did)
+        assert(store_asset.did == asset.did)
+        assert(store_asset.data == asset.data)
+        assert(agent.get_listing(listing.listing_id).data['name'] == 'Weather data')
+        assert(agent.search_listings('Weather') == [listing.listing_id])
+        assert(agent.is_access_granted_for_asset(asset, account, purchase.purchase_id))
+        assert(agent.consume_asset(listing, account, purchase.purchase_id))
+        assert(agent.get_asset_purchase_ids(asset) == [purchase.purchase_id])
+        assert(agent.is_access_granted_for_asset(asset.did, account))
+
+def test_purchase_index(resources, config):
+    agent = create_agent()
+    account = EthereumAccount.import_from_text(config.ethereum.accounts[1].key_data, config.ethereum.accounts[1].password)
+    other_account = EthereumAccount.import_from_text(config.ethereum.accounts[0].key_data, config.ethereum.accounts[0].password)
+    assets = [register_asset(agent) for index in range(0, 4)]
+    listings = [agent.create_listing({'name': f'listing {index}'}, asset.did) for index, asset in enumerate(assets)]
+
+    purchase_ids = [agent.purchase_asset(listings[index], account).purchase_id for index in (0, 2, 2)]
+    other_purchase_id = agent.purchase_asset(listings[3], other_account).purchase_id
+
+    assert(agent.get_asset_purchase_ids(assets[2]) == purchase_ids[1:])
+    assert(agent.get_asset_purchase_ids(assets[2].did) == purchase_ids[1:])
+    assert(agent.get_asset_purchase_ids(assets[1]) == [])
+    assert(listings[3].get_purchase_ids == [other_purchase_id])
+    assert(agent.get_account_purchase_ids(account) == purchase_ids)
+    assert(agent.get_account_purchase_ids(other_account.address.lower()) == [other_purchase_id])
+
+    assert(agent.is_access_granted_for_asset(assets[0], account))
+    assert(listings[2].is_purchased(account))
+    assert(not agent.is_access_granted_for_asset(assets[3], account))
+    assert(not agent.is_access_granted_for_asset(assets[0], account, other_purchase_id))
+    assert(agent.is_access_granted_for_assets(assets, account) == [True, False, True, False])
+    assert(agent.is_access_granted_for_assets([asset.did for asset in assets], other_account) == [False, False, False, True])
+
+    # invalid assets have no purchases
+    for asset in ('invalid', agent.did, None):
+        assert(not agent.is_access_granted_for_asset(asset, account))
+        assert(agent.get_asset_purchase_ids(asset) == [])
+    assert(agent.is_access_granted_for_assets(['invalid', assets[0]], account) == [False, True])
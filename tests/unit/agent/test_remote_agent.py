@@ -4,14 +4,26 @@
 
 
 """
+import io
+import secrets
 
 import pytest
 import requests
+from eth_utils import remove_0x_prefix
 
 from starfish.agent.remote_agent import RemoteAgent
-from starfish.exceptions import StarfishConnectionError
+from starfish.asset import DataAsset
+from starfish.exceptions import (
+    StarfishAssetInvalid,
+    StarfishConnectionError
+)
+from starfish.middleware.agent.authorization_token_cache import (
+    AuthorizationTokenCache,
+    set_default_token_cache
+)
 from starfish.middleware.agent.remote_agent_adapter import RemoteAgentAdapter
 from starfish.network.ddo import DDO
+from tests.unit.libs.unit_test_agent_client import UnitTestAgentClient
 
 
 def test_remote_agent_set_http_client():
@@ -37,3 +49,154 @@ def test_remote_agent_get_meta_list():
     with pytest.raises(StarfishConnectionError):
         result = agent.get_metadata_list()
 
+
+
+def test_remote_agent_get_listings():
+    client = UnitTestAgentClient()
+    ddo = DDO.create('http://localhost:3030')
+    agent = RemoteAgent(ddo, http_client=client)
+
+    listing_ids = []
+    for index in range(0, 10):
+        asset = agent.register_asset(DataAsset.create(f'test asset {index % 4}', 'test data'))
+        listing = agent.create_listing({'price': index}, asset.did)
+        listing_ids.append(listing.listing_id)
+
+    # new agent, so the metadata cache is empty
+    agent = RemoteAgent(ddo, http_client=client)
+    client.calls = {}
+    listings = agent.get_listings(max_workers=4)
+    assert([listing.listing_id for listing in listings] == listing_ids)
+    # only 4 different assets, so only 4 metadata reads
+    assert(client.call_count('get', '/api/v1/meta/data/') == 4)
+
+    listing_iter = agent.iter_listings()
+    assert(set(listing.listing_id for listing in listing_iter) == set(listing_ids))
+
+    # stop reading before all listings are returned
+    for listing in agent.iter_listings(max_workers=1):
+        assert(listing.listing_id in listing_ids)
+        break
+
+
+def test_remote_agent_metadata_cache():
+    client = UnitTestAgentClient()
+    ddo = DDO.create('http://localhost:3030')
+    agent = RemoteAgent(ddo, http_client=client)
+    asset = agent.register_asset(DataAsset.create('test asset', 'test data'))
+    assert(agent.upload_asset(asset))
+    agent.create_listing({'price': 1}, asset.did)
+
+    agent = RemoteAgent(ddo, http_client=client)
+    client.calls = {}
+    for index in range(0, 3):
+        store_asset = agent.get_asset(asset.did)
+        assert(store_asset.metadata_text == asset.metadata_text)
+        assert(store_asset.did == asset.did)
+    listings = agent.get_listings()
+    assert(listings[0].listing_id)
+    assert(agent.download_asset(asset.did))
+    assert(client.call_count('get', '/api/v1/meta/data/') == 1)
+    assert(agent.metadata_cache.stats['misses'] == 1)
+    assert(agent.metadata_cache.stats['hits'] == 4)
+
+
+def test_remote_agent_authorization_token_cache():
+    client = UnitTestAgentClient()
+    token_cache = AuthorizationTokenCache()
+    ddo = DDO.create('http://localhost:3030')
+    authentication = {'username': 'test', 'password': 'secret'}
+    agent = RemoteAgent(ddo, authentication=authentication, http_client=client, token_cache=token_cache)
+    token = agent.get_authorization_token()
+    for index in range(0, 3):
+        agent.register_asset(DataAsset.create(f'test asset {index}', 'test data'))
+        assert(agent.get_authorization_token() == token)
+    assert(client.call_count('post', '/api/v1/auth/token') == 1)
+
+    # the agent has revoked the token, so a new token is requested and the call is sent again
+    client.revoke_tokens()
+    asset = agent.register_asset(DataAsset.create('test asset after revoke', 'test data'))
+    assert(asset.did)
+    assert(agent.get_authorization_token() != token)
+    assert(client.call_count('post', '/api/v1/auth/token') == 2)
+
+    # resolve_url seeds the shared token cache, that is used by the loaded agent
+    set_default_token_cache(AuthorizationTokenCache())
+    client = UnitTestAgentClient()
+    agent = RemoteAgent.load('http://localhost:3030', authentication=authentication, http_client=client)
+    assert(agent)
+    agent.register_asset(DataAsset.create('test asset load', 'test data'))
+    assert(client.call_count('post', '/api/v1/auth/token') == 1)
+
+
+def test_remote_agent_resolve_url_timeout():
+    request_timeouts = []
+
+    class TimeoutClient():
+        def get(self, url, headers=None, timeout=None, **kwargs):
+            request_timeouts.append(timeout)
+            raise requests.exceptions.Timeout(f'timeout reading {url}')
+
+    # the request timeout is passed to the http client, and the timeout is reported as a connection error
+    with pytest.raises(StarfishConnectionError):
+        RemoteAgent.resolve_url('http://localhost:3030', http_client=TimeoutClient(), timeout=5)
+    assert(request_timeouts == [5])
+
+
+def test_remote_agent_download_asset_stream(tmp_path):
+    client = UnitTestAgentClient()
+    ddo = DDO.create('http://localhost:3030')
+    agent = RemoteAgent(ddo, http_client=client)
+    data = secrets.token_bytes(10000)
+    asset = agent.register_asset(DataAsset.create('test stream asset', data))
+    assert(agent.upload_asset(asset))
+
+    chunks = list(agent.download_asset_stream(asset.did, chunk_size=1024))
+    assert(len(chunks) == 10)
+    assert(max(len(chunk) for chunk in chunks) == 1024)
+    assert(b''.join(chunks) == data)
+
+    filename = tmp_path / 'download.dat'
+    store_asset = agent.download_asset_to_file(asset.did, str(filename), chunk_size=1024)
+    assert(store_asset.did == asset.did)
+    assert(filename.read_bytes() == data)
+
+    stream = io.BytesIO()
+    agent.download_asset_to_file(asset.asset_id, stream)
+    assert(stream.getvalue() == data)
+
+    # the data on the agent has been changed, so the download is not valid
+    client.data[remove_0x_prefix(asset.asset_id)] = secrets.token_bytes(10000)
+    with pytest.raises(StarfishAssetInvalid):
+        list(agent.download_asset_stream(asset.did))
+
+    # no response from the agent
+    adapter = RemoteAgentAdapter(client)
+    adapter.request_get = lambda url, **kwargs: None
+    with pytest.raises(ValueError, match='no response'):
+        adapter.download_asset_stream(remove_0x_prefix(asset.asset_id), 'http://localhost:3030/api/v1/assets')
+    filename = tmp_path / 'invalid.dat'
+    with pytest.raises(StarfishAssetInvalid):
+        agent.download_asset_to_file(asset.did, str(filename))
+    assert(not filename.exists())
+    assert(len(list(tmp_path.iterdir())) == 1)
+
+
+def test_remote_agent_upload_asset_from_file(tmp_path):
+    client = UnitTestAgentClient()
+    ddo = DDO.create('http://localhost:3030')
+    agent = RemoteAgent(ddo, http_client=client)
+    data = secrets.token_bytes(100000)
+    filename = tmp_path / 'upload.dat'
+    filename.write_bytes(data)
+    asset = DataAsset.create_from_file('test file asset', str(filename), is_read=False)
+    asset = agent.register_asset(asset)
+    assert(agent.upload_asset(asset))
+    assert(client.data[remove_0x_prefix(asset.asset_id)] == data)
+    assert(b''.join(agent.download_asset_stream(asset.did)) == data)
+
+    empty_filename = tmp_path / 'empty.dat'
+    empty_filename.write_bytes(b'')
+    asset = DataAsset.create_from_file('test empty asset', str(empty_filename), is_read=False)
+    with pytest.raises(ValueError):
+        agent.upload_asset(agent.register_asset(asset))
@@ -83,3 +83,52 @@ def test_asset_add_provenance_invoke():
     assert(asset)
     asset.add_provenance_invoke(agent_did, job_id, None, inputs_text)
     assert(asset.metadata['provenance'])
+
+def test_metadata_cache():
+    metadata = dict(ASSET_METADATA, tags=['one', 'two'], extra={'value': 1})
+    asset = AssetBase(json.dumps(metadata))
+    assert(asset.metadata is asset.metadata)
+    assert(asset.asset_id == asset.asset_id)
+
+    metadata_view = asset.metadata
+    with pytest.warns(DeprecationWarning):
+        metadata_view['name'] = 'new name'
+    assert(metadata_view['name'] == 'new name')
+    assert(asset.metadata is not metadata_view)
+    assert(asset.metadata['name'] == metadata['name'])
+    with pytest.warns(DeprecationWarning):
+        asset.metadata['extra']['value'] = 2
+    assert(asset.metadata['extra']['value'] == 1)
+    with pytest.warns(DeprecationWarning):
+        asset.metadata.update({'name': 'new name'})
+    assert(asset.metadata['name'] == metadata['name'])
+    assert(asset.metadata is asset.metadata)
+
+    # changes to the lists within the metadata are also found
+    asset_id = asset.asset_id
+    with pytest.warns(DeprecationWarning):
+        asset.metadata['tags'].append('three')
+    assert(asset.metadata['tags'] == ['one', 'two'])
+    assert(json.loads(asset.metadata_text) == asset.metadata)
+    assert(asset.asset_id == asset_id)
+    nested_asset = AssetBase(json.dumps(dict(ASSET_METADATA, contents=[{'values': [1, 2]}])))
+    with pytest.warns(DeprecationWarning):
+        nested_asset.metadata['contents'][0]['values'].sort(reverse=True)
+    with pytest.warns(DeprecationWarning):
+        nested_asset.metadata['contents'][0]['values'][0] = 3
+    assert(nested_asset.metadata['contents'][0]['values'] == [1, 2])
+    assert(type(nested_asset.metadata.copy()['contents'][0]['values']) is list)
+
+    metadata_copy = asset.metadata.copy()
+    assert(type(metadata_copy) is dict)
+    assert(metadata_copy == metadata)
+    metadata_copy['extra']['value'] = 2
+    assert(asset.metadata['extra']['value'] == 1)
+
+    asset_id = asset.asset_id
+    asset.set_did(TEST_DID)
+    asset.set_metadata(metadata_copy)
+    assert(asset.did is None)
+    assert(asset.metadata['extra']['value'] == 2)
+    assert(asset.asset_id != asset_id)
+    assert(asset.asset_id == AssetBase(json.dumps(metadata_copy)).asset_id)
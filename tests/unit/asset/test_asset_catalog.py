@@ -0,0 +1,66 @@
+"""
+    test_asset_catalog
+
+"""
+
+import secrets
+import pytest
+
+from starfish.asset import (
+    AssetCatalog,
+    BundleAsset,
+    DataAsset
+)
+from starfish.network.did import did_generate_random
+
+
+def test_asset_catalog():
+    agent_did = did_generate_random()
+    catalog = AssetCatalog()
+    data_asset = DataAsset.create('catalog data', secrets.token_bytes(100))
+    data_asset.set_did(f'{agent_did}/{data_asset.asset_id}')
+    bundle_asset = BundleAsset.create('catalog bundle', {'data': data_asset.asset_id})
+
+    assert(catalog.add(data_asset) == data_asset.asset_id)
+    catalog.add(bundle_asset)
+    assert(len(catalog) == 2)
+    assert(data_asset.did in catalog)
+    assert(bundle_asset.asset_id in catalog)
+    assert(set(catalog) == {data_asset.asset_id, bundle_asset.asset_id})
+
+    asset = catalog.get(data_asset.did)
+    assert(isinstance(asset, DataAsset))
+    assert(asset.did == data_asset.did)
+    assert(asset.metadata_text == data_asset.metadata_text)
+    assert(asset.data is None)
+
+    asset = catalog.get(bundle_asset.asset_id)
+    assert(isinstance(asset, BundleAsset))
+    assert(asset.did is None)
+    assert(asset['data'] == data_asset.asset_id)
+
+    # all assets from the same agent share one agent did string
+    other_asset = DataAsset.create('catalog data 2', secrets.token_bytes(100))
+    catalog.add(other_asset, did=f'{agent_did}/{other_asset.asset_id}')
+    assert(catalog.get_agent_did(other_asset.asset_id) is catalog.get_agent_did(data_asset.asset_id))
+    assert(catalog.get_metadata_text(other_asset.asset_id) == other_asset.metadata_text)
+
+    assert(catalog.remove(data_asset.did))
+    assert(not catalog.remove(data_asset.did))
+    assert(catalog.get(data_asset.did) is None)
+
+    # invalid asset DIDs and asset ids are not found
+    for value in ('invalid', agent_did, None):
+        assert(value not in catalog)
+        assert(catalog.get(value) is None)
+        assert(catalog.get_metadata_text(value) is None)
+        assert(not catalog.remove(value))
+    with pytest.raises(TypeError):
+        catalog.add('not an asset')
+
+
+def test_slotted_objects():
+    asset = DataAsset.create('slotted asset', 'data')
+    assert(not hasattr(asset, '__dict__'))
+    with pytest.raises(AttributeError):
+        asset.unknown_attribute = True
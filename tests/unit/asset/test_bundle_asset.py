@@ -6,6 +6,7 @@
 import secrets
 import logging
 import json
+import pytest
 
 from starfish.asset import DataAsset
 from starfish.asset import BundleAsset
@@ -66,3 +67,51 @@ def test_bundle_asset_add_access_remove(config):
         assert(asset_id)
 
     assert(bundle.asset_count == 0)
+
+
+def test_bundle_asset_add_many():
+    asset_list = {f'name_{index}': DataAsset.create(f'Asset_{index}', secrets.token_hex(64)) for index in range(TEST_ASSET_COUNT)}
+
+    bundle = BundleAsset.create('name')
+    for name, asset in asset_list.items():
+        bundle.add(name, asset)
+
+    many_bundle = BundleAsset.create('name')
+    many_bundle.add_many(asset_list)
+    assert(many_bundle.asset_id == bundle.asset_id)
+
+    batch_bundle = BundleAsset.create('name')
+    with batch_bundle.batch():
+        for name, asset in asset_list.items():
+            batch_bundle.add(name, asset)
+        # metadata is only built when the batch has finished
+        assert('contents' not in batch_bundle.metadata)
+    assert(batch_bundle.asset_id == bundle.asset_id)
+    assert(batch_bundle.asset_names == list(asset_list.keys()))
+    assert([name for name, asset_id in batch_bundle] == list(asset_list.keys()))
+    assert(batch_bundle.get_asset_id_at_index(1) == asset_list['name_1'].asset_id)
+
+    with batch_bundle.batch():
+        batch_bundle.asset_remove('name_0')
+        batch_bundle.add_many([('name_0', asset_list['name_0'])])
+    assert(batch_bundle.asset_names[-1] == 'name_0')
+    assert(batch_bundle.get_asset_id(0) == asset_list['name_1'].asset_id)
+    assert(list(batch_bundle.metadata['contents'].keys()) == batch_bundle.asset_names)
+
+    # an invalid item does not change the bundle
+    asset_id = batch_bundle.asset_id
+    asset_names = batch_bundle.asset_names
+    with pytest.raises(TypeError):
+        batch_bundle.add_many([('new_name', asset_list['name_0']), ('invalid', 'not an asset')])
+    assert(batch_bundle.asset_names == asset_names)
+    assert(batch_bundle.asset_id == asset_id)
+
+    # an exception inside the batch restores the assets
+    with pytest.raises(ValueError):
+        with batch_bundle.batch():
+            batch_bundle.asset_remove('name_1')
+            batch_bundle.add('new_name', asset_list['name_0'])
+            raise ValueError('test error')
+    assert(batch_bundle.asset_names == asset_names)
+    assert(batch_bundle.asset_id == asset_id)
+    assert(list(batch_bundle.metadata['contents'].keys()) == asset_names)
@@ -7,7 +7,10 @@ import secrets
 import logging
 import json
 
-from starfish.asset import DataAsset
+from starfish.asset import (
+    DataAsset,
+    FileDataSource
+)
 
 
 
@@ -21,3 +24,63 @@ def test_init():
     assert(isinstance(asset, DataAsset))
     assert(asset.data == TEST_DATA.encode('utf-8'))
 
+
+def test_create_asset_id():
+    # the metadata created for the data, and so the asset id, must stay the same for the same data
+    asset = DataAsset.create('test data asset', TEST_DATA)
+    assert(asset.metadata_text == json.dumps({
+        'name': 'test data asset',
+        'type': 'dataset',
+        'contentType': 'text/plain',
+        'contentHash': 'e097942142bf9b809fadc103109f5d4094af6dc59137a9a3633aefce42103b89',
+    }))
+    assert(asset.asset_id == '4f7d2d67705e9261df11092264fab71a14e122930dd2b03a79bd69d89f1ba6ce')
+    asset = DataAsset.create('test data asset', bytes(10))
+    assert(asset.asset_id == 'b89d9f8f1401fcdd5beb83e7436247adfda263fb2e09b89ac2159d2e69c03425')
+
+
+def test_create_from_file_no_read(tmp_path):
+    data = secrets.token_bytes(10000)
+    filename = tmp_path / 'test.dat'
+    filename.write_bytes(data)
+    read_asset = DataAsset.create_from_file('test file asset', str(filename))
+    asset = DataAsset.create_from_file('test file asset', str(filename), is_read=False)
+    assert(isinstance(asset.data_source, FileDataSource))
+    assert(asset.data == data)
+    # the data is only read from the file once
+    assert(asset.data is asset.data)
+    assert(isinstance(asset.data_source, FileDataSource))
+    assert(asset.filename == str(filename))
+    assert(asset.has_data)
+    assert(asset.metadata['contentHash'] == read_asset.metadata['contentHash'])
+    assert(asset.metadata['contentLength'] == 10000)
+
+    save_filename = tmp_path / 'save.dat'
+    asset.save_to_file(str(save_filename))
+    assert(save_filename.read_bytes() == data)
+
+
+def test_create_from_data_source(tmp_path):
+    data = secrets.token_bytes(200000)
+    filename = tmp_path / 'test.dat'
+    filename.write_bytes(data)
+    # region that does not start on a page boundary
+    data_source = FileDataSource(str(filename), offset=70001, length=100000)
+    asset = DataAsset.create_from_data_source('test region asset', data_source)
+    region = data[70001:170001]
+    assert(asset.has_data)
+    assert(asset.metadata['contentLength'] == len(region))
+    assert(asset.metadata['contentHash'] == DataAsset.create('test', region).metadata['contentHash'])
+    assert(asset.data == region)
+    assert(b''.join(data_source.iter_chunks(30000)) == region)
+
+    save_filename = tmp_path / 'save.dat'
+    asset.save_to_file(str(save_filename))
+    assert(save_filename.read_bytes() == region)
+
+    memory_asset = DataAsset.create('test memory asset', region)
+    assert(memory_asset.data_source.hash() == asset.metadata['contentHash'])
+
+    missing_asset = DataAsset.create_from_data_source('missing', FileDataSource(str(save_filename)))
+    save_filename.unlink()
+    assert(not missing_asset.has_data)
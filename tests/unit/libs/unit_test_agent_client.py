@@ -0,0 +1,161 @@
+"""
+
+    In memory http clients, that provide the basic remote agent api calls for unit testing.
+
+"""
+import json
+import secrets
+from unittest.mock import Mock
+from urllib.parse import urlparse
+
+from starfish.network.ddo import DDO
+from starfish.utils.crypto_hash import hash_sha3_256
+
+
+class UnitTestAgentClient():
+
+    def __init__(self, ddo=None):
+        self.ddo = ddo
+        self.metadata = {}
+        self.data = {}
+        self.listings = {}
+        self.tokens = []
+        self.calls = {}
+
+    def get(self, url, headers=None, **kwargs):
+        return self._route('get', url, headers=headers, **kwargs)
+
+    def post(self, url, headers=None, **kwargs):
+        return self._route('post', url, headers=headers, **kwargs)
+
+    def put(self, url, headers=None, **kwargs):
+        return self._route('put', url, headers=headers, **kwargs)
+
+    def head(self, url, headers=None, **kwargs):
+        return self._route('head', url, headers=headers, **kwargs)
+
+    def revoke_tokens(self):
+        self.tokens = []
+
+    def call_count(self, method, path_start=''):
+        count = 0
+        for (call_method, path), value in self.calls.items():
+            if call_method == method and path.startswith(path_start):
+                count += value
+        return count
+
+    def _route(self, method, url, headers=None, data=None, json=None, files=None, auth=None, **kwargs):
+        path = urlparse(url).path
+        self.calls[(method, path)] = self.calls.get((method, path), 0) + 1
+        if headers and 'Authorization' in headers:
+            if headers['Authorization'].split(' ')[-1] not in self.tokens:
+                return self._response(401, b'unauthorized')
+        if path == '/api/ddo':
+            if self.ddo is None:
+                self.ddo = DDO.create(f'http://{urlparse(url).netloc}')
+            return self._response(200, self.ddo.as_text.encode())
+        if path == '/api/v1/auth/token':
+            if method == 'post':
+                self.tokens.append(secrets.token_hex(32))
+                return self._response(200, json_data=self.tokens[-1])
+            return self._response(200, json_data=list(self.tokens))
+        if path == '/api/v1/meta/index':
+            return self._response(200, json_data=self._metadata_index())
+        if path == '/api/v1/meta/data':
+            if isinstance(data, bytes):
+                data = data.decode('utf-8')
+            asset_id = hash_sha3_256(data)
+            self.metadata[asset_id] = data
+            return self._response(200, json_data=asset_id)
+        if path.startswith('/api/v1/meta/data/'):
+            asset_id = path.split('/')[-1]
+            if asset_id in self.metadata:
+                return self._response(200, self.metadata[asset_id].encode())
+            return self._response(404, b'not found')
+        if path.startswith('/api/v1/assets/'):
+            asset_id = path.split('/')[-1]
+            if method == 'post':
+                if files:
+                    file_data = files['file'][1]
+                    if hasattr(file_data, 'read'):
+                        file_data = file_data.read()
+                else:
+                    file_data = self._read_multipart_file(data, headers)
+                self.data[asset_id] = bytes(file_data)
+                return self._response(201)
+            if asset_id in self.data:
+                if method == 'head':
+                    return self._response(200, headers={'Content-Length': str(len(self.data[asset_id]))})
+                return self._response(200, self.data[asset_id])
+            return self._response(404, b'not found')
+        if path == '/api/v1/market/listings':
+            if method == 'post':
+                listing = {'id': secrets.token_hex(32), 'assetid': json['assetid'], 'info': json['info']}
+                self.listings[listing['id']] = listing
+                return self._response(200, json_data=listing)
+            return self._response(200, json_data=list(self.listings.values()))
+        if path.startswith('/api/v1/market/listings/'):
+            listing_id = path.split('/')[-1]
+            if method == 'put':
+                self.listings[listing_id] = json
+                return self._response(200, json_data=True)
+            if listing_id in self.listings:
+                return self._response(200, json_data=self.listings[listing_id])
+        return self._response(404, b'not found')
+
+    def _metadata_index(self):
+        return {asset_id: json.loads(text) for asset_id, text in self.metadata.items()}
+
+    @staticmethod
+    def _read_multipart_file(stream, headers):
+        boundary = headers['content-type'].split('boundary=')[-1].encode()
+        body = b''.join(bytes(block) for block in stream)
+        assert(len(body) == int(headers['Content-Length']))
+        part = body.split(b'--' + boundary)[1]
+        return part.split(b'\r\n\r\n', 1)[1][:-2]
+
+    @staticmethod
+    def _response(status_code, content=b'', json_data=None, headers=None):
+        response = Mock(spec=['status_code', 'content', 'json', 'text', 'headers'])
+        response.status_code = status_code
+        response.headers = headers or {}
+        response.content = content
+        response.text = str(content)
+        response.json = Mock(return_value=json_data)
+        return response
+
+
+class UnitTestAsyncAgentClient(UnitTestAgentClient):
+
+    async def get(self, url, headers=None, **kwargs):
+        return self._route('get', url, headers=headers, **kwargs)
+
+    async def post(self, url, headers=None, content=None, **kwargs):
+        if hasattr(content, '__aiter__'):
+            content = [block async for block in content]
+        return self._route('post', url, headers=headers, data=content, **kwargs)
+
+    async def put(self, url, headers=None, **kwargs):
+        return self._route('put', url, headers=headers, **kwargs)
+
+    async def head(self, url, headers=None, **kwargs):
+        return self._route('head', url, headers=headers, **kwargs)
+
+    def build_request(self, method, url, **kwargs):
+        return method.lower(), url, kwargs
+
+    async def send(self, request, stream=False):
+        method, url, kwargs = request
+        response = self._route(method, url, **kwargs)
+
+        async def aiter_bytes(chunk_size=None):
+            chunk_size = chunk_size or len(response.content) or 1
+            for offset in range(0, len(response.content), chunk_size):
+                yield response.content[offset:offset + chunk_size]
+
+        async def aclose():
+            pass
+
+        response.aiter_bytes = aiter_bytes
+        response.aclose = aclose
+        return response
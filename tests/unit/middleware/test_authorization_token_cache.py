@@ -0,0 +1,96 @@
+"""
+
+    Test AuthorizationTokenCache
+
+
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from starfish.middleware.agent.authorization_token_cache import AuthorizationTokenCache
+
+TOKEN_URL = 'http://localhost:3030/api/v1/auth/token'
+
+
+def test_authorization_token_cache_get_token():
+    cache = AuthorizationTokenCache()
+    tokens = ['token_1', 'token_2']
+    assert(cache.get_token(TOKEN_URL, 'user', 'pass', tokens.pop) == 'token_2')
+    assert(cache.get_token(TOKEN_URL, 'user', 'pass', tokens.pop) == 'token_2')
+    assert(cache.get_token(TOKEN_URL + '/', 'user', 'pass', tokens.pop) == 'token_2')
+    # different user, so a new token
+    assert(cache.get_token(TOKEN_URL, 'other_user', 'pass', tokens.pop) == 'token_1')
+    assert(cache.stats == {'hits': 2, 'misses': 2, 'size': 2})
+
+    # an old token does not remove the new token
+    cache.set_token(TOKEN_URL, 'user', 'pass', 'token_3')
+    assert(not cache.invalidate(TOKEN_URL, 'user', 'pass', 'token_2'))
+    assert(cache.get_token(TOKEN_URL, 'user', 'pass', None) == 'token_3')
+    assert(cache.invalidate(TOKEN_URL, 'user', 'pass', 'token_3'))
+    assert(cache.get_token(TOKEN_URL, 'user', 'pass', lambda: 'token_4') == 'token_4')
+
+    cache.clear()
+    assert(len(cache) == 0)
+    with pytest.raises(ValueError):
+        AuthorizationTokenCache(expire_seconds=0)
+
+
+def test_authorization_token_cache_expire():
+    cache = AuthorizationTokenCache(expire_seconds=0.05)
+    assert(cache.get_token(TOKEN_URL, 'user', 'pass', lambda: 'token_1') == 'token_1')
+    time.sleep(0.1)
+    assert(cache.get_token(TOKEN_URL, 'user', 'pass', lambda: 'token_2') == 'token_2')
+
+
+def test_authorization_token_cache_single_flight():
+    cache = AuthorizationTokenCache()
+    request_count = 0
+
+    def request_token():
+        nonlocal request_count
+        request_count += 1
+        time.sleep(0.05)
+        return f'token_{request_count}'
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_token(TOKEN_URL, 'user', 'pass', request_token)))
+        for index in range(0, 8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert(request_count == 1)
+    assert(results == ['token_1'] * 8)
+
+    async def request_token_async():
+        await asyncio.sleep(0.05)
+        return request_token()
+
+    async def run():
+        return await asyncio.gather(*[
+            cache.async_get_token(TOKEN_URL, 'async_user', 'pass', request_token_async) for index in range(0, 8)
+        ])
+    assert(asyncio.run(run()) == ['token_2'] * 8)
+    assert(request_count == 2)
+
+
+def test_authorization_token_cache_locks():
+    cache = AuthorizationTokenCache(expire_seconds=0.01)
+    assert(cache.get_token(TOKEN_URL, 'user', 'pass', lambda: 'token_1') == 'token_1')
+    # the locks are removed when they are not used, and the password is not held in the cache
+    assert(len(cache._locks) == 0)
+    assert(all('pass' not in key for key in cache._items.keys()))
+
+    async def request_token_async():
+        return 'token_async'
+
+    # each call to asyncio.run uses a new event loop
+    for index in range(0, 4):
+        time.sleep(0.02)
+        assert(asyncio.run(cache.async_get_token(TOKEN_URL, 'user', 'pass', request_token_async)) == 'token_async')
+    assert(all(len(locks) == 0 for locks in cache._async_locks.values()))
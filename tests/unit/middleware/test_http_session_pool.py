@@ -0,0 +1,101 @@
+"""
+
+    Test HTTPSessionPool
+
+
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer
+)
+
+import pytest
+
+from starfish.agent.remote_agent import RemoteAgent
+from starfish.agent_manager import AgentManager
+from starfish.middleware.http_session_pool import (
+    HTTPSessionPool,
+    get_default_session_pool
+)
+from starfish.network.ddo import DDO
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(float(self.headers.get('x-delay', 0)))
+        body = b'"ok"'
+        self.send_response(200)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+
+def test_session_pool_reuse(server_url):
+    session_pool = HTTPSessionPool()
+    for index in range(0, 5):
+        response = session_pool.get(f'{server_url}/test/{index}')
+        assert(response.status_code == 200)
+
+    stats = session_pool.stats
+    assert(stats['requests'] == 5)
+    assert(stats['connections'] == 1)
+    assert(stats['reused'] == 4)
+    assert(stats['reuse_ratio'] == 0.8)
+    assert(session_pool.host_stats(server_url)['requests'] == 5)
+    assert(session_pool.get_session(f'{server_url}/other') is session_pool.get_session(server_url))
+    session_pool.close()
+    assert(session_pool.stats['requests'] == 0)
+
+
+def test_session_pool_host_request_limit(server_url):
+    session_pool = HTTPSessionPool(host_request_limit=1)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(session_pool.get, server_url, headers={'x-delay': '0.05'}) for index in range(0, 4)]
+        for future in futures:
+            assert(future.result().status_code == 200)
+    stats = session_pool.stats
+    assert(stats['requests'] == 4)
+    assert(stats['pool_waits'] > 0)
+    # only one request at a time, so only one connection is needed
+    assert(stats['connections'] == 1)
+
+
+def test_session_pool_invalid_settings():
+    with pytest.raises(ValueError):
+        HTTPSessionPool(pool_maxsize=0)
+    with pytest.raises(ValueError):
+        HTTPSessionPool(host_request_limit=0)
+
+
+def test_session_pool_shared_default():
+    ddo = DDO.create('http://localhost:3030')
+    agent = RemoteAgent(ddo)
+    assert(agent.http_client is get_default_session_pool())
+
+    manager = AgentManager()
+    assert(manager.http_client is get_default_session_pool())
+    manager.register_agent('test_agent', ddo=ddo)
+    assert(manager.load_agent('test_agent').http_client is get_default_session_pool())
+
+    session_pool = HTTPSessionPool()
+    manager = AgentManager(http_client=session_pool)
+    manager.register_agent('test_agent', ddo=ddo)
+    assert(manager.load_agent('test_agent').http_client is session_pool)
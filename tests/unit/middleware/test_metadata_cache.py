@@ -0,0 +1,86 @@
+"""
+
+    Test MetadataCache
+
+
+"""
+import json
+import os
+
+import pytest
+
+from starfish.exceptions import StarfishAssetInvalid
+from starfish.middleware.agent.metadata_cache import MetadataCache
+from starfish.utils.crypto_hash import hash_sha3_256
+
+
+def create_metadata(index):
+    metadata_text = json.dumps({'name': f'test asset {index}', 'type': 'dataset'})
+    return hash_sha3_256(metadata_text), metadata_text
+
+
+def test_metadata_cache_add_get():
+    cache = MetadataCache()
+    asset_id, metadata_text = create_metadata(0)
+    assert(cache.get(asset_id) is None)
+    cache.add(asset_id, metadata_text)
+    assert(asset_id in cache)
+    assert(cache.get(asset_id) == metadata_text)
+    assert(cache.get(f'0x{asset_id}') == metadata_text)
+    assert(cache.stats == {'hits': 2, 'misses': 1, 'disk_hits': 0, 'size': 1})
+
+    with pytest.raises(StarfishAssetInvalid):
+        cache.add(asset_id, '{"name": "changed"}')
+
+    assert(cache.remove(asset_id))
+    assert(asset_id not in cache)
+
+
+def test_metadata_cache_lru():
+    cache = MetadataCache(max_size=2)
+    items = [create_metadata(index) for index in range(0, 3)]
+    cache.add(*items[0])
+    cache.add(*items[1])
+    # use the first item, so that the second item is the oldest
+    assert(cache.get(items[0][0]))
+    cache.add(*items[2])
+    assert(len(cache) == 2)
+    assert(items[0][0] in cache)
+    assert(items[1][0] not in cache)
+    assert(items[2][0] in cache)
+
+
+def test_metadata_cache_disk(tmp_path):
+    cache_path = str(tmp_path / 'metadata')
+    asset_id, metadata_text = create_metadata(0)
+    cache = MetadataCache(cache_path=cache_path)
+    cache.add(asset_id, metadata_text)
+
+    cache = MetadataCache(cache_path=cache_path)
+    assert(cache.get(asset_id) == metadata_text)
+    assert(cache.stats['disk_hits'] == 1)
+
+    # changed files on disk are removed
+    bad_asset_id, bad_metadata_text = create_metadata(1)
+    with open(os.path.join(cache_path, bad_asset_id), 'w') as fp:
+        fp.write(metadata_text)
+    assert(cache.get(bad_asset_id) is None)
+    assert(not os.path.exists(os.path.join(cache_path, bad_asset_id)))
+
+
+def test_metadata_cache_invalid_key(tmp_path):
+    cache_path = tmp_path / 'metadata'
+    victim_filename = tmp_path / 'victim.txt'
+    victim_filename.write_text('victim')
+    cache = MetadataCache(cache_path=str(cache_path))
+
+    # only 32 byte hex asset ids are used, so a key can never be a path outside of the cache folder
+    for asset_id in ('../victim.txt', '0x../victim.txt', '/etc/passwd', 'a' * 63, 'g' * 64, '', None):
+        assert(MetadataCache.to_key(asset_id) is None)
+        assert(cache.get(asset_id) is None)
+        assert(asset_id not in cache)
+        assert(not cache.remove(asset_id))
+        with pytest.raises(ValueError):
+            cache.add(asset_id, 'metadata', is_valid=True)
+    assert(victim_filename.read_text() == 'victim')
+    assert(MetadataCache.to_key('0x' + 'A' * 64) == 'a' * 64)
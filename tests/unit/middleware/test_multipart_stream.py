@@ -0,0 +1,107 @@
+"""
+
+    Test MultipartStream
+
+
+"""
+import asyncio
+import io
+import mmap
+import secrets
+import threading
+from email.parser import BytesParser
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer
+)
+
+import pytest
+import requests
+
+from starfish.middleware.multipart_stream import MultipartStream
+from starfish.utils.crypto_hash import hash_sha3_256
+
+
+def read_multipart_file(content_type, body):
+    message = BytesParser().parsebytes(f'Content-Type: {content_type}\r\n\r\n'.encode() + body)
+    part = message.get_payload()[0]
+    return part.get_filename(), part.get_payload(decode=True)
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['content-length']))
+        filename, data = read_multipart_file(self.headers['content-type'], body)
+        result = f'{filename}:{hash_sha3_256(data)}'.encode()
+        self.send_response(200)
+        self.send_header('content-length', str(len(result)))
+        self.end_headers()
+        self.wfile.write(result)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), UploadHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+
+def test_multipart_stream_payloads(tmp_path):
+    data = secrets.token_bytes(100000)
+    filename = tmp_path / 'upload.dat'
+    filename.write_bytes(data)
+    with open(filename, 'rb') as fp:
+        file_map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        payloads = [data, bytearray(data), memoryview(data), file_map, io.BytesIO(data), fp]
+        for payload in payloads:
+            with MultipartStream('file', 'upload.dat', payload, block_size=4096) as stream:
+                blocks = list(stream)
+                assert(max(len(block) for block in blocks) <= 4096)
+                body = b''.join(bytes(block) for block in blocks)
+                assert(len(body) == len(stream))
+                assert(read_multipart_file(stream.content_type, body) == ('upload.dat', data))
+                # the stream can be sent again
+                assert(b''.join(bytes(block) for block in stream) == body)
+        file_map.close()
+
+    # zero copy, the blocks are views of the payload
+    with MultipartStream('file', 'upload.dat', data) as stream:
+        stream.read()
+        block = stream.read(1000)
+        assert(isinstance(block, memoryview))
+        assert(block.obj is data)
+
+    with MultipartStream('file', 'text.txt', 'test text') as stream:
+        body = b''.join(bytes(block) for block in stream)
+        assert(read_multipart_file(stream.content_type, body) == ('text.txt', b'test text'))
+        assert(stream.read() == b'')
+
+
+def test_multipart_stream_post(server_url, tmp_path):
+    data = secrets.token_bytes(1000000)
+    filename = tmp_path / 'upload.dat'
+    filename.write_bytes(data)
+    with open(filename, 'rb') as fp, MultipartStream('file', 'upload.dat', fp) as stream:
+        headers = {'content-type': stream.content_type}
+        response = requests.post(server_url, data=stream, headers=headers)
+        assert(response.text == f'upload.dat:{hash_sha3_256(data)}')
+
+
+def test_multipart_stream_post_async(server_url):
+    httpx = pytest.importorskip('httpx')
+    data = secrets.token_bytes(1000000)
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            with MultipartStream('file', 'upload.dat', data) as stream:
+                headers = {'content-type': stream.content_type, 'content-length': str(len(stream))}
+                response = await client.post(server_url, content=stream.aiter_blocks(), headers=headers)
+                assert(response.text == f'upload.dat:{hash_sha3_256(data)}')
+    asyncio.run(run())
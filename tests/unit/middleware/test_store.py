@@ -0,0 +1,71 @@
+"""
+
+    Test the store backends used by the MemoryAgent
+
+"""
+import secrets
+import threading
+
+import pytest
+
+from starfish.middleware.store import (
+    DictStore,
+    ShardedStore,
+    SQLiteStore
+)
+
+
+def create_stores(tmp_path):
+    return [DictStore(), ShardedStore(shard_count=4), SQLiteStore(str(tmp_path / 'store.db'))]
+
+
+def test_store(tmp_path):
+    for store in create_stores(tmp_path):
+        with store:
+            data = secrets.token_bytes(100)
+            store.set('asset', 'one', {'name': 'one', 'values': [1, 2]})
+            store.set('asset', 'two', 'text')
+            store.set('asset_data', 'one', data)
+            assert(store.get('asset', 'one') == {'name': 'one', 'values': [1, 2]})
+            assert(store.get('asset', 'two') == 'text')
+            assert(store.get('asset_data', 'one') == data)
+            assert(store.get('asset', 'three') is None)
+            assert(store.get('asset', 'three', 'default') == 'default')
+            assert(store.has('asset', 'one'))
+            assert(not store.has('listing', 'one'))
+            assert(sorted(store.keys('asset')) == ['one', 'two'])
+            assert(dict(store.items('asset_data')) == {'one': data})
+            assert(store.count('asset') == 2)
+
+            store.set('asset', 'two', 'new text')
+            assert(store.get('asset', 'two') == 'new text')
+            assert(store.delete('asset', 'two'))
+            assert(not store.delete('asset', 'two'))
+            assert(store.count('asset') == 1)
+
+
+def test_store_threads(tmp_path):
+    for store in create_stores(tmp_path):
+        with store:
+            def write_values(thread_index):
+                for index in range(0, 50):
+                    store.set('item', f'{thread_index}:{index}', index)
+                    assert(store.get('item', f'{thread_index}:{index}') == index)
+
+            threads = [threading.Thread(target=write_values, args=(thread_index, )) for thread_index in range(0, 8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert(store.count('item') == 400)
+
+
+def test_sqlite_store_reopen(tmp_path):
+    filename = str(tmp_path / 'store.db')
+    with SQLiteStore(filename) as store:
+        store.set('asset', 'one', {'name': 'one'})
+    with SQLiteStore(filename) as store:
+        assert(store.get('asset', 'one') == {'name': 'one'})
+
+    with pytest.raises(ValueError):
+        SQLiteStore(':memory:')
@@ -0,0 +1,96 @@
+"""
+
+    Test DDOCache
+
+"""
+import time
+
+from starfish.agent_manager import AgentManager
+from starfish.middleware.store import DictStore
+from starfish.network.ddo import DDO
+from starfish.network.ddo_cache import DDOCache
+
+
+def test_ddo_cache_resolve(tmp_path):
+    ddo = DDO.create('http://test.com')
+    resolve_count = []
+
+    def resolve_ddo():
+        resolve_count.append(1)
+        return ddo
+
+    filename = tmp_path / 'ddo_cache.db'
+    ddo_cache = DDOCache(filename)
+    assert(ddo_cache.resolve('http://test.com/', resolve_ddo).as_text == ddo.as_text)
+    assert(ddo_cache.resolve('http://Test.com', resolve_ddo).as_text == ddo.as_text)
+    assert(len(resolve_count) == 1)
+    # the DDO is also cached using the did
+    assert(ddo_cache.get(ddo.did).as_text == ddo.as_text)
+    assert(ddo_cache.stats == {'hits': 1, 'stale_hits': 0, 'misses': 1})
+    ddo_cache.close()
+
+    # a new cache object ( or process ) reads the same DDO from the file
+    ddo_cache = DDOCache(filename)
+    assert(ddo_cache.resolve(ddo.did, resolve_ddo).as_text == ddo.as_text)
+    assert(len(resolve_count) == 1)
+
+    assert(ddo_cache.delete(ddo.did))
+    assert(ddo_cache.get(ddo.did) is None)
+    ddo_cache.clear()
+    assert(ddo_cache.get('http://test.com') is None)
+    ddo_cache.close()
+
+
+def test_ddo_cache_stale_while_revalidate():
+    ddo = DDO.create('http://test.com')
+    new_ddo = DDO.create('http://test.com', did=ddo.did, service_list=['meta'])
+    ddo_cache = DDOCache(store=DictStore(), ttl_seconds=0, stale_seconds=60)
+    ddo_cache.set('http://test.com', ddo)
+
+    # the stale DDO is returned at once, and the new DDO is resolved in the background
+    assert(ddo_cache.resolve('http://test.com', lambda: new_ddo).as_text == ddo.as_text)
+    for index in range(100):
+        if ddo_cache.get('http://test.com', allow_stale=True).as_text == new_ddo.as_text:
+            break
+        time.sleep(0.01)
+    assert(ddo_cache.get('http://test.com', allow_stale=True).as_text == new_ddo.as_text)
+    assert(ddo_cache.stats['stale_hits'] == 1)
+
+    # past the stale time the DDO is resolved again before it is returned
+    ddo_cache = DDOCache(store=DictStore(), ttl_seconds=0, stale_seconds=0)
+    ddo_cache.set('http://test.com', ddo)
+    assert(ddo_cache.resolve('http://test.com', lambda: new_ddo).as_text == new_ddo.as_text)
+
+
+def test_ddo_cache_checksum():
+    ddo = DDO.create('http://test.com')
+    store = DictStore()
+    ddo_cache = DDOCache(store=store)
+    ddo_cache.set('http://test.com', ddo)
+
+    key = DDOCache.to_key('http://test.com')
+    value = dict(store.get('ddo', key))
+    value['ddo_text'] = DDO.create('http://changed.com', did=ddo.did).as_text
+    store.set('ddo', key, value)
+    # the changed DDO does not match the checksum, so is not used
+    assert(ddo_cache.get('http://test.com') is None)
+    assert(not store.has('ddo', key))
+
+
+def test_agent_manager_ddo_cache(monkeypatch):
+    ddo = DDO.create('http://test.com')
+    resolve_urls = []
+
+    def resolve_agent_url(url, authentication=None, http_client=None, timeout=None):
+        resolve_urls.append(url)
+        return ddo
+
+    monkeypatch.setattr('starfish.agent_manager.agent_access.AgentAccess.resolve_agent_url', resolve_agent_url)
+    ddo_cache = DDOCache(store=DictStore())
+    for index in range(2):
+        manager = AgentManager(ddo_cache=ddo_cache)
+        manager.register_agent('test_agent', url='http://test.com')
+        access = manager.find_agent_access('test_agent')
+        assert(access.ddo.as_text == ddo.as_text)
+        assert(access.did == ddo.did)
+    assert(resolve_urls == ['http://test.com'])
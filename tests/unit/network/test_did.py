@@ -14,7 +14,10 @@ from starfish.network.did import (
     did_parse,
     asset_did_validate,
     decode_to_asset_id,
-    is_asset_did
+    decode_to_asset_id_many,
+    is_asset_did,
+    is_asset_did_many,
+    is_did_many
 )
 
 
@@ -150,3 +153,66 @@ def test_decode_to_asset_id():
 
     assert(not is_asset_did(did))
 
+
+
+def test_did_parse_cache():
+    test_did = did_generate_random()
+    asset_id = secrets.token_hex(32)
+    asset_did = f'{test_did}/{asset_id}'
+
+    value = did_parse(asset_did)
+    value['path'] = 'changed'
+    # the parsed values returned are a copy of the cached values
+    assert(did_parse(asset_did)['path'] == asset_id)
+    assert(decode_to_asset_id(asset_did) == asset_id)
+    assert(did_parse(f'{test_did}/{asset_id}#test')['fragment'] == 'test')
+
+    for index in range(2):
+        with pytest.raises(ValueError, match='path should only have hex characters'):
+            did_validate('did:dep:0x01')
+        assert(not is_did('did:dep:0x01'))
+
+
+class StringArray:
+    # string array with the same `to_pylist` call as an Arrow array
+
+    def __init__(self, values):
+        self._values = values
+
+    def to_pylist(self):
+        return list(self._values)
+
+
+def test_did_batch():
+    test_did = did_generate_random()
+    asset_id = secrets.token_hex(32)
+    values = [
+        f'{test_did}/{asset_id}',
+        test_did,
+        f'0x{asset_id}',
+        'invalid-did',
+        None,
+        f'{test_did}/{asset_id}#test',
+        f'{test_did}/00112233',
+    ]
+    assert(is_did_many(values) == bytearray([1, 1, 0, 0, 0, 1, 1]))
+    assert(is_asset_did_many(StringArray(values)) == bytearray([1, 0, 0, 0, 0, 1, 0]))
+
+    mask, asset_ids = decode_to_asset_id_many(StringArray(values))
+    assert(mask == bytearray([1, 0, 1, 0, 0, 1, 0]))
+    assert(len(asset_ids) == len(values) * 32)
+    assert(asset_ids[0:32] == bytes.fromhex(asset_id))
+    assert(asset_ids[32:64] == bytes(32))
+    assert(asset_ids[64:96] == bytes.fromhex(asset_id))
+    assert(asset_ids[160:192] == bytes.fromhex(asset_id))
+
+    assert(decode_to_asset_id_many([]) == (bytearray(), b''))
+
+
+def test_did_batch_numpy():
+    numpy = pytest.importorskip('numpy')
+    asset_id = secrets.token_hex(32)
+    values = numpy.array([f'{did_generate_random()}/{asset_id}', 'invalid-did'])
+    mask, asset_ids = decode_to_asset_id_many(values)
+    assert(numpy.frombuffer(mask, dtype=bool).tolist() == [True, False])
+    assert(numpy.frombuffer(asset_ids, dtype='S32')[0] == bytes.fromhex(asset_id))
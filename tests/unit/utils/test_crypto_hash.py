@@ -0,0 +1,61 @@
+"""
+    test_crypto_hash
+
+"""
+
+import io
+import secrets
+import pytest
+
+from Crypto.Hash import SHA3_256
+
+from starfish.utils.crypto_hash import (
+    Sha3Hasher,
+    hash_sha3_256,
+    hash_sha3_256_file,
+    hash_sha3_256_many
+)
+
+
+def crypto_hash(data):
+    message_digest = SHA3_256.new()
+    message_digest.update(data)
+    return message_digest.hexdigest()
+
+
+def test_hash_sha3_256(tmp_path):
+    data = secrets.token_bytes(100000)
+    expected_hash = crypto_hash(data)
+    assert(hash_sha3_256(data) == expected_hash)
+    assert(hash_sha3_256('text') == crypto_hash(b'text'))
+    assert(hash_sha3_256(bytearray(data)) == expected_hash)
+    assert(hash_sha3_256(memoryview(data)) == expected_hash)
+    assert(hash_sha3_256(io.BytesIO(data)) == expected_hash)
+    assert(hash_sha3_256([data[:10], data[10:5000], data[5000:]]) == expected_hash)
+
+    filename = tmp_path / 'test.dat'
+    filename.write_bytes(data)
+    assert(hash_sha3_256_file(str(filename), block_size=4096) == expected_hash)
+
+    for value in (1000, None, [data, None], {'data': data}, {data}):
+        with pytest.raises(TypeError):
+            hash_sha3_256(value)
+
+
+def test_sha3_hasher():
+    data = secrets.token_bytes(10000)
+    hasher = Sha3Hasher()
+    hasher.update(data[:100])
+    copy_hasher = hasher.copy()
+    hasher.update(io.BytesIO(data[100:]), block_size=1000)
+    assert(hasher.hexdigest() == crypto_hash(data))
+    assert(copy_hasher.hexdigest() == crypto_hash(data[:100]))
+    assert(hasher.digest().hex() == hasher.hexdigest())
+
+
+def test_hash_sha3_256_many():
+    items = [secrets.token_bytes(index * 1000) for index in range(20)]
+    expected_hashes = [crypto_hash(item) for item in items]
+    assert(hash_sha3_256_many(items, max_workers=4) == expected_hashes)
+    assert(hash_sha3_256_many(items, max_workers=1) == expected_hashes)
+    assert(hash_sha3_256_many([]) == [])
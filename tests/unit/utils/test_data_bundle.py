@@ -5,9 +5,32 @@ Test utils.data_bundle module
 
 
 """
+import io
+import json
 import math
+import secrets
+import threading
+import time
 
-from starfish.utils.data_bundle import decode_readable_size
+import pytest
+from eth_utils import remove_0x_prefix
+
+from starfish.agent.agent_base import AgentBase
+from starfish.agent.remote_agent import RemoteAgent
+from starfish.asset import BundleAsset
+from starfish.exceptions import StarfishAssetInvalid
+from starfish.network.ddo import DDO
+from starfish.utils import data_bundle
+from starfish.utils.chunk_index import ChunkIndex
+from starfish.utils.data_bundle import (
+    decode_readable_size,
+    download_bundle_data,
+    download_bundle_file,
+    iter_content_defined_chunks,
+    register_upload_data
+)
+from starfish.utils.merkle_tree import calculate_merkle_root
+from tests.unit.libs.unit_test_agent_client import UnitTestAgentClient
 
 ONE_TB = math.pow(1024, 4)
 ONE_GB = math.pow(1024, 3)
@@ -35,3 +58,160 @@ def test_decode_readable_size():
         print(text)
         assert(value == int(actual_value))
 
+
+
+class SlowUploadAgent(RemoteAgent):
+
+    def __init__(self, *args, **kwargs):
+        RemoteAgent.__init__(self, *args, **kwargs)
+        self.uploading = 0
+        self.max_uploading = 0
+        self.lock = threading.Lock()
+
+    def upload_asset(self, asset):
+        with self.lock:
+            self.uploading += 1
+            self.max_uploading = max(self.max_uploading, self.uploading)
+        time.sleep(0.02)
+        result = RemoteAgent.upload_asset(self, asset)
+        with self.lock:
+            self.uploading -= 1
+        return result
+
+
+def test_register_upload_data_parallel():
+    client = UnitTestAgentClient()
+    data = secrets.token_bytes(20000)
+    for max_workers in (1, 4):
+        agent = SlowUploadAgent(DDO.create('http://localhost:3030'), http_client=client)
+        bundle_asset = register_upload_data(agent, 'test bundle', io.BytesIO(data), 1000, max_workers=max_workers)
+        assert(bundle_asset.did)
+        assert(agent.max_uploading == max_workers)
+        # the bundle is in the same order as the data
+        assert([name for name, asset_id in bundle_asset] == [f'test bundle:{index}' for index in range(0, 20)])
+        output = io.BytesIO()
+        assert(download_bundle_data(agent, bundle_asset, output) == len(data))
+        assert(output.getvalue() == data)
+
+
+def test_download_bundle_file(tmp_path):
+    client = UnitTestAgentClient()
+    agent = RemoteAgent(DDO.create('http://localhost:3030'), http_client=client)
+    data = secrets.token_bytes(20500)
+    bundle_asset = register_upload_data(agent, 'test bundle', io.BytesIO(data), 1000)
+
+    filename = tmp_path / 'download.dat'
+    client.calls = {}
+    assert(download_bundle_file(agent, bundle_asset, str(filename), max_workers=4) == len(data))
+    assert(filename.read_bytes() == data)
+    assert(client.call_count('get', '/api/v1/assets/') == 21)
+    # the metadata for each chunk is only read once
+    assert(client.call_count('get', '/api/v1/meta/data/') == 0)
+
+    # resume a partly written file, only the missing and changed chunks are downloaded
+    with open(filename, 'r+b') as fp:
+        fp.truncate(15000)
+        fp.seek(2500)
+        fp.write(b'changed')
+    client.calls = {}
+    assert(download_bundle_file(agent, bundle_asset, str(filename), resume=True) == len(data))
+    assert(filename.read_bytes() == data)
+    assert(client.call_count('get', '/api/v1/assets/') == 7)
+
+    # the data of one chunk has been changed on the agent
+    asset_id = remove_0x_prefix(bundle_asset.get_asset_id('test bundle:3'))
+    client.data[asset_id] = secrets.token_bytes(1000)
+    with pytest.raises(StarfishAssetInvalid):
+        download_bundle_file(agent, bundle_asset, str(filename))
+
+
+def test_bundle_merkle_root(tmp_path):
+    client = UnitTestAgentClient()
+    agent = RemoteAgent(DDO.create('http://localhost:3030'), http_client=client)
+    data = secrets.token_bytes(5000)
+    bundle_asset = register_upload_data(agent, 'test bundle', io.BytesIO(data), 1000)
+    content_hashes = [agent.get_asset(asset_id).metadata['contentHash'] for name, asset_id in bundle_asset]
+    assert(bundle_asset.metadata['merkleRoot'] == calculate_merkle_root(content_hashes))
+
+    # a bundle with the chunks in a different order does not match the merkle root
+    metadata = bundle_asset.metadata.copy()
+    names = list(metadata['contents'].keys())
+    names[0], names[1] = names[1], names[0]
+    metadata['contents'] = {name: metadata['contents'][name] for name in names}
+    with pytest.raises(StarfishAssetInvalid):
+        download_bundle_file(agent, BundleAsset(json.dumps(metadata)), str(tmp_path / 'download.dat'))
+
+    # adding a chunk removes the merkle root
+    bundle_asset.add('extra', agent.get_asset(bundle_asset.get_asset_id(0)))
+    assert('merkleRoot' not in bundle_asset.metadata)
+
+
+def test_content_defined_chunks():
+    data = secrets.token_bytes(200000)
+    chunks = list(iter_content_defined_chunks(io.BytesIO(data), 16384))
+    assert(b''.join(chunks) == data)
+    assert(max(len(chunk) for chunk in chunks) <= 16384)
+    assert(min(len(chunk) for chunk in chunks[:-1]) >= 1024)
+
+    # insert data, only the chunk with the insert is changed
+    changed_data = data[:50000] + b'inserted data' + data[50000:]
+    changed_chunks = list(iter_content_defined_chunks(io.BytesIO(changed_data), 16384))
+    assert(b''.join(changed_chunks) == changed_data)
+    assert(len(set(chunks) - set(changed_chunks)) <= 2)
+
+    with pytest.raises(ValueError):
+        list(iter_content_defined_chunks(io.BytesIO(data), 1000, average_size=2000))
+
+
+def test_content_defined_chunks_numpy(monkeypatch):
+    numpy = pytest.importorskip('numpy')
+    data = secrets.token_bytes(600000)
+    # the numpy rolling hash must split the data at the same points as the python rolling hash
+    chunks = list(iter_content_defined_chunks(io.BytesIO(data), 65536, min_size=100))
+    monkeypatch.setattr(data_bundle, 'numpy', None)
+    assert(list(iter_content_defined_chunks(io.BytesIO(data), 65536, min_size=100)) == chunks)
+    monkeypatch.setattr(data_bundle, 'numpy', numpy)
+    monkeypatch.setattr(data_bundle, 'GEAR_BLOCK_SIZE', 1000)
+    assert(list(iter_content_defined_chunks(io.BytesIO(data), 65536, min_size=100)) == chunks)
+
+
+def test_register_upload_data_chunk_index(tmp_path):
+    client = UnitTestAgentClient()
+    agent = RemoteAgent(DDO.create('http://localhost:3030'), http_client=client)
+    chunk_index = ChunkIndex(str(tmp_path / 'chunk_index.json'))
+    data = secrets.token_bytes(200000)
+    bundle_asset = register_upload_data(agent, 'test', io.BytesIO(data), 16384, chunk_index=chunk_index, is_content_defined=True)
+    chunk_count = len(chunk_index)
+    assert(client.call_count('post', '/api/v1/assets/') == chunk_count)
+    chunk_index.save()
+
+    changed_data = data[:50000] + b'inserted data' + data[50000:]
+    chunk_index = ChunkIndex(str(tmp_path / 'chunk_index.json'))
+    assert(len(chunk_index) == chunk_count)
+    client.calls = {}
+    bundle_asset = register_upload_data(agent, 'test', io.BytesIO(changed_data), 16384, chunk_index=chunk_index, is_content_defined=True)
+    assert(client.call_count('post', '/api/v1/assets/') <= 2)
+    assert(chunk_index.hits >= chunk_count - 2)
+    output = io.BytesIO()
+    download_bundle_data(agent, bundle_asset, output)
+    assert(output.getvalue() == changed_data)
+
+    # the chunk metadata is on the agent but the data is not, so the chunk is uploaded again
+    asset_id = remove_0x_prefix(bundle_asset.get_asset_id_at_index(0))
+    del client.data[asset_id]
+    client.calls = {}
+    register_upload_data(agent, 'test', io.BytesIO(changed_data), 16384, chunk_index=chunk_index, is_content_defined=True)
+    assert(client.call_count('post', '/api/v1/assets/') == 1)
+    assert(asset_id in client.data)
+
+    # an agent that cannot return the data size, always uploads the chunks again
+    chunk_count = len(list(bundle_asset))
+    client.calls = {}
+    agent.get_asset_data_size = lambda asset_did_id: AgentBase.get_asset_data_size(agent, asset_did_id)
+    register_upload_data(agent, 'test', io.BytesIO(changed_data), 16384, chunk_index=chunk_index, is_content_defined=True)
+    assert(client.call_count('post', '/api/v1/assets/') == chunk_count)
+    del agent.get_asset_data_size
+
+    # build the index from the metadata held on the agent
+    chunk_index = ChunkIndex()
+    assert(chunk_index.update_from_agent(agent) == len(client.data))
@@ -0,0 +1,42 @@
+"""
+
+Test utils.merkle_tree module
+
+
+"""
+import secrets
+
+import pytest
+
+from starfish.utils.merkle_tree import (
+    MerkleTree,
+    calculate_merkle_root,
+    verify_merkle_proof
+)
+
+
+def test_merkle_tree():
+    for leaf_count in range(1, 18):
+        leaf_hashes = [secrets.token_hex(32) for index in range(0, leaf_count)]
+        merkle_tree = MerkleTree(leaf_hashes)
+        assert(merkle_tree.leaf_count == leaf_count)
+        assert(merkle_tree.root == calculate_merkle_root(leaf_hashes))
+        for start in range(0, leaf_count):
+            for end in range(start + 1, leaf_count + 1):
+                proof = merkle_tree.get_proof(start, end)
+                assert(verify_merkle_proof(leaf_hashes[start:end], start, leaf_count, proof, merkle_tree.root))
+                bad_hashes = [secrets.token_hex(32)] + leaf_hashes[start + 1:end]
+                assert(not verify_merkle_proof(bad_hashes, start, leaf_count, proof, merkle_tree.root))
+                assert(not verify_merkle_proof(leaf_hashes[start:end], start, leaf_count, proof + [leaf_hashes[0]], merkle_tree.root))
+
+
+def test_merkle_tree_order():
+    leaf_hashes = [secrets.token_hex(32) for index in range(0, 4)]
+    assert(calculate_merkle_root(leaf_hashes) != calculate_merkle_root(list(reversed(leaf_hashes))))
+    # a single chunk checked with the proof from another position
+    merkle_tree = MerkleTree(leaf_hashes)
+    assert(not verify_merkle_proof(leaf_hashes[1:2], 1, 4, merkle_tree.get_proof(0), merkle_tree.root))
+    with pytest.raises(ValueError):
+        MerkleTree([])
+    with pytest.raises(ValueError):
+        merkle_tree.get_proof(3, 5)